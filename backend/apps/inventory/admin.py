@@ -1,5 +1,28 @@
-from django.contrib import admin
-from .models import TelegramUser, Category, Product, Order, Transaction
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .bot.repositories.counters import reconcile_reservation, verify_counter
+from .bot.repositories.orders import (
+    cancel_pending_order,
+    delete_orders,
+    fulfill_orders,
+)
+from .bot.repositories.transactions import recent_transactions
+from .models import (
+    TelegramUser,
+    Category,
+    Product,
+    Order,
+    OrderStatus,
+    Transaction,
+    StockSnapshot,
+    TransactionArchive,
+    Counter,
+    Notification,
+    NotificationStatus,
+)
 
 
 @admin.register(TelegramUser)
@@ -23,12 +46,34 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ["name"]
 
 
+class ProductAdminForm(forms.ModelForm):
+    """Mahsulot formasi: miqdor band qilinganidan kam bo'lmasligi kerak"""
+
+    def clean_quantity(self):
+        quantity = self.cleaned_data["quantity"]
+        if self.instance.pk is None:
+            return quantity
+        # Band qilingan miqdor bot tomonidan o'zgaradi - bazadagi joriy qiymat
+        reserved = (
+            Product.objects.filter(pk=self.instance.pk)
+            .values_list("reserved_quantity", flat=True)
+            .first()
+        )
+        if reserved is not None and quantity < reserved:
+            raise forms.ValidationError(
+                f"Miqdor band qilinganidan ({reserved}) kam bo'lishi mumkin emas"
+            )
+        return quantity
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
+    form = ProductAdminForm
     list_display = [
         "name",
         "category",
         "quantity",
+        "reserved_quantity",
         "unit",
         "min_quantity",
         "is_low_stock",
@@ -37,6 +82,8 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ["category", "unit"]
     search_fields = ["name"]
     list_editable = ["quantity", "min_quantity"]
+    readonly_fields = ["reserved_quantity"]
+    actions = ["reconcile_reserved"]
 
     def is_low_stock(self, obj):
         return obj.is_low_stock
@@ -44,6 +91,28 @@ class ProductAdmin(admin.ModelAdmin):
     is_low_stock.boolean = True
     is_low_stock.short_description = "Kam qoldimi?"
 
+    def get_changelist_form(self, request, **kwargs):
+        # list_editable (quantity) ham shu tekshiruvdan o'tadi
+        kwargs.setdefault("form", ProductAdminForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Faqat tahrirlangan maydonlar yoziladi - formadagi eski
+            # reserved_quantity parallel band qilishni bosib ketmasin
+            obj.save(update_fields=[*form.changed_data, "updated_at"])
+        else:
+            obj.save()
+
+    @admin.action(description="Band qilingan miqdorni zakaslar bilan tekshirish")
+    def reconcile_reserved(self, request, queryset):
+        fixed = sum(
+            1
+            for product_id in queryset.values_list("id", flat=True)
+            if reconcile_reservation(product_id)
+        )
+        self.message_user(request, f"{fixed} ta mahsulot tuzatildi")
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -60,6 +129,73 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ["status", "created_at"]
     search_fields = ["requester__full_name", "product__name"]
     raw_id_fields = ["requester", "product", "fulfilled_by"]
+    # Holat, mahsulot va miqdor band qilingan miqdorga bog'liq - faqat
+    # amallar (bajarish, bekor qilish) orqali o'zgaradi
+    readonly_fields = ["product", "quantity", "status", "fulfilled_by", "fulfilled_at"]
+    actions = ["complete_selected", "cancel_selected"]
+
+    def has_add_permission(self, request):
+        # Zakas bot orqali (mahsulotni band qilib) yaratiladi
+        return False
+
+    def delete_model(self, request, obj):
+        delete_orders([obj.id])
+
+    def delete_queryset(self, request, queryset):
+        delete_orders(queryset.values_list("id", flat=True))
+
+    @admin.action(description="Tanlangan zakaslarni bajarish")
+    def complete_selected(self, request, queryset):
+        results = fulfill_orders(
+            queryset.values_list("id", flat=True),
+            note=f"Admin panel: {request.user}",
+        )
+        done = sum(1 for error in results.values() if not error)
+        self.message_user(request, f"{done} ta zakas bajarildi")
+        for order_id, error in results.items():
+            if error:
+                self.message_user(request, f"#{order_id}: {error}", messages.WARNING)
+
+    @admin.action(description="Tanlangan zakaslarni bekor qilish")
+    def cancel_selected(self, request, queryset):
+        cancelled = sum(
+            1
+            for order in queryset.filter(status=OrderStatus.PENDING).select_related(
+                "product", "requester"
+            )
+            if cancel_pending_order(order)
+        )
+        self.message_user(request, f"{cancelled} ta zakas bekor qilindi")
+
+
+class LedgerPeriodFilter(admin.SimpleListFilter):
+    """Standart holatda faqat oxirgi kunlar (yangi partitionlar) ko'rsatiladi"""
+
+    title = "Davr"
+    parameter_name = "period"
+
+    def lookups(self, request, model_admin):
+        return [("all", "Butun tarix")]
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": f"Oxirgi {settings.LEDGER_HOT_DAYS} kun",
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == lookup,
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: lookup}
+                ),
+                "display": title,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == "all":
+            return queryset
+        return queryset & recent_transactions()
 
 
 @admin.register(Transaction)
@@ -73,6 +209,69 @@ class TransactionAdmin(admin.ModelAdmin):
         "order",
         "created_at",
     ]
-    list_filter = ["transaction_type", "created_at"]
+    list_filter = [LedgerPeriodFilter, "transaction_type", "created_at"]
     search_fields = ["product__name", "performed_by__full_name"]
     raw_id_fields = ["product", "performed_by", "order"]
+    # Butun jadval bo'yicha COUNT(*) qilinmasin
+    show_full_result_count = False
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ["id", "product", "quantity", "source", "taken_at"]
+    list_filter = ["source", "taken_at"]
+    search_fields = ["product__name"]
+    raw_id_fields = ["product"]
+    readonly_fields = ["product", "quantity", "source", "taken_at"]
+
+
+@admin.register(TransactionArchive)
+class TransactionArchiveAdmin(admin.ModelAdmin):
+    list_display = ["period_start", "period_end", "rows", "path", "archived_at"]
+    readonly_fields = ["period_start", "period_end", "rows", "path", "archived_at"]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ["key", "value", "verified_at"]
+    readonly_fields = ["key", "value", "verified_at"]
+    actions = ["verify"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Haqiqiy son bilan tekshirish")
+    def verify(self, request, queryset):
+        for counter in queryset:
+            verify_counter(counter.key)
+        self.message_user(request, f"{queryset.count()} ta hisoblagich tekshirildi")
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "chat_id",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+        "sent_at",
+    ]
+    list_filter = ["status", "created_at"]
+    search_fields = ["chat_id", "text"]
+    readonly_fields = ["created_at", "sent_at", "last_error"]
+    actions = ["requeue"]
+
+    @admin.action(description="Qayta yuborish")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=NotificationStatus.SENT).update(
+            status=NotificationStatus.PENDING,
+            attempts=0,
+            # Oldingi backoff kutilmasin - darhol yuboriladi
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} ta xabar qayta navbatga qo'yildi")
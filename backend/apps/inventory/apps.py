@@ -5,3 +5,6 @@ class InventoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.inventory"
     verbose_name = "Ombor"
+
+    def ready(self):
+        from apps.inventory import signals  # noqa: F401
@@ -0,0 +1,286 @@
+"""Bot Application'ini yaratish va handlerlarni ro'yxatdan o'tkazish
+
+Polling (``bot_runner.py``) va webhook (ASGI) rejimlari bir xil
+Application konfiguratsiyasidan foydalanadi.
+"""
+
+from typing import Optional
+
+from django.conf import settings
+from telegram import Update
+from telegram.ext import (
+    Application,
+    ContextTypes,
+    MessageHandler,
+    filters,
+)
+from telegram.request import BaseRequest
+
+# Bot handlerlarini import qilish
+from apps.inventory.bot.handlers import (
+    # Common
+    start_handler,
+    help_handler,
+    list_handler,
+    cancel_handler,
+    # Warehouse
+    add_product_handler,
+    orders_handler,
+    give_order_handler,
+    history_handler,
+    categories_handler,
+    products_handler,
+    stock_document_handler,
+    # Requester
+    order_handler,
+    my_orders_handler,
+    # Admin
+    users_handler,
+)
+from apps.inventory.models import UserRole
+from apps.inventory.bot.handlers.common import cancel_callback, noop_callback
+from apps.inventory.bot.handlers.warehouse import (
+    view_order_callback,
+    back_to_orders_callback,
+    complete_order_callback,
+    cancel_order_callback,
+    batch_orders_callback,
+    batch_toggle_callback,
+    batch_complete_callback,
+    complete_product_orders_callback,
+)
+from apps.inventory.bot.handlers.admin import (
+    users_page_callback,
+    user_detail_callback,
+    back_to_users_callback,
+    set_role_callback,
+    block_user_callback,
+    unblock_user_callback,
+)
+from apps.inventory.bot.handlers.requester import my_order_callback
+from apps.inventory.bot.keyboards import get_main_menu_keyboard
+from apps.inventory.bot.auth import BotContext, USER_RESOLVER_GROUP, user_resolver
+from apps.inventory.bot.invalidation import (
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from apps.inventory.bot.outbox import start_outbox_worker, stop_outbox_worker
+from apps.inventory.bot.persistence import DjangoPersistence
+from apps.inventory.bot.profiles import profile_writer
+from apps.inventory.bot.processing import ChatOrderedUpdateProcessor
+from apps.inventory.bot.ratelimit import OutboundRateLimiter
+from apps.inventory.bot.router import CallbackRouter
+
+
+# ============ Menu Button Handlers ============
+
+
+async def menu_list_handler(update: Update, context):
+    """Ro'yxat tugmasi"""
+    from apps.inventory.bot.handlers.common import list_command
+
+    return await list_command(update, context)
+
+
+async def menu_my_orders_handler(update: Update, context):
+    """Mening zakaslarim tugmasi"""
+    from apps.inventory.bot.handlers.requester import my_orders_command
+
+    return await my_orders_command(update, context)
+
+
+async def menu_orders_handler(update: Update, context):
+    """Kutilayotgan zakaslar tugmasi"""
+    from apps.inventory.bot.handlers.warehouse import orders_command
+
+    return await orders_command(update, context)
+
+
+async def menu_history_handler(update: Update, context):
+    """Tarix tugmasi"""
+    from apps.inventory.bot.handlers.warehouse import history_command
+
+    return await history_command(update, context)
+
+
+async def menu_categories_handler(update: Update, context):
+    """Kategoriyalar tugmasi"""
+    from apps.inventory.bot.handlers.warehouse import categories_command
+
+    return await categories_command(update, context)
+
+
+async def menu_products_handler(update: Update, context):
+    """Mahsulotlar tugmasi"""
+    from apps.inventory.bot.handlers.warehouse import products_command
+
+    return await products_command(update, context)
+
+
+async def menu_users_handler(update: Update, context):
+    """Foydalanuvchilar tugmasi"""
+    from apps.inventory.bot.handlers.admin import users_command
+
+    return await users_command(update, context)
+
+
+async def unknown_command(update: Update, context):
+    """Noma'lum buyruq"""
+    user = context.db_user
+    await update.message.reply_text(
+        "❓ Noma'lum buyruq.\n\nYordam uchun: /help",
+        reply_markup=get_main_menu_keyboard(user.role),
+    )
+
+
+async def start_background_tasks(application, digest: bool = True) -> None:
+    """Bildirishnomalar worker'i va kesh invalidatsiyasini ishga tushirish"""
+    await start_outbox_worker(application, digest=digest)
+    await start_invalidation_listener(application)
+
+
+async def stop_background_tasks(application) -> None:
+    await stop_invalidation_listener(application)
+    await stop_outbox_worker(application)
+    await profile_writer.flush()
+
+
+def build_callback_router() -> CallbackRouter:
+    """Suhbatdan tashqaridagi barcha inline tugmalar"""
+    router = CallbackRouter()
+
+    # Orders
+    router.add("view_order", view_order_callback, int)
+    router.add("complete_order", complete_order_callback, int)
+    router.add("cancel_order", cancel_order_callback, int)
+    router.add("back_to_orders", back_to_orders_callback)
+    router.add("batch_orders", batch_orders_callback)
+    router.add("batch_toggle", batch_toggle_callback, int)
+    router.add("batch_complete", batch_complete_callback)
+    router.add("complete_product_orders", complete_product_orders_callback, int)
+
+    # Users
+    router.add("users_page", users_page_callback, int)
+    router.add("user", user_detail_callback, int)
+    router.add("back_to_users", back_to_users_callback)
+    router.add("set_role", set_role_callback, int, UserRole)
+    router.add("block_user", block_user_callback, int)
+    router.add("unblock_user", unblock_user_callback, int)
+
+    # My orders
+    router.add("my_order", my_order_callback, int)
+
+    # Umumiy
+    router.add("cancel", cancel_callback)
+    router.add("no_orders", noop_callback)
+
+    return router
+
+
+def build_application(
+    token: str,
+    updater: bool = True,
+    shards: int = 1,
+    request: Optional[BaseRequest] = None,
+    rate_limit: bool = True,
+) -> Application:
+    """Handlerlari ro'yxatdan o'tgan Application yaratish
+
+    ``updater=False`` - update'lar tashqaridan (webhook) beriladi.
+    ``shards`` - bir xil token bilan ishlayotgan jarayonlar soni (umumiy
+    yuborish chegarasi ular orasida bo'linadi).
+    ``request`` va ``rate_limit=False`` - Telegramsiz o'lchash uchun
+    (``bot_shard_benchmark``).
+    """
+    builder = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(
+            ChatOrderedUpdateProcessor(settings.BOT_CONCURRENT_UPDATES)
+        )
+        .persistence(
+            DjangoPersistence(
+                flush_interval=settings.BOT_PERSISTENCE_FLUSH_INTERVAL,
+                max_loss_window=settings.BOT_PERSISTENCE_MAX_LOSS_WINDOW,
+            )
+        )
+        # run_polling uchun; webhook va sharding rejimida qo'lda chaqiriladi
+        .post_init(start_background_tasks)
+        .post_stop(stop_background_tasks)
+        .context_types(ContextTypes(context=BotContext))
+    )
+    if rate_limit:
+        builder = builder.rate_limiter(
+            OutboundRateLimiter(
+                global_rate=settings.BOT_RATE_LIMIT_GLOBAL / shards,
+                chat_rate=settings.BOT_RATE_LIMIT_PER_CHAT,
+                chat_burst=settings.BOT_RATE_LIMIT_CHAT_BURST,
+                max_retries=settings.BOT_SEND_MAX_RETRIES,
+            )
+        )
+    if request is not None:
+        builder = builder.request(request)
+    if not updater:
+        builder = builder.updater(None)
+    application = builder.build()
+
+    # ============ Handlers qo'shish ============
+
+    # Foydalanuvchini aniqlash (har bir update uchun bir marta, hammasidan oldin)
+    application.add_handler(user_resolver, group=USER_RESOLVER_GROUP)
+
+    # Conversation handlers (birinchi navbatda)
+    application.add_handler(add_product_handler)  # /add
+    application.add_handler(order_handler)  # /order
+
+    # Command handlers
+    application.add_handler(start_handler)  # /start
+    application.add_handler(help_handler)  # /help
+    application.add_handler(list_handler)  # /list
+    application.add_handler(cancel_handler)  # /cancel
+    application.add_handler(orders_handler)  # /orders
+    application.add_handler(give_order_handler)  # /give
+    application.add_handler(history_handler)  # /history
+    application.add_handler(categories_handler)  # /categories
+    application.add_handler(products_handler)  # /products
+    application.add_handler(my_orders_handler)  # /myorders
+    application.add_handler(users_handler)  # /users
+
+    # CSV/XLSX fayl orqali kirim
+    application.add_handler(stock_document_handler)
+
+    # Menu button handlers
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^📋 Ro'yxat$"), menu_list_handler)
+    )
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^📝 Mening zakaslarim$"), menu_my_orders_handler)
+    )
+    application.add_handler(
+        MessageHandler(
+            filters.Regex(r"^📊 Kutilayotgan zakaslar$"), menu_orders_handler
+        )
+    )
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^📤 Zakas berish$"), menu_orders_handler)
+    )
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^📜 Tarix$"), menu_history_handler)
+    )
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^📁 Kategoriyalar$"), menu_categories_handler)
+    )
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^📦 Mahsulotlar$"), menu_products_handler)
+    )
+    application.add_handler(
+        MessageHandler(filters.Regex(r"^👥 Foydalanuvchilar$"), menu_users_handler)
+    )
+
+    # Callback handlers (prefiks bo'yicha bitta router)
+    application.add_handler(build_callback_router())
+
+    # Unknown commands
+    application.add_handler(MessageHandler(filters.COMMAND, unknown_command))
+
+    return application
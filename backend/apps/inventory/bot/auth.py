@@ -0,0 +1,156 @@
+"""Update'ni qayta ishlashdan oldin foydalanuvchini aniqlash
+
+``user_resolver`` -1 guruhda, barcha handlerlardan oldin ishlaydi: Telegram
+foydalanuvchisini bir marta (``user_cache`` orqali, odatda bazasiz) topadi,
+bloklanganlarni to'xtatadi va ``context.db_user`` ga yengil ``BotUser``
+obyektini qo'yadi. Handlerlar va dekoratorlar shu obyektdan foydalanadi.
+"""
+
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS
+from telegram import Update
+from telegram.ext import (
+    Application,
+    ApplicationHandlerStop,
+    CallbackContext,
+    ExtBot,
+    TypeHandler,
+)
+
+from apps.inventory.models import TelegramUser, UserRole
+from apps.inventory.bot import repositories
+from apps.inventory.bot.cache import user_cache
+from apps.inventory.bot.profiles import profile_writer
+
+
+class BotUser:
+    """Handlerlar uchun ``TelegramUser`` ning yengil nusxasi"""
+
+    __slots__ = ("id", "telegram_id", "username", "full_name", "role", "is_active")
+
+    def __init__(
+        self,
+        id: int,
+        telegram_id: int,
+        username: Optional[str],
+        full_name: str,
+        role: str,
+        is_active: bool,
+    ):
+        self.id = id
+        self.telegram_id = telegram_id
+        self.username = username
+        self.full_name = full_name
+        self.role = role
+        self.is_active = is_active
+
+    @classmethod
+    def from_model(cls, user: TelegramUser) -> "BotUser":
+        return cls(*(getattr(user, name) for name in cls.__slots__))
+
+    def as_model(self) -> TelegramUser:
+        """Bazaga murojaatsiz ``TelegramUser`` (ForeignKey'ga berish uchun)"""
+        return TelegramUser.from_db(
+            DEFAULT_DB_ALIAS,
+            list(self.__slots__),
+            [getattr(self, name) for name in self.__slots__],
+        )
+
+    def with_profile(self, username: Optional[str], full_name: Optional[str]):
+        """Telegram profilining yangi qiymatlari bilan nusxa"""
+        return BotUser(
+            self.id,
+            self.telegram_id,
+            username or self.username,
+            full_name or self.full_name,
+            self.role,
+            self.is_active,
+        )
+
+    def get_role_display(self) -> str:
+        return UserRole(self.role).label
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN
+
+    @property
+    def is_warehouse(self) -> bool:
+        return self.role in (UserRole.ADMIN, UserRole.WAREHOUSE)
+
+    @property
+    def is_requester(self) -> bool:
+        return self.role == UserRole.REQUESTER
+
+    def __repr__(self) -> str:
+        return f"BotUser(telegram_id={self.telegram_id}, role={self.role})"
+
+
+class BotContext(CallbackContext[ExtBot, dict, dict, dict]):
+    """``db_user`` - ``user_resolver`` aniqlagan foydalanuvchi"""
+
+    def __init__(self, application: Application, chat_id=None, user_id=None):
+        super().__init__(application, chat_id=chat_id, user_id=user_id)
+        self.db_user: Optional[BotUser] = None
+
+
+def _profile_changed(user: BotUser, username, full_name) -> bool:
+    return bool(
+        (username and user.username != username)
+        or (full_name and user.full_name != full_name)
+    )
+
+
+async def get_or_create_user(update: Update) -> BotUser:
+    """Telegram foydalanuvchisini olish yoki yaratish
+
+    Foydalanuvchi ``user_cache`` da bo'lsa, bazaga murojaat qilinmaydi.
+    Telegram profili o'zgargan bo'lsa, yangi qiymat keshga darhol qo'yiladi,
+    bazaga esa ``profile_writer`` orqali keyinroq yoziladi. O'qish paytida
+    kesh tozalangan bo'lsa (rol o'zgardi, bloklandi), qiymat keshlanmaydi.
+    """
+    telegram_user = update.effective_user
+    username = telegram_user.username
+    full_name = telegram_user.full_name or telegram_user.first_name
+
+    generation = user_cache.generation
+    user = cached = user_cache.get(telegram_user.id)
+    if user is None:
+        user = BotUser.from_model(
+            await repositories.get_or_create_user(
+                telegram_user.id, username, full_name
+            )
+        )
+    if _profile_changed(user, username, full_name):
+        user = user.with_profile(username, full_name)
+        profile_writer.queue(telegram_user.id, username, full_name)
+    if user is not cached:
+        user_cache.set(telegram_user.id, user, generation)
+    return user
+
+
+async def deny(update: Update, text: str) -> None:
+    """Ruxsat yo'qligi haqida xabar (buyruq yoki inline tugma)"""
+    if update.callback_query:
+        await update.callback_query.answer(text, show_alert=True)
+    elif update.effective_message:
+        await update.effective_message.reply_text(text)
+
+
+async def resolve_user(update: Update, context: BotContext) -> None:
+    """Foydalanuvchini aniqlash va bloklanganlarni to'xtatish"""
+    if update.effective_user is None:
+        return
+
+    user = await get_or_create_user(update)
+    if not user.is_active:
+        await deny(update, "⛔ Sizning hisobingiz bloklangan. Admin bilan bog'laning.")
+        raise ApplicationHandlerStop
+
+    context.db_user = user
+
+
+# Barcha handlerlardan oldin (guruh -1) ro'yxatdan o'tkaziladi
+USER_RESOLVER_GROUP = -1
+user_resolver = TypeHandler(Update, resolve_user)
@@ -0,0 +1,109 @@
+"""Bot jarayoni ichidagi keshlar
+
+Har bir update'da bazaga murojaat qilmaslik uchun tez-tez o'qiladigan, kam
+o'zgaradigan ma'lumotlar xotirada ``ttl`` soniya saqlanadi. O'zgarganda
+kesh signal (shu jarayon) va Postgres NOTIFY (boshqa jarayonlar,
+``invalidation.py``) orqali tozalanadi; TTL - NOTIFY yetib kelmagan holat
+uchun yuqori chegara.
+
+Bazadan o'qish va keshga yozish orasida tozalash bo'lsa, o'qilgan qiymat
+eskirgan bo'lishi mumkin: shuning uchun o'qishdan oldin ``generation``
+olinadi va ``set`` ga beriladi (``catalog.CatalogStore`` kabi).
+"""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from django.conf import settings
+
+from apps.inventory.bot import invalidation
+
+
+class TTLCache:
+    """Muddatli oddiy kesh (kalit -> qiymat)
+
+    ``generation`` har bir tozalashda oshadi. Tozalash commit'dan keyin
+    thread pool'dan ham chaqiriladi - shuning uchun qulf.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        """Qiymatni saqlash
+
+        ``generation`` - qiymat o'qilishidan oldingi ``self.generation``;
+        o'shandan beri tozalash bo'lgan bo'lsa, qiymat saqlanmaydi.
+        """
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if len(self._data) >= self.max_size:
+                self._evict()
+            self._data[key] = (time.monotonic() + self.ttl, value)
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+        if len(self._data) >= self.max_size:
+            # Muddati o'tmaganlar ham ko'p - eng eski yarmini o'chirish
+            oldest = sorted(self._data, key=lambda k: self._data[k][0])
+            for key in oldest[: len(oldest) // 2]:
+                del self._data[key]
+
+
+# telegram_id -> BotUser
+user_cache = TTLCache(settings.BOT_USER_CACHE_TTL)
+
+# STAFF_KEY -> faol admin va ombor hodimlarining telegram ID lari (tuple)
+STAFF_KEY = "staff"
+staff_cache = TTLCache(settings.BOT_USER_CACHE_TTL, max_size=1)
+
+# katalog versiyasi -> kategoriyalar ko'rinishi matni (versiya o'zgarsa eskiradi)
+category_overview_cache = TTLCache(settings.BOT_CATALOG_TTL, max_size=8)
+
+
+def _invalidate_user(key: str) -> None:
+    if key:
+        user_cache.invalidate(int(key))
+    else:
+        user_cache.clear()
+
+
+invalidation.subscribe("user", _invalidate_user)
+invalidation.subscribe("staff", lambda key: staff_cache.clear())
@@ -0,0 +1,255 @@
+"""Mahsulotlar katalogi: jarayon ichidagi snapshot
+
+Kategoriya va mahsulot klaviaturalari har bosishda bazani o'qimasligi uchun
+butun katalog xotirada ixcham (``__slots__``) yozuvlar ko'rinishida
+saqlanadi. Tuzilma (kategoriyalar, mahsulotlar, nomlar, tartib) o'zgarmaydi:
+yangi mahsulot yoki kategoriya, admin tahriri, o'chirishda snapshot tashlab
+yuboriladi va keyingi murojaatda ikki so'rov bilan qayta quriladi. Qoldiq
+o'zgarishlari (kirim, chiqim, band qilish) esa commit'dan keyin mahsulot
+yozuviga joyida qo'llanadi.
+
+Har bir o'zgarish ``Catalog.version`` ni oshiradi - katalogdan hosil
+qilingan ma'lumotlarni shu raqam bo'yicha keshlash mumkin. Boshqa
+jarayonlarga o'zgarishlar ``invalidation`` orqali yetkaziladi;
+``BOT_CATALOG_TTL`` - NOTIFY yetib kelmagan holat uchun yuqori chegara.
+"""
+
+import itertools
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.inventory.models import Category, Product
+from apps.inventory.bot import invalidation
+from apps.inventory.bot.db import database_sync_to_async
+
+# Katalog versiyalari jarayon ichida takrorlanmaydi (qayta qurilganda ham)
+_versions = itertools.count(1)
+
+
+class CatalogCategory:
+    """Kategoriya yozuvi (``products`` - nomi bo'yicha tartiblangan)"""
+
+    __slots__ = ("id", "name", "products")
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+        self.products: Tuple["CatalogProduct", ...] = ()
+
+
+class CatalogProduct:
+    """Mahsulot yozuvi: ``Product`` ning bot ro'yxatlari uchun kerakli qismi"""
+
+    __slots__ = (
+        "id",
+        "name",
+        "category",
+        "unit",
+        "min_quantity",
+        "quantity",
+        "reserved_quantity",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        category: CatalogCategory,
+        unit: str,
+        min_quantity: Decimal,
+        quantity: Decimal,
+        reserved_quantity: Decimal,
+    ):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.unit = unit
+        self.min_quantity = min_quantity
+        self.quantity = quantity
+        self.reserved_quantity = reserved_quantity
+
+    @property
+    def category_id(self) -> int:
+        return self.category.id
+
+    @property
+    def is_low_stock(self) -> bool:
+        return self.quantity <= self.min_quantity and self.min_quantity > 0
+
+    @property
+    def available_quantity(self) -> Decimal:
+        return self.quantity - self.reserved_quantity
+
+
+class Catalog:
+    """Katalog snapshoti (kategoriyalar nomi, mahsulotlar kategoriya va nomi bo'yicha)"""
+
+    __slots__ = ("version", "categories", "products", "_categories", "_products")
+
+    def __init__(self, categories: Iterable[CatalogCategory]):
+        self.version = next(_versions)
+        self.categories = tuple(categories)
+        self.products = tuple(
+            product for category in self.categories for product in category.products
+        )
+        self._categories: Dict[int, CatalogCategory] = {c.id: c for c in self.categories}
+        self._products: Dict[int, CatalogProduct] = {p.id: p for p in self.products}
+
+    def category(self, category_id: int) -> Optional[CatalogCategory]:
+        return self._categories.get(category_id)
+
+    def product(self, product_id: int) -> Optional[CatalogProduct]:
+        return self._products.get(product_id)
+
+    def products_in(self, category_id: int) -> Tuple[CatalogProduct, ...]:
+        category = self._categories.get(category_id)
+        return category.products if category is not None else ()
+
+
+def build_catalog() -> Catalog:
+    """Katalogni bazadan qurish (ikki so'rov, tartib - bazaniki)"""
+    categories = [
+        CatalogCategory(category_id, name)
+        for category_id, name in Category.objects.values_list("id", "name")
+    ]
+    by_id = {category.id: category for category in categories}
+    products: Dict[int, List[CatalogProduct]] = {}
+    for row in Product.objects.order_by("name").values_list(
+        "id",
+        "name",
+        "category_id",
+        "unit",
+        "min_quantity",
+        "quantity",
+        "reserved_quantity",
+    ):
+        product_id, name, category_id, *stock = row
+        category = by_id.get(category_id)
+        if category is not None:
+            products.setdefault(category_id, []).append(
+                CatalogProduct(product_id, name, category, *stock)
+            )
+    for category in categories:
+        category.products = tuple(products.get(category.id, ()))
+    return Catalog(categories)
+
+
+class CatalogStore:
+    """Jarayondagi yagona katalog snapshoti
+
+    ``generation`` har bir o'zgarishda oshadi: qurish paytida o'zgarish
+    bo'lgan bo'lsa, qurilgan katalog saqlanmaydi (eskirgan bo'lishi mumkin).
+    Qoldiqlar thread pool'dagi commit'lardan ham yangilanadi - shuning uchun qulf.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._catalog: Optional[Catalog] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self) -> Optional[Catalog]:
+        catalog = self._catalog
+        if catalog is None or self._expires_at < time.monotonic():
+            return None
+        return catalog
+
+    def set(self, catalog: Catalog, generation: int) -> bool:
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._catalog = catalog
+            self._expires_at = time.monotonic() + self.ttl
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._catalog = None
+
+    def apply_stock(
+        self, product_id: int, quantity: Decimal, reserved_quantity: Decimal
+    ) -> None:
+        """Mahsulot qoldig'ining yangi qiymatlarini joyida yozish"""
+        with self._lock:
+            self._generation += 1
+            catalog = self._catalog
+            if catalog is None:
+                return
+            product = catalog.product(product_id)
+            if product is None:
+                # Katalogda yo'q mahsulot - tuzilma eskirgan
+                self._catalog = None
+                return
+            product.quantity = quantity
+            product.reserved_quantity = reserved_quantity
+            catalog.version = next(_versions)
+
+
+catalog_store = CatalogStore(settings.BOT_CATALOG_TTL)
+
+_load_catalog = database_sync_to_async(build_catalog)
+
+
+async def get_catalog() -> Catalog:
+    """Joriy katalog (eskirgan yoki yo'q bo'lsa - bazadan quriladi)"""
+    catalog = catalog_store.get()
+    if catalog is None:
+        generation = catalog_store.generation
+        catalog = await _load_catalog()
+        catalog_store.set(catalog, generation)
+    return catalog
+
+
+async def catalog_version() -> int:
+    """Katalogdan hosil qilingan ma'lumotlar keshi uchun kalit"""
+    return (await get_catalog()).version
+
+
+# ============ Changes ============
+
+
+def catalog_changed() -> None:
+    """Katalog tuzilmasi o'zgardi (joriy tranzaksiya ichida chaqiriladi)"""
+    transaction.on_commit(catalog_store.clear)
+    invalidation.publish("catalog")
+
+
+def stock_changed(
+    product_id: int, quantity: Decimal, reserved_quantity: Decimal
+) -> None:
+    """Mahsulot qoldig'ining yangi qiymatlari (joriy tranzaksiya ichida)
+
+    O'zgarish farqi emas, yangi qiymat yuboriladi - xabar qayta kelsa yoki
+    katalog shu o'zgarish bilan qurilgan bo'lsa ham natija to'g'ri.
+    """
+    transaction.on_commit(
+        lambda: catalog_store.apply_stock(product_id, quantity, reserved_quantity)
+    )
+    invalidation.publish("stock", f"{product_id}:{quantity}:{reserved_quantity}")
+
+
+def _apply_stock_message(key: str) -> None:
+    if not key:
+        catalog_store.clear()
+        return
+    product_id, quantity, reserved_quantity = key.split(":")
+    catalog_store.apply_stock(
+        int(product_id), Decimal(quantity), Decimal(reserved_quantity)
+    )
+
+
+invalidation.subscribe("catalog", lambda key: catalog_store.clear())
+invalidation.subscribe("stock", _apply_stock_message)
@@ -0,0 +1,33 @@
+"""Bot uchun asinxron ma'lumotlar bazasi yordamchilari
+
+Handlerlar event loop ichida ishlaydi, Django ORM esa sinxron. Har bir ORM
+chaqiruvi alohida, chegaralangan thread pool'da bajariladi - sekin so'rov
+boshqa foydalanuvchilarning update'larini to'xtatib qo'ymaydi.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.BOT_DB_POOL_SIZE, thread_name_prefix="bot-db"
+)
+
+
+def database_sync_to_async(func):
+    """Sinxron ORM funksiyasini bot thread pool'ida ishlaydigan korutinaga aylantirish"""
+
+    @wraps(func)
+    def inner(*args, **kwargs):
+        # Eskirgan yoki uzilgan ulanishlarni tozalash (har bir thread o'z ulanishiga ega)
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(inner, thread_sensitive=False, executor=db_executor)
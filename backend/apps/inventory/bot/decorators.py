@@ -1,123 +1,45 @@
-"""Rol tekshirish dekoratorlari"""
+"""Rol tekshirish dekoratorlari
 
-from functools import wraps
-from telegram import Update
-from telegram.ext import ContextTypes
-
-from apps.inventory.models import TelegramUser, UserRole
-
-
-def get_or_create_user(update: Update) -> TelegramUser:
-    """Telegram foydalanuvchisini olish yoki yaratish"""
-    telegram_user = update.effective_user
-    user, created = TelegramUser.objects.get_or_create(
-        telegram_id=telegram_user.id,
-        defaults={
-            "username": telegram_user.username,
-            "full_name": telegram_user.full_name
-            or telegram_user.first_name
-            or "Noma'lum",
-        },
-    )
-
-    # Agar mavjud bo'lsa, ma'lumotlarni yangilash
-    if not created:
-        updated = False
-        if telegram_user.username and user.username != telegram_user.username:
-            user.username = telegram_user.username
-            updated = True
-        if telegram_user.full_name and user.full_name != telegram_user.full_name:
-            user.full_name = telegram_user.full_name
-            updated = True
-        if updated:
-            user.save()
-
-    return user
-
-
-def authenticated(func):
-    """Foydalanuvchi ro'yxatdan o'tganligini tekshirish"""
-
-    @wraps(func)
-    async def wrapper(
-        update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
-    ):
-        user = get_or_create_user(update)
-
-        if not user.is_active:
-            await update.message.reply_text(
-                "⛔ Sizning hisobingiz bloklangan. Admin bilan bog'laning."
-            )
-            return
-
-        context.user_data["db_user"] = user
-        return await func(update, context, *args, **kwargs)
+Foydalanuvchi ``auth.user_resolver`` da (har bir update uchun bir marta)
+aniqlanadi, bloklanganlar o'sha yerda to'xtatiladi. Dekoratorlar faqat
+``context.db_user`` ning rolini tekshiradi.
+"""
 
-    return wrapper
-
-
-def admin_required(func):
-    """Faqat admin uchun"""
-
-    @wraps(func)
-    async def wrapper(
-        update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
-    ):
-        user = get_or_create_user(update)
-
-        if not user.is_active:
-            await update.message.reply_text("⛔ Sizning hisobingiz bloklangan.")
-            return
-
-        if not user.is_admin:
-            await update.message.reply_text("⛔ Bu buyruq faqat admin uchun mavjud.")
-            return
-
-        context.user_data["db_user"] = user
-        return await func(update, context, *args, **kwargs)
-
-    return wrapper
-
-
-def warehouse_required(func):
-    """Faqat ombor hodimi yoki admin uchun"""
+from functools import wraps
+from typing import Callable
 
-    @wraps(func)
-    async def wrapper(
-        update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
-    ):
-        user = get_or_create_user(update)
+from telegram import Update
 
-        if not user.is_active:
-            await update.message.reply_text("⛔ Sizning hisobingiz bloklangan.")
-            return
+from apps.inventory.bot.auth import BotContext, BotUser, deny
 
-        if not user.is_warehouse:
-            await update.message.reply_text(
-                "⛔ Bu buyruq faqat ombor hodimlari uchun mavjud."
-            )
-            return
 
-        context.user_data["db_user"] = user
-        return await func(update, context, *args, **kwargs)
+def _role_required(allowed: Callable[[BotUser], bool], message: str):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(update: Update, context: BotContext, *args, **kwargs):
+            user = context.db_user
+            if user is None or not allowed(user):
+                await deny(update, message)
+                return
+            return await func(update, context, *args, **kwargs)
 
-    return wrapper
+        return wrapper
 
+    return decorator
 
-def requester_required(func):
-    """Faqat zakas qiluvchi uchun (aslida barcha foydalanuvchilar)"""
 
-    @wraps(func)
-    async def wrapper(
-        update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
-    ):
-        user = get_or_create_user(update)
+# Foydalanuvchi ro'yxatdan o'tganligini tekshirish
+authenticated = _role_required(lambda user: True, "⛔ Foydalanuvchi aniqlanmadi.")
 
-        if not user.is_active:
-            await update.message.reply_text("⛔ Sizning hisobingiz bloklangan.")
-            return
+# Faqat admin uchun
+admin_required = _role_required(
+    lambda user: user.is_admin, "⛔ Bu buyruq faqat admin uchun mavjud."
+)
 
-        context.user_data["db_user"] = user
-        return await func(update, context, *args, **kwargs)
+# Faqat ombor hodimi yoki admin uchun
+warehouse_required = _role_required(
+    lambda user: user.is_warehouse, "⛔ Bu buyruq faqat ombor hodimlari uchun mavjud."
+)
 
-    return wrapper
+# Faqat zakas qiluvchi uchun (aslida barcha foydalanuvchilar)
+requester_required = authenticated
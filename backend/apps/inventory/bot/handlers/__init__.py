@@ -6,6 +6,7 @@ from .warehouse import (
     history_handler,
     categories_handler,
     products_handler,
+    stock_document_handler,
 )
 from .requester import order_handler, my_orders_handler
 from .admin import users_handler, set_role_handler
@@ -23,6 +24,7 @@ __all__ = [
     "history_handler",
     "categories_handler",
     "products_handler",
+    "stock_document_handler",
     # Requester
     "order_handler",
     "my_orders_handler",
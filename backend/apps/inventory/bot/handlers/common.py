@@ -9,8 +9,12 @@ from telegram.ext import (
     ConversationHandler,
 )
 
-from apps.inventory.models import TelegramUser, UserRole, Product
-from apps.inventory.bot.decorators import authenticated, get_or_create_user
+from apps.inventory.bot.auth import BotUser
+from apps.inventory.bot.decorators import authenticated
+from apps.inventory.bot.repositories import (
+    promote_first_user,
+    list_products_with_category,
+)
 from apps.inventory.bot.keyboards import get_main_menu_keyboard
 from apps.inventory.bot.utils import format_product_list
 
@@ -18,13 +22,11 @@ from apps.inventory.bot.utils import format_product_list
 @authenticated
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Botni ishga tushirish"""
-    user: TelegramUser = context.user_data["db_user"]
+    user: BotUser = context.db_user
 
     # Birinchi foydalanuvchini admin qilish
-    if TelegramUser.objects.count() == 1 and user.role == UserRole.REQUESTER:
-        user.role = UserRole.ADMIN
-        user.save()
-        context.user_data["db_user"] = user
+    user = await promote_first_user(user)
+    context.db_user = user
 
     role_text = user.get_role_display()
 
@@ -66,7 +68,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @authenticated
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Yordam"""
-    user: TelegramUser = context.user_data["db_user"]
+    user: BotUser = context.db_user
 
     help_text = """
 📚 <b>Yordam</b>
@@ -90,6 +92,8 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /history - Kirim-chiqim tarixi
 /categories - Kategoriyalarni boshqarish
 /products - Mahsulotlarni boshqarish
+📎 CSV/XLSX fayl yuborish - ko'p mahsulotni birdan kirim qilish
+(ustunlar: Kategoriya, Mahsulot, Miqdor, Birlik, Minimum)
 """
 
     if user.is_admin:
@@ -104,11 +108,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @authenticated
 async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mahsulotlar ro'yxati"""
-    products = (
-        Product.objects.all()
-        .select_related("category")
-        .order_by("category__name", "name")
-    )
+    products = await list_products_with_category()
     text = format_product_list(products)
 
     await update.message.reply_text(text, parse_mode="HTML")
@@ -116,11 +116,10 @@ async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Amalni bekor qilish"""
-    user = get_or_create_user(update)
+    user = context.db_user
 
     # Context ma'lumotlarini tozalash
     context.user_data.clear()
-    context.user_data["db_user"] = user
 
     await update.message.reply_text(
         "❌ Amal bekor qilindi.", reply_markup=get_main_menu_keyboard(user.role)
@@ -133,14 +132,17 @@ async def cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    user = get_or_create_user(update)
     context.user_data.clear()
-    context.user_data["db_user"] = user
 
     await query.edit_message_text("❌ Bekor qilindi.")
     return ConversationHandler.END
 
 
+async def noop_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Amalsiz tugma (masalan, "zakaslar yo'q")"""
+    await update.callback_query.answer()
+
+
 # Handler yaratish
 start_handler = CommandHandler("start", start_command)
 help_handler = CommandHandler("help", help_command)
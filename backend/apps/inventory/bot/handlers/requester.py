@@ -10,17 +10,25 @@ from telegram.ext import (
     ConversationHandler,
 )
 
-from apps.inventory.models import Category, Product, Order, OrderStatus, TelegramUser
-from apps.inventory.bot.decorators import requester_required, get_or_create_user
+from apps.inventory.models import OrderStatus
+from apps.inventory.bot.auth import BotUser
+from apps.inventory.bot.decorators import requester_required
+from apps.inventory.bot.repositories import (
+    list_categories,
+    get_category,
+    list_products,
+    get_product,
+    create_order,
+    get_order,
+    list_user_orders,
+)
 from apps.inventory.bot.keyboards import (
     get_main_menu_keyboard,
     get_cancel_keyboard,
     get_categories_keyboard,
     get_products_keyboard,
-    get_my_orders_keyboard,
 )
 from apps.inventory.bot.utils import parse_quantity, format_order_info
-from apps.inventory.bot.notifications import notify_new_order
 
 
 # ============ Conversation States ============
@@ -38,9 +46,9 @@ from apps.inventory.bot.notifications import notify_new_order
 @requester_required
 async def order_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Zakas qilishni boshlash"""
-    categories = Category.objects.all()
+    categories = await list_categories()
 
-    if not categories.exists():
+    if not categories:
         await update.message.reply_text(
             "📭 Hozircha kategoriyalar yo'q. Ombor hodimidan mahsulot qo'shishni so'rang."
         )
@@ -49,7 +57,7 @@ async def order_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
         "📦 <b>Yangi zakas</b>\n\n📁 Kategoriyani tanlang:",
         parse_mode="HTML",
-        reply_markup=get_categories_keyboard("order_category"),
+        reply_markup=get_categories_keyboard(categories, "order_category"),
     )
     return ORDER_SELECT_CATEGORY
 
@@ -67,16 +75,16 @@ async def order_select_category(update: Update, context: ContextTypes.DEFAULT_TY
     context.user_data["order_category_id"] = category_id
 
     # Mahsulotlar borligini tekshirish
-    products = Product.objects.filter(category_id=category_id, quantity__gt=0)
+    products = await list_products(category_id)
 
-    if not products.exists():
+    if not any(product.available_quantity > 0 for product in products):
         await query.answer("Bu kategoriyada mavjud mahsulotlar yo'q.", show_alert=True)
         return ORDER_SELECT_CATEGORY
 
-    category = Category.objects.get(id=category_id)
+    category = await get_category(category_id)
     await query.edit_message_text(
         f"📁 Kategoriya: {category.name}\n\n📦 Mahsulotni tanlang:",
-        reply_markup=get_products_keyboard(category_id, "order_product"),
+        reply_markup=get_products_keyboard(products, "order_product", show_available=True),
     )
     return ORDER_SELECT_PRODUCT
 
@@ -91,16 +99,17 @@ async def order_select_product(update: Update, context: ContextTypes.DEFAULT_TYP
         return ConversationHandler.END
 
     if query.data == "back_to_categories":
+        categories = await list_categories()
         await query.edit_message_text(
             "📁 Kategoriyani tanlang:",
-            reply_markup=get_categories_keyboard("order_category"),
+            reply_markup=get_categories_keyboard(categories, "order_category"),
         )
         return ORDER_SELECT_CATEGORY
 
     product_id = int(query.data.split(":")[1])
-    product = Product.objects.get(id=product_id)
+    product = await get_product(product_id)
 
-    if product.quantity <= 0:
+    if product.available_quantity <= 0:
         await query.answer("Bu mahsulot tugagan!", show_alert=True)
         return ORDER_SELECT_PRODUCT
 
@@ -108,7 +117,7 @@ async def order_select_product(update: Update, context: ContextTypes.DEFAULT_TYP
 
     await query.edit_message_text(
         f"📦 <b>{product.name}</b>\n"
-        f"📊 Mavjud: {product.quantity} {product.unit}\n\n"
+        f"📊 Mavjud: {product.available_quantity} {product.unit}\n\n"
         f"Qancha miqdor kerak?",
         parse_mode="HTML",
     )
@@ -130,12 +139,12 @@ async def order_enter_quantity(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.message.reply_text(f"❌ {error}")
         return ORDER_ENTER_QUANTITY
 
-    product = Product.objects.get(id=context.user_data["order_product_id"])
+    product = await get_product(context.user_data["order_product_id"])
 
-    if quantity > product.quantity:
+    if quantity > product.available_quantity:
         await update.message.reply_text(
             f"❌ Yetarli mahsulot yo'q.\n"
-            f"📊 Mavjud: {product.quantity} {product.unit}\n\n"
+            f"📊 Mavjud: {product.available_quantity} {product.unit}\n\n"
             f"Boshqa miqdor kiriting:"
         )
         return ORDER_ENTER_QUANTITY
@@ -157,19 +166,23 @@ async def order_enter_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if text == "❌ Bekor qilish":
         return await cancel_order(update, context)
 
-    user = get_or_create_user(update)
-    product = Product.objects.get(id=context.user_data["order_product_id"])
+    user = context.db_user
     quantity = context.user_data["order_quantity"]
     note = None if text.lower() in ["yo'q", "yoq", "-", ""] else text
 
-    # Zakasni yaratish
-    order = Order.objects.create(
-        requester=user,
-        product=product,
-        quantity=quantity,
-        note=note,
-        status=OrderStatus.PENDING,
+    # Zakasni yaratish (mahsulot band qilinadi)
+    order, error = await create_order(
+        user, context.user_data["order_product_id"], quantity, note=note
     )
+    if order is None:
+        # Miqdor kiritilgandan keyin boshqa zakaslar band qilib ulgurgan
+        await update.message.reply_text(
+            f"❌ {error}\n\nZakas yaratilmadi, qaytadan urinib ko'ring: /order",
+            reply_markup=get_main_menu_keyboard(user.role),
+        )
+        context.user_data.clear()
+        return ConversationHandler.END
+    product = order.product
 
     await update.message.reply_text(
         f"✅ <b>Zakas qabul qilindi!</b>\n\n"
@@ -182,19 +195,14 @@ async def order_enter_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=get_main_menu_keyboard(user.role),
     )
 
-    # Ombor hodimlariga xabar
-    await notify_new_order(update.get_bot(), order, user)
-
     context.user_data.clear()
-    context.user_data["db_user"] = user
     return ConversationHandler.END
 
 
 async def cancel_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Zakasni bekor qilish"""
-    user = get_or_create_user(update)
+    user = context.db_user
     context.user_data.clear()
-    context.user_data["db_user"] = user
 
     await update.message.reply_text(
         "❌ Zakas bekor qilindi.", reply_markup=get_main_menu_keyboard(user.role)
@@ -208,9 +216,9 @@ async def cancel_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @requester_required
 async def my_orders_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mening zakaslarim"""
-    user: TelegramUser = context.user_data["db_user"]
+    user: BotUser = context.db_user
 
-    orders = Order.objects.filter(requester=user).select_related("product")[:10]
+    orders = await list_user_orders(user, limit=10)
 
     if not orders:
         await update.message.reply_text(
@@ -235,24 +243,21 @@ async def my_orders_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("\n".join(lines), parse_mode="HTML")
 
 
-async def my_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@requester_required
+async def my_order_callback(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, order_id: int
+):
     """Zakasni batafsil ko'rish"""
     query = update.callback_query
     await query.answer()
 
-    if query.data == "no_orders":
+    order = await get_order(order_id)
+    if order is None:
+        await query.edit_message_text("❌ Zakas topilmadi.")
         return
 
-    order_id = int(query.data.split(":")[1])
-
-    try:
-        order = Order.objects.select_related(
-            "product", "requester", "fulfilled_by"
-        ).get(id=order_id)
-        text = format_order_info(order)
-        await query.edit_message_text(text, parse_mode="HTML")
-    except Order.DoesNotExist:
-        await query.edit_message_text("❌ Zakas topilmadi.")
+    text = format_order_info(order)
+    await query.edit_message_text(text, parse_mode="HTML")
 
 
 # ============ Create Handlers ============
@@ -285,6 +290,8 @@ order_handler = ConversationHandler(
         CommandHandler("cancel", cancel_order),
         MessageHandler(filters.Regex(r"^❌ Bekor qilish$"), cancel_order),
     ],
+    name="order",
+    persistent=True,
 )
 
 my_orders_handler = CommandHandler("myorders", my_orders_command)
@@ -1,5 +1,7 @@
 """Ombor hodimi handlerlari"""
 
+import io
+
 from telegram import Update
 from telegram.ext import (
     ContextTypes,
@@ -10,16 +12,30 @@ from telegram.ext import (
     ConversationHandler,
 )
 
-from apps.inventory.models import (
-    Category,
-    Product,
-    Order,
-    Transaction,
-    OrderStatus,
-    TransactionType,
-    TelegramUser,
+from apps.inventory.bot.cache import category_overview_cache
+from apps.inventory.bot.catalog import catalog_version
+from apps.inventory.bot.decorators import warehouse_required
+from apps.inventory.bot.intake import IntakeError, format_intake_errors
+from apps.inventory.bot.repositories import (
+    list_categories,
+    list_categories_with_counts,
+    get_category,
+    get_or_create_category,
+    list_products,
+    list_products_with_category,
+    get_product,
+    create_product,
+    add_stock,
+    import_stock,
+    get_order,
+    list_pending_orders,
+    list_pending_orders_with_count,
+    complete_order,
+    complete_orders,
+    complete_product_orders,
+    cancel_order,
+    list_recent_transactions,
 )
-from apps.inventory.bot.decorators import warehouse_required, get_or_create_user
 from apps.inventory.bot.keyboards import (
     get_main_menu_keyboard,
     get_cancel_keyboard,
@@ -27,16 +43,17 @@ from apps.inventory.bot.keyboards import (
     get_categories_keyboard,
     get_products_keyboard,
     get_pending_orders_keyboard,
+    get_batch_orders_keyboard,
     get_order_actions_keyboard,
 )
 from apps.inventory.bot.utils import (
     parse_quantity,
-    add_product_stock,
-    remove_product_stock,
     format_order_info,
     format_transaction_history,
+    format_product_list,
+    format_batch_result,
+    format_category_overview,
 )
-from apps.inventory.bot.notifications import notify_low_stock
 
 
 # ============ Conversation States ============
@@ -62,8 +79,10 @@ from apps.inventory.bot.notifications import notify_low_stock
 @warehouse_required
 async def add_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mahsulot qo'shishni boshlash"""
+    categories = await list_categories()
     await update.message.reply_text(
-        "📁 Kategoriyani tanlang:", reply_markup=get_categories_keyboard("add_category")
+        "📁 Kategoriyani tanlang:",
+        reply_markup=get_categories_keyboard(categories, "add_category"),
     )
     return ADD_SELECT_CATEGORY
 
@@ -81,10 +100,11 @@ async def add_select_category(update: Update, context: ContextTypes.DEFAULT_TYPE
     category_id = int(data[1])
     context.user_data["category_id"] = category_id
 
-    category = Category.objects.get(id=category_id)
+    category = await get_category(category_id)
+    products = await list_products(category_id)
     await query.edit_message_text(
         f"📁 Kategoriya: {category.name}\n\n📦 Mahsulotni tanlang yoki yangi qo'shing:",
-        reply_markup=get_products_keyboard(category_id, "add_product"),
+        reply_markup=get_products_keyboard(products, "add_product"),
     )
     return ADD_SELECT_PRODUCT
 
@@ -102,15 +122,16 @@ async def add_new_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return ADD_NEW_CATEGORY
 
-    category, created = Category.objects.get_or_create(name=name)
+    category, created = await get_or_create_category(name)
     context.user_data["category_id"] = category.id
 
     if created:
         await update.message.reply_text(f"✅ '{name}' kategoriyasi yaratildi.")
 
+    products = await list_products(category.id)
     await update.message.reply_text(
         f"📦 Mahsulotni tanlang yoki yangi qo'shing:",
-        reply_markup=get_products_keyboard(category.id, "add_product"),
+        reply_markup=get_products_keyboard(products, "add_product"),
     )
     return ADD_SELECT_PRODUCT
 
@@ -123,9 +144,10 @@ async def add_select_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
     data = query.data.split(":")
 
     if query.data == "back_to_categories":
+        categories = await list_categories()
         await query.edit_message_text(
             "📁 Kategoriyani tanlang:",
-            reply_markup=get_categories_keyboard("add_category"),
+            reply_markup=get_categories_keyboard(categories, "add_category"),
         )
         return ADD_SELECT_CATEGORY
 
@@ -138,7 +160,7 @@ async def add_select_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return ADD_NEW_PRODUCT
 
     product_id = int(data[1])
-    product = Product.objects.get(id=product_id)
+    product = await get_product(product_id)
     context.user_data["product_id"] = product_id
     context.user_data["is_new_product"] = False
 
@@ -246,26 +268,18 @@ async def add_enter_min_quantity(update: Update, context: ContextTypes.DEFAULT_T
 
 async def complete_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Qo'shishni yakunlash"""
-    user = get_or_create_user(update)
+    user = context.db_user
     quantity = context.user_data["quantity"]
 
     if context.user_data.get("is_new_product"):
-        # Yangi mahsulot yaratish
-        product = Product.objects.create(
+        # Yangi mahsulot va kirim tranzaksiyasini yaratish
+        product = await create_product(
             name=context.user_data["new_product_name"],
             category_id=context.user_data["category_id"],
             quantity=quantity,
             unit=context.user_data["unit"],
             min_quantity=context.user_data.get("min_quantity", 0),
-        )
-
-        # Tranzaksiya yaratish
-        Transaction.objects.create(
-            product=product,
-            transaction_type=TransactionType.IN,
-            quantity=quantity,
-            performed_by=user,
-            note="Yangi mahsulot",
+            user=user,
         )
 
         message = (
@@ -276,10 +290,9 @@ async def complete_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
     else:
         # Mavjud mahsulotga qo'shish
-        product = Product.objects.get(id=context.user_data["product_id"])
-        old_quantity = product.quantity
-
-        add_product_stock(product, quantity, user)
+        product, old_quantity = await add_stock(
+            context.user_data["product_id"], quantity, user
+        )
 
         message = (
             f"✅ Mahsulot qo'shildi!\n\n"
@@ -294,15 +307,13 @@ async def complete_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
     context.user_data.clear()
-    context.user_data["db_user"] = user
     return ConversationHandler.END
 
 
 async def cancel_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Qo'shishni bekor qilish"""
-    user = get_or_create_user(update)
+    user = context.db_user
     context.user_data.clear()
-    context.user_data["db_user"] = user
 
     await update.message.reply_text(
         "❌ Bekor qilindi.", reply_markup=get_main_menu_keyboard(user.role)
@@ -316,148 +327,233 @@ async def cancel_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @warehouse_required
 async def orders_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Kutilayotgan zakaslar"""
-    pending_count = Order.objects.filter(status=OrderStatus.PENDING).count()
+    orders, pending_count = await list_pending_orders_with_count()
 
     text = f"📊 <b>Kutilayotgan zakaslar: {pending_count} ta</b>"
 
     await update.message.reply_text(
-        text, parse_mode="HTML", reply_markup=get_pending_orders_keyboard()
+        text, parse_mode="HTML", reply_markup=get_pending_orders_keyboard(orders)
     )
 
 
-async def view_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def _show_pending_orders(query, header: str = "") -> None:
+    """Xabarni kutilayotgan zakaslar ro'yxatiga almashtirish"""
+    orders, pending_count = await list_pending_orders_with_count()
+    await query.edit_message_text(
+        f"{header}📊 <b>Kutilayotgan zakaslar: {pending_count} ta</b>",
+        parse_mode="HTML",
+        reply_markup=get_pending_orders_keyboard(orders),
+    )
+
+
+@warehouse_required
+async def view_order_callback(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, order_id: int
+):
     """Zakasni ko'rish"""
     query = update.callback_query
     await query.answer()
 
-    if query.data == "no_orders":
-        return
+    order = await get_order(order_id)
 
-    if query.data == "back_to_orders":
-        pending_count = Order.objects.filter(status=OrderStatus.PENDING).count()
-        await query.edit_message_text(
-            f"📊 <b>Kutilayotgan zakaslar: {pending_count} ta</b>",
-            parse_mode="HTML",
-            reply_markup=get_pending_orders_keyboard(),
-        )
+    if order is None:
+        await query.edit_message_text("❌ Zakas topilmadi.")
         return
 
-    order_id = int(query.data.split(":")[1])
+    text = format_order_info(order)
+    await query.edit_message_text(
+        text, parse_mode="HTML", reply_markup=get_order_actions_keyboard(order_id, order.product_id)
+    )
 
-    try:
-        order = Order.objects.select_related("product", "requester").get(id=order_id)
-        text = format_order_info(order)
 
-        await query.edit_message_text(
-            text, parse_mode="HTML", reply_markup=get_order_actions_keyboard(order_id)
-        )
-    except Order.DoesNotExist:
-        await query.edit_message_text("❌ Zakas topilmadi.")
+@warehouse_required
+async def back_to_orders_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Zakaslar ro'yxatiga qaytish"""
+    query = update.callback_query
+    await query.answer()
+
+    await _show_pending_orders(query)
 
 
-async def complete_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@warehouse_required
+async def complete_order_callback(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, order_id: int
+):
     """Zakasni bajarish"""
     query = update.callback_query
-    user = get_or_create_user(update)
+    user = context.db_user
+    order = await get_order(order_id, pending_only=True)
 
-    order_id = int(query.data.split(":")[1])
+    if order is None:
+        await query.answer(
+            "❌ Zakas topilmadi yoki allaqachon bajarilgan.", show_alert=True
+        )
+        return
 
-    try:
-        order = Order.objects.select_related("product", "requester").get(
-            id=order_id, status=OrderStatus.PENDING
+    product = order.product
+
+    # Mahsulot yetarlimi tekshirish
+    if product.quantity < order.quantity:
+        await query.answer(
+            f"❌ Yetarli mahsulot yo'q! Mavjud: {product.quantity} {product.unit}",
+            show_alert=True,
         )
+        return
 
-        product = order.product
+    # Mahsulotni chiqarish va zakasni bajarish
+    success, error = await complete_order(order, user)
 
-        # Mahsulot yetarlimi tekshirish
-        if product.quantity < order.quantity:
-            await query.answer(
-                f"❌ Yetarli mahsulot yo'q! Mavjud: {product.quantity} {product.unit}",
-                show_alert=True,
-            )
-            return
+    if not success:
+        await query.answer(f"❌ {error}", show_alert=True)
+        return
 
-        # Mahsulotni chiqarish
-        success, transaction, error = remove_product_stock(
-            product, order.quantity, user, order=order
-        )
+    # Zakas beruvchiga va (kam qolgan bo'lsa) ombor hodimlariga xabar
+    # complete_order ichida outbox'ga yozilgan
+    await query.answer("✅ Zakas bajarildi!")
+
+    # Ro'yxatni yangilash
+    await _show_pending_orders(query, f"✅ Zakas #{order_id} bajarildi!\n\n")
 
-        if not success:
-            await query.answer(f"❌ {error}", show_alert=True)
-            return
-
-        # Zakasni bajarish
-        order.complete(user)
-
-        await query.answer("✅ Zakas bajarildi!")
-
-        # Zakas beruvchiga xabar
-        try:
-            await context.bot.send_message(
-                chat_id=order.requester.telegram_id,
-                text=f"✅ Sizning zakasngiz #{order.id} bajarildi!\n\n"
-                f"📦 {product.name}\n"
-                f"📊 Miqdor: {order.quantity} {product.unit}",
-            )
-        except Exception:
-            pass  # Foydalanuvchi botni bloklagan bo'lishi mumkin
-
-        # Kam qolgan bo'lsa ogohlantirish
-        if product.is_low_stock:
-            await notify_low_stock(context.bot, product)
-
-        # Ro'yxatni yangilash
-        pending_count = Order.objects.filter(status=OrderStatus.PENDING).count()
-        await query.edit_message_text(
-            f"✅ Zakas #{order_id} bajarildi!\n\n"
-            f"📊 <b>Kutilayotgan zakaslar: {pending_count} ta</b>",
-            parse_mode="HTML",
-            reply_markup=get_pending_orders_keyboard(),
-        )
 
-    except Order.DoesNotExist:
+@warehouse_required
+async def cancel_order_callback(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, order_id: int
+):
+    """Zakasni bekor qilish"""
+    query = update.callback_query
+    order = await get_order(order_id, pending_only=True)
+
+    if order is None:
+        await query.answer("❌ Zakas topilmadi.", show_alert=True)
+        return
+
+    # Zakas beruvchiga xabar outbox orqali yuboriladi
+    if not await cancel_order(order):
         await query.answer(
-            "❌ Zakas topilmadi yoki allaqachon bajarilgan.", show_alert=True
+            "❌ Zakas allaqachon bajarilgan yoki bekor qilingan.", show_alert=True
         )
+        return
 
+    await query.answer("❌ Zakas bekor qilindi!")
 
-async def cancel_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Zakasni bekor qilish"""
+    # Ro'yxatni yangilash
+    await _show_pending_orders(query, f"❌ Zakas #{order_id} bekor qilindi!\n\n")
+
+
+# ============ Batch Orders Handlers ============
+
+# Bir nechta zakasni tanlash ro'yxatidagi zakaslar soni
+BATCH_ORDERS_LIMIT = 50
+
+
+async def _show_batch_orders(query, context) -> None:
+    orders = await list_pending_orders(limit=BATCH_ORDERS_LIMIT)
+    await query.edit_message_text(
+        "☑️ <b>Bajariladigan zakaslarni tanlang:</b>",
+        parse_mode="HTML",
+        reply_markup=get_batch_orders_keyboard(
+            orders, context.user_data.get("batch_orders", [])
+        ),
+    )
+
+
+async def _show_batch_result(query, results) -> None:
+    await _show_pending_orders(query, f"{format_batch_result(results)}\n\n")
+
+
+@warehouse_required
+async def batch_orders_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Bir nechta zakasni tanlashni boshlash"""
     query = update.callback_query
+    await query.answer()
 
-    order_id = int(query.data.split(":")[1])
+    context.user_data["batch_orders"] = []
+    await _show_batch_orders(query, context)
 
-    try:
-        order = Order.objects.select_related("product", "requester").get(
-            id=order_id, status=OrderStatus.PENDING
-        )
 
-        order.cancel()
+@warehouse_required
+async def batch_toggle_callback(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, order_id: int
+):
+    """Zakasni tanlash / tanlovni olib tashlash"""
+    query = update.callback_query
+    await query.answer()
 
-        await query.answer("❌ Zakas bekor qilindi!")
+    selected = context.user_data.setdefault("batch_orders", [])
+    if order_id in selected:
+        selected.remove(order_id)
+    else:
+        selected.append(order_id)
+    await _show_batch_orders(query, context)
 
-        # Zakas beruvchiga xabar
-        try:
-            await context.bot.send_message(
-                chat_id=order.requester.telegram_id,
-                text=f"❌ Sizning zakasngiz #{order.id} bekor qilindi.\n\n"
-                f"📦 {order.product.name}\n"
-                f"📊 Miqdor: {order.quantity} {order.product.unit}",
-            )
-        except Exception:
-            pass
 
-        # Ro'yxatni yangilash
-        pending_count = Order.objects.filter(status=OrderStatus.PENDING).count()
-        await query.edit_message_text(
-            f"❌ Zakas #{order_id} bekor qilindi!\n\n"
-            f"📊 <b>Kutilayotgan zakaslar: {pending_count} ta</b>",
-            parse_mode="HTML",
-            reply_markup=get_pending_orders_keyboard(),
+@warehouse_required
+async def batch_complete_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Tanlangan zakaslarni bitta tranzaksiyada bajarish"""
+    query = update.callback_query
+    selected = context.user_data.get("batch_orders")
+
+    if not selected:
+        await query.answer("Hech qanday zakas tanlanmagan.", show_alert=True)
+        return
+
+    results = await complete_orders(selected, context.db_user)
+    context.user_data.pop("batch_orders", None)
+
+    await query.answer("✅ Tayyor")
+    await _show_batch_result(query, results)
+
+
+@warehouse_required
+async def complete_product_orders_callback(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int
+):
+    """Mahsulot bo'yicha barcha kutilayotgan zakaslarni bajarish"""
+    query = update.callback_query
+    results = await complete_product_orders(product_id, context.db_user)
+
+    if not results:
+        await query.answer("❌ Kutilayotgan zakaslar yo'q.", show_alert=True)
+        return
+
+    await query.answer("✅ Tayyor")
+    await _show_batch_result(query, results)
+
+
+# ============ Stock Intake Handler ============
+
+# Bot API 20 MB dan katta fayllarni yuklab bermaydi
+MAX_INTAKE_FILE_SIZE = 20 * 1024 * 1024
+
+
+@warehouse_required
+async def stock_document_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Jadval (CSV/XLSX) orqali ko'p mahsulotni birdan kirim qilish"""
+    document = update.message.document
+
+    if document.file_size and document.file_size > MAX_INTAKE_FILE_SIZE:
+        await update.message.reply_text("❌ Fayl juda katta (20 MB dan oshmasin).")
+        return
+
+    file = await document.get_file()
+    data = await file.download_as_bytearray()
+
+    try:
+        updated, created, categories = await import_stock(
+            io.BytesIO(data), document.file_name, context.db_user
         )
+    except IntakeError as e:
+        await update.message.reply_text(format_intake_errors(e), parse_mode="HTML")
+        return
 
-    except Order.DoesNotExist:
-        await query.answer("❌ Zakas topilmadi.", show_alert=True)
+    await update.message.reply_text(
+        f"📥 <b>Kirim qabul qilindi!</b>\n\n"
+        f"🔄 Yangilangan mahsulotlar: {updated} ta\n"
+        f"🆕 Yangi mahsulotlar: {created} ta\n"
+        f"📁 Yangi kategoriyalar: {categories} ta\n\n"
+        f"📜 Tarix: /history",
+        parse_mode="HTML",
+    )
 
 
 # ============ History Handler ============
@@ -466,9 +562,7 @@ async def cancel_order_callback(update: Update, context: ContextTypes.DEFAULT_TY
 @warehouse_required
 async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Kirim-chiqim tarixi"""
-    transactions = Transaction.objects.select_related(
-        "product", "performed_by"
-    ).order_by("-created_at")[:30]
+    transactions = await list_recent_transactions(limit=30)
 
     text = format_transaction_history(transactions, limit=30)
 
@@ -480,17 +574,13 @@ async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 @warehouse_required
 async def categories_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Kategoriyalar ro'yxati"""
-    categories = Category.objects.all()
-
-    if not categories:
-        text = "📁 Kategoriyalar yo'q.\n\nMahsulot qo'shish orqali kategoriya yarating: /add"
-    else:
-        lines = ["📁 <b>Kategoriyalar:</b>\n"]
-        for cat in categories:
-            product_count = cat.products.count()
-            lines.append(f"• {cat.name} ({product_count} ta mahsulot)")
-        text = "\n".join(lines)
+    """Kategoriyalar ro'yxati (katalog o'zgarmaguncha keshdan)"""
+    # Versiya so'rovdan oldin olinadi - so'rov paytidagi o'zgarish yangi versiya beradi
+    version = await catalog_version()
+    text = category_overview_cache.get(version)
+    if text is None:
+        text = format_category_overview(await list_categories_with_counts())
+        category_overview_cache.set(version, text)
 
     await update.message.reply_text(text, parse_mode="HTML")
 
@@ -501,13 +591,7 @@ async def categories_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 @warehouse_required
 async def products_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mahsulotlar boshqaruvi - list_command bilan bir xil"""
-    from apps.inventory.bot.utils import format_product_list
-
-    products = (
-        Product.objects.all()
-        .select_related("category")
-        .order_by("category__name", "name")
-    )
+    products = await list_products_with_category()
     text = format_product_list(products)
 
     await update.message.reply_text(text, parse_mode="HTML")
@@ -559,6 +643,8 @@ add_product_handler = ConversationHandler(
         CommandHandler("cancel", cancel_add),
         MessageHandler(filters.Regex(r"^❌ Bekor qilish$"), cancel_add),
     ],
+    name="add_product",
+    persistent=True,
 )
 
 # Orders handlers
@@ -567,3 +653,7 @@ give_order_handler = CommandHandler("give", give_command)
 history_handler = CommandHandler("history", history_command)
 categories_handler = CommandHandler("categories", categories_command)
 products_handler = CommandHandler("products", products_command)
+stock_document_handler = MessageHandler(
+    filters.Document.FileExtension("csv") | filters.Document.FileExtension("xlsx"),
+    stock_document_command,
+)
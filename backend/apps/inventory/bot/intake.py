@@ -0,0 +1,187 @@
+"""Yetkazib berilgan mahsulotlarni jadval (CSV/XLSX) orqali kirim qilish
+
+Fayl satrma-satr o'qiladi (XLSX - ``openpyxl`` ning ``read_only`` rejimi),
+bir xil mahsulot satrlari jamlanadi. Birinchi satr - sarlavha:
+
+    Kategoriya | Mahsulot | Miqdor | Birlik (ixtiyoriy) | Minimum (ixtiyoriy)
+
+Bitta satr xato bo'lsa ham butun fayl rad etiladi - kirim qisman yozilmaydi.
+"""
+
+import codecs
+import csv
+import html
+import itertools
+from decimal import Decimal
+from typing import IO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from apps.inventory.models import Product
+from apps.inventory.bot.utils import parse_quantity
+
+SUPPORTED_EXTENSIONS = ("csv", "xlsx")
+
+# Xatolar ro'yxatida ko'rsatiladigan satrlar soni
+MAX_REPORTED_ERRORS = 20
+
+# ustun -> sarlavhada qabul qilinadigan nomlar
+COLUMNS = {
+    "category": ("kategoriya", "category"),
+    "name": ("mahsulot", "nomi", "name", "product"),
+    "quantity": ("miqdor", "quantity", "qty"),
+    "unit": ("birlik", "o'lchov birligi", "unit"),
+    "min_quantity": ("minimum", "minimum miqdor", "min_quantity"),
+}
+REQUIRED_COLUMNS = ("category", "name", "quantity")
+
+UNITS = {code: code for code, _ in Product.UNIT_CHOICES}
+UNITS.update({label.lower(): code for code, label in Product.UNIT_CHOICES})
+
+
+class IntakeError(Exception):
+    """Faylni o'qib bo'lmadi yoki unda xato satrlar bor"""
+
+    def __init__(self, errors: Sequence[str]):
+        super().__init__("\n".join(errors))
+        self.errors = list(errors)
+
+
+class IntakeItem:
+    """Bitta mahsulot bo'yicha jamlangan kirim"""
+
+    __slots__ = ("category", "name", "quantity", "unit", "min_quantity")
+
+    def __init__(self, category: str, name: str, unit: str, min_quantity: Decimal):
+        self.category = category
+        self.name = name
+        self.quantity = Decimal(0)
+        self.unit = unit
+        self.min_quantity = min_quantity
+
+
+def _extension(filename: str) -> str:
+    return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+
+def _csv_rows(stream: IO[bytes]) -> Iterator[Sequence]:
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    first = next(lines, "")
+    # Excel mahalliy sozlamalarda ";" bilan saqlaydi
+    delimiter = ";" if first.count(";") > first.count(",") else ","
+    yield from csv.reader(itertools.chain([first], lines), delimiter=delimiter)
+
+
+def _xlsx_rows(stream: IO[bytes]) -> Iterator[Sequence]:
+    try:
+        import openpyxl
+    except ImportError:
+        raise IntakeError(["XLSX fayllar uchun openpyxl o'rnatilmagan, CSV yuboring"])
+
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception:
+        raise IntakeError(["XLSX faylni o'qib bo'lmadi"])
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_rows(stream: IO[bytes], filename: str) -> Iterator[Sequence]:
+    """Fayl satrlari (sarlavha bilan), kengaytmaga qarab"""
+    extension = _extension(filename)
+    if extension == "csv":
+        return _csv_rows(stream)
+    if extension == "xlsx":
+        return _xlsx_rows(stream)
+    raise IntakeError([f"Faqat {', '.join(SUPPORTED_EXTENSIONS)} fayllar qabul qilinadi"])
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _header_map(header: Sequence) -> Dict[str, int]:
+    names = {_cell(value).lower(): index for index, value in enumerate(header)}
+    columns = {}
+    for column, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                columns[column] = names[alias]
+                break
+    missing = [COLUMNS[c][0] for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise IntakeError([f"Sarlavhada ustun topilmadi: {', '.join(missing)}"])
+    return columns
+
+
+def parse_rows(rows: Iterator[Sequence]) -> List[IntakeItem]:
+    """Satrlarni tekshirib, (kategoriya, mahsulot) bo'yicha jamlash"""
+    header = next(rows, None)
+    if header is None:
+        raise IntakeError(["Fayl bo'sh"])
+    columns = _header_map(header)
+
+    items: Dict[Tuple[str, str], IntakeItem] = {}
+    errors: List[str] = []
+
+    def get(row, column) -> str:
+        index = columns.get(column)
+        return _cell(row[index]) if index is not None and index < len(row) else ""
+
+    for line, row in enumerate(rows, start=2):
+        if not any(_cell(value) for value in row):
+            continue
+
+        category, name = get(row, "category"), get(row, "name")
+        if not category or not name:
+            errors.append(f"{line}-satr: kategoriya va mahsulot nomi kerak")
+            continue
+
+        success, quantity, error = parse_quantity(get(row, "quantity"))
+        if not success:
+            errors.append(f"{line}-satr: {error}")
+            continue
+
+        unit = get(row, "unit").lower() or "dona"
+        if unit not in UNITS:
+            errors.append(f"{line}-satr: noma'lum o'lchov birligi '{unit}'")
+            continue
+
+        min_quantity: Optional[Decimal] = Decimal(0)
+        if get(row, "min_quantity"):
+            success, min_quantity, error = parse_quantity(get(row, "min_quantity"))
+            if not success:
+                errors.append(f"{line}-satr: minimum - {error}")
+                continue
+
+        key = (category.casefold(), name.casefold())
+        item = items.get(key)
+        if item is None:
+            item = items[key] = IntakeItem(category, name, UNITS[unit], min_quantity)
+        item.quantity += quantity
+
+    if errors:
+        raise IntakeError(errors)
+    if not items:
+        raise IntakeError(["Faylda mahsulotlar topilmadi"])
+    return list(items.values())
+
+
+def read_intake(stream: IO[bytes], filename: str) -> List[IntakeItem]:
+    """Faylni o'qish va tekshirish (``IntakeError`` - xato bo'lsa)"""
+    try:
+        return parse_rows(iter(iter_rows(stream, filename)))
+    except (UnicodeDecodeError, csv.Error):
+        raise IntakeError(["CSV faylni o'qib bo'lmadi (UTF-8 formatida saqlang)"])
+
+
+def format_intake_errors(error: IntakeError) -> str:
+    lines = ["❌ <b>Fayl qabul qilinmadi</b>\n"]
+    lines.extend(f"• {html.escape(e)}" for e in error.errors[:MAX_REPORTED_ERRORS])
+    if len(error.errors) > MAX_REPORTED_ERRORS:
+        lines.append(f"... va yana {len(error.errors) - MAX_REPORTED_ERRORS} ta xato")
+    return "\n".join(lines)
@@ -0,0 +1,116 @@
+"""Jarayonlararo kesh invalidatsiyasi (Postgres LISTEN/NOTIFY)
+
+Ma'lumot o'zgarganda ``publish`` shu tranzaksiya ichida ``pg_notify``
+yuboradi - xabar faqat commit'dan keyin yetkaziladi. Bot jarayonlaridagi
+``InvalidationListener`` kanalni tinglaydi va ``subscribe`` qilingan
+funksiyalarni chaqiradi. Ulanish uzilsa, o'tkazib yuborilgan xabarlar
+bo'lishi mumkinligi sababli barcha keshlar tozalanadi.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "inventory_cache"
+
+# tur -> fn(kalit); kalit bo'sh satr bo'lsa - hammasi tozalansin
+_subscribers: Dict[str, Callable[[str], None]] = {}
+
+
+def subscribe(kind: str, callback: Callable[[str], None]) -> None:
+    _subscribers[kind] = callback
+
+
+def dispatch(payload: str) -> None:
+    kind, _, key = payload.partition(":")
+    callback = _subscribers.get(kind)
+    if callback is not None:
+        callback(key)
+
+
+def invalidate_all() -> None:
+    for callback in _subscribers.values():
+        callback("")
+
+
+def publish(kind: str, key: object = "") -> None:
+    """Boshqa jarayonlarga o'zgarish haqida xabar (joriy tranzaksiya bilan)"""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, f"{kind}:{key}"])
+
+
+class InvalidationListener:
+    """``CHANNEL`` ni tinglovchi fon vazifasi"""
+
+    RECONNECT_DELAY = 5
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="cache-invalidation")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Kesh invalidatsiyasi ulanishi uzildi: %s", e)
+            # Uzilish paytidagi xabarlar yo'qolgan bo'lishi mumkin
+            invalidate_all()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        db = settings.DATABASES["default"]
+        async with await psycopg.AsyncConnection.connect(
+            host=db["HOST"],
+            port=db["PORT"],
+            dbname=db["NAME"],
+            user=db["USER"],
+            password=db["PASSWORD"],
+            autocommit=True,
+        ) as conn:
+            await conn.execute(f"LISTEN {CHANNEL}")
+            logger.info("Kesh invalidatsiyasi tinglanmoqda (%s)", CHANNEL)
+            async for notify in conn.notifies():
+                dispatch(notify.payload)
+
+
+# ============ Application hooks ============
+
+
+async def start_invalidation_listener(application) -> None:
+    if connection.vendor != "postgresql":
+        # Boshqa bazalarda faqat TTL ishlaydi
+        return
+    listener = InvalidationListener()
+    application.bot_data["invalidation_listener"] = listener
+    listener.start()
+
+
+async def stop_invalidation_listener(application) -> None:
+    listener = application.bot_data.pop("invalidation_listener", None)
+    if listener is not None:
+        await listener.stop()
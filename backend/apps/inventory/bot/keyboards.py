@@ -1,5 +1,7 @@
 """Telegram klaviaturalari"""
 
+from typing import Collection, Iterable
+
 from telegram import (
     ReplyKeyboardMarkup,
     InlineKeyboardMarkup,
@@ -7,7 +9,14 @@ from telegram import (
     ReplyKeyboardRemove,
 )
 
-from apps.inventory.models import Category, Product, Order, OrderStatus, UserRole
+from apps.inventory.models import (
+    Category,
+    Product,
+    Order,
+    OrderStatus,
+    TelegramUser,
+    UserRole,
+)
 
 
 # ============ Reply Keyboards ============
@@ -59,9 +68,10 @@ def get_units_keyboard() -> ReplyKeyboardMarkup:
 # ============ Inline Keyboards ============
 
 
-def get_categories_keyboard(action_prefix: str = "category") -> InlineKeyboardMarkup:
+def get_categories_keyboard(
+    categories: Iterable[Category], action_prefix: str = "category"
+) -> InlineKeyboardMarkup:
     """Kategoriyalar inline klaviaturasi"""
-    categories = Category.objects.all()
     buttons = []
 
     for category in categories:
@@ -88,14 +98,19 @@ def get_categories_keyboard(action_prefix: str = "category") -> InlineKeyboardMa
 
 
 def get_products_keyboard(
-    category_id: int, action_prefix: str = "product"
+    products: Iterable[Product],
+    action_prefix: str = "product",
+    show_available: bool = False,
 ) -> InlineKeyboardMarkup:
-    """Mahsulotlar inline klaviaturasi"""
-    products = Product.objects.filter(category_id=category_id)
+    """Mahsulotlar inline klaviaturasi
+
+    ``show_available`` - zakas uchun: band qilinganidan tashqari miqdor.
+    """
     buttons = []
 
     for product in products:
-        stock_info = f" ({product.quantity} {product.unit})"
+        quantity = product.available_quantity if show_available else product.quantity
+        stock_info = f" ({quantity} {product.unit})"
         buttons.append(
             [
                 InlineKeyboardButton(
@@ -124,14 +139,11 @@ def get_products_keyboard(
     return InlineKeyboardMarkup(buttons)
 
 
-def get_pending_orders_keyboard() -> InlineKeyboardMarkup:
-    """Kutilayotgan zakaslar"""
-    orders = Order.objects.filter(status=OrderStatus.PENDING).select_related(
-        "product", "requester"
-    )
+def get_pending_orders_keyboard(orders: Iterable[Order]) -> InlineKeyboardMarkup:
+    """Kutilayotgan zakaslar (``product`` bilan oldindan yuklangan)"""
     buttons = []
 
-    for order in orders[:20]:  # Maksimum 20 ta
+    for order in orders:
         text = (
             f"#{order.id} {order.product.name} - {order.quantity} {order.product.unit}"
         )
@@ -143,13 +155,49 @@ def get_pending_orders_keyboard() -> InlineKeyboardMarkup:
         buttons.append(
             [InlineKeyboardButton("📭 Zakaslar yo'q", callback_data="no_orders")]
         )
+    else:
+        buttons.append(
+            [
+                InlineKeyboardButton(
+                    "☑️ Bir nechtasini bajarish", callback_data="batch_orders"
+                )
+            ]
+        )
 
     buttons.append([InlineKeyboardButton("❌ Yopish", callback_data="cancel")])
 
     return InlineKeyboardMarkup(buttons)
 
 
-def get_order_actions_keyboard(order_id: int) -> InlineKeyboardMarkup:
+def get_batch_orders_keyboard(
+    orders: Iterable[Order], selected: Collection[int]
+) -> InlineKeyboardMarkup:
+    """Bir nechta zakasni tanlash (``product`` bilan oldindan yuklangan)"""
+    buttons = []
+
+    for order in orders:
+        mark = "✅" if order.id in selected else "⬜"
+        text = (
+            f"{mark} #{order.id} {order.product.name} - "
+            f"{order.quantity} {order.product.unit}"
+        )
+        buttons.append(
+            [InlineKeyboardButton(text, callback_data=f"batch_toggle:{order.id}")]
+        )
+
+    buttons.append(
+        [
+            InlineKeyboardButton(
+                f"✅ Bajarish ({len(selected)})", callback_data="batch_complete"
+            ),
+            InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_orders"),
+        ]
+    )
+
+    return InlineKeyboardMarkup(buttons)
+
+
+def get_order_actions_keyboard(order_id: int, product_id: int) -> InlineKeyboardMarkup:
     """Zakas harakatlari"""
     buttons = [
         [
@@ -160,17 +208,21 @@ def get_order_actions_keyboard(order_id: int) -> InlineKeyboardMarkup:
                 "❌ Bekor qilish", callback_data=f"cancel_order:{order_id}"
             ),
         ],
+        [
+            InlineKeyboardButton(
+                "✅ Shu mahsulotning barcha zakaslari",
+                callback_data=f"complete_product_orders:{product_id}",
+            )
+        ],
         [InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_orders")],
     ]
     return InlineKeyboardMarkup(buttons)
 
 
-def get_users_keyboard(page: int = 0, per_page: int = 10) -> InlineKeyboardMarkup:
+def get_users_keyboard(
+    users: Iterable[TelegramUser], total: int, page: int = 0, per_page: int = 10
+) -> InlineKeyboardMarkup:
     """Foydalanuvchilar ro'yxati"""
-    from apps.inventory.models import TelegramUser
-
-    users = TelegramUser.objects.all()[page * per_page : (page + 1) * per_page]
-    total = TelegramUser.objects.count()
     buttons = []
 
     for user in users:
@@ -259,11 +311,8 @@ def get_user_actions_keyboard(
     return InlineKeyboardMarkup(buttons)
 
 
-def get_my_orders_keyboard(user_id: int) -> InlineKeyboardMarkup:
+def get_my_orders_keyboard(orders: Iterable[Order]) -> InlineKeyboardMarkup:
     """Mening zakaslarim"""
-    from apps.inventory.models import TelegramUser
-
-    orders = Order.objects.filter(requester_id=user_id).select_related("product")[:20]
     buttons = []
 
     for order in orders:
@@ -1,18 +1,80 @@
-"""Bildirishnomalar tizimi"""
-
-from telegram import Bot
-
-from apps.inventory.models import Order, Product, TelegramUser, UserRole
+"""Bildirishnomalar tizimi
+
+Bu funksiyalar xabarni darhol yubormaydi - ``Notification`` (outbox) jadvaliga
+yozadi. Ular zakas yoki qoldiq o'zgarishi bilan bitta ``transaction.atomic``
+ichida chaqiriladi: o'zgarish saqlansa, xabar ham albatta navbatda bo'ladi.
+Yuborish ``outbox.OutboxWorker`` orqali fonda, qayta urinishlar bilan bajariladi.
+
+Kam qolgan mahsulot haqidagi ogohlantirish bitta mahsulot uchun
+``BOT_LOW_STOCK_ALERT_WINDOW`` ichida bir marta yuboriladi.
+``BOT_LOW_STOCK_DIGEST_INTERVAL`` berilgan bo'lsa, alohida ogohlantirishlar
+o'rniga kam qolgan barcha mahsulotlar ro'yxati davriy ravishda yuboriladi.
+"""
+
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from apps.inventory.models import (
+    Notification,
+    Order,
+    Product,
+    TelegramUser,
+    UserRole,
+)
+from apps.inventory.bot.cache import STAFF_KEY, staff_cache
+
+# Bildirishnomalarni oladigan rollar
+STAFF_ROLES = (UserRole.ADMIN, UserRole.WAREHOUSE)
+
+# Digest xabaridagi mahsulotlar soni (Telegram xabari 4096 belgidan oshmasin)
+LOW_STOCK_DIGEST_LIMIT = 50
+
+
+def staff_chat_ids(exclude_telegram_id: Optional[int] = None) -> List[int]:
+    """Faol admin va ombor hodimlarining telegram ID lari
+
+    Ro'yxat ``staff_cache`` da saqlanadi va ``TelegramUser`` o'zgarganda
+    (``signals.py``) tozalanadi - odatda bazaga murojaat qilinmaydi.
+    O'qish paytida tozalangan bo'lsa, o'qilgan ro'yxat keshlanmaydi.
+    """
+    chat_ids = staff_cache.get(STAFF_KEY)
+    if chat_ids is None:
+        generation = staff_cache.generation
+        chat_ids = tuple(
+            TelegramUser.objects.filter(
+                role__in=STAFF_ROLES, is_active=True
+            ).values_list("telegram_id", flat=True)
+        )
+        staff_cache.set(STAFF_KEY, chat_ids, generation)
+    return [chat_id for chat_id in chat_ids if chat_id != exclude_telegram_id]
+
+
+def enqueue(
+    chat_ids: Iterable[int], text: str, dedup_key: Optional[str] = None
+) -> List[Notification]:
+    """Xabarni har bir qabul qiluvchi uchun outbox'ga yozish"""
+    return Notification.objects.bulk_create(
+        [
+            Notification(chat_id=chat_id, text=text, dedup_key=dedup_key)
+            for chat_id in chat_ids
+        ]
+    )
 
 
-async def notify_new_order(bot: Bot, order: Order, requester: TelegramUser):
-    """Yangi zakas haqida ombor hodimlariga xabar yuborish"""
+def recently_enqueued(dedup_key: str, window: float) -> bool:
+    """Shu kalitli xabar oxirgi ``window`` soniya ichida navbatga qo'yilganmi"""
+    since = timezone.now() - timedelta(seconds=window)
+    return Notification.objects.filter(
+        dedup_key=dedup_key, created_at__gte=since
+    ).exists()
 
-    # Barcha ombor hodimlarini olish
-    warehouse_users = TelegramUser.objects.filter(
-        role__in=[UserRole.ADMIN, UserRole.WAREHOUSE], is_active=True
-    ).exclude(telegram_id=requester.telegram_id)
 
+def notify_new_order(order: Order, requester: TelegramUser):
+    """Yangi zakas haqida ombor hodimlariga xabar"""
     message = (
         f"🔔 <b>YANGI ZAKAS!</b>\n\n"
         f"📋 Zakas: #{order.id}\n"
@@ -27,23 +89,23 @@ async def notify_new_order(bot: Bot, order: Order, requester: TelegramUser):
 
     message += "\n\n📥 Zakaslarni ko'rish: /orders"
 
-    for user in warehouse_users:
-        try:
-            await bot.send_message(
-                chat_id=user.telegram_id, text=message, parse_mode="HTML"
-            )
-        except Exception as e:
-            # Foydalanuvchi botni bloklagan yoki boshqa xatolik
-            print(f"Xabar yuborishda xatolik (user_id={user.telegram_id}): {e}")
+    enqueue(staff_chat_ids(exclude_telegram_id=requester.telegram_id), message)
 
 
-async def notify_low_stock(bot: Bot, product: Product):
-    """Mahsulot kam qolganda ombor hodimlariga ogohlantirish"""
+def notify_low_stock(product: Product):
+    """Mahsulot kam qolganda ombor hodimlariga ogohlantirish
 
-    # Barcha ombor hodimlarini olish
-    warehouse_users = TelegramUser.objects.filter(
-        role__in=[UserRole.ADMIN, UserRole.WAREHOUSE], is_active=True
-    )
+    Chaqiruvchi mahsulot qatorini yangilagan tranzaksiya ichida bo'ladi -
+    bir mahsulot uchun parallel chaqiruvlar ketma-ket bajariladi va
+    takrorlanish tekshiruvi ishonchli ishlaydi.
+    """
+    if settings.BOT_LOW_STOCK_DIGEST_INTERVAL:
+        # Digest rejimi: mahsulot keyingi umumiy ro'yxatga kiradi
+        return
+
+    dedup_key = f"low_stock:{product.id}"
+    if recently_enqueued(dedup_key, settings.BOT_LOW_STOCK_ALERT_WINDOW):
+        return
 
     message = (
         f"⚠️ <b>OGOHLANTIRISH: Mahsulot kam qoldi!</b>\n\n"
@@ -54,49 +116,79 @@ async def notify_low_stock(bot: Bot, product: Product):
         f"➕ Mahsulot qo'shish: /add"
     )
 
-    for user in warehouse_users:
-        try:
-            await bot.send_message(
-                chat_id=user.telegram_id, text=message, parse_mode="HTML"
-            )
-        except Exception as e:
-            print(f"Xabar yuborishda xatolik (user_id={user.telegram_id}): {e}")
+    enqueue(staff_chat_ids(), message, dedup_key=dedup_key)
 
 
-async def notify_order_completed(bot: Bot, order: Order):
-    """Zakas bajarilganda zakas qiluvchiga xabar"""
-    try:
-        message = (
-            f"✅ <b>Zakasngiz bajarildi!</b>\n\n"
-            f"📋 Zakas: #{order.id}\n"
-            f"📦 Mahsulot: {order.product.name}\n"
-            f"📊 Miqdor: {order.quantity} {order.product.unit}\n"
-            f"👤 Bergan: {order.fulfilled_by.full_name if order.fulfilled_by else 'Noma\'lum'}\n"
-            f"📅 Bajarilgan: {order.fulfilled_at.strftime('%d.%m.%Y %H:%M') if order.fulfilled_at else ''}"
-        )
+def notify_low_stock_digest(dedup_key: Optional[str] = None) -> int:
+    """Kam qolgan barcha mahsulotlar ro'yxatini bitta xabarda yuborish
 
-        await bot.send_message(
-            chat_id=order.requester.telegram_id, text=message, parse_mode="HTML"
+    Returns:
+        ro'yxatdagi mahsulotlar soni (0 - xabar yuborilmadi)
+    """
+    if dedup_key and Notification.objects.filter(dedup_key=dedup_key).exists():
+        return 0
+
+    products = list(
+        Product.objects.filter(min_quantity__gt=0, quantity__lte=F("min_quantity"))
+        .select_related("category")
+        .order_by("category__name", "name")
+    )
+    if not products:
+        return 0
+
+    lines = [f"⚠️ <b>Kam qolgan mahsulotlar: {len(products)} ta</b>\n"]
+    for product in products[:LOW_STOCK_DIGEST_LIMIT]:
+        lines.append(
+            f"• {product.name} ({product.category.name}): "
+            f"{product.quantity} / {product.min_quantity} {product.unit}"
         )
-    except Exception as e:
-        print(f"Xabar yuborishda xatolik: {e}")
+    if len(products) > LOW_STOCK_DIGEST_LIMIT:
+        lines.append(f"... va yana {len(products) - LOW_STOCK_DIGEST_LIMIT} ta")
+    lines.append("\n➕ Mahsulot qo'shish: /add")
+
+    enqueue(staff_chat_ids(), "\n".join(lines), dedup_key=dedup_key)
+    return len(products)
+
+
+def _order_completed_message(order: Order) -> str:
+    return (
+        f"✅ <b>Zakasngiz bajarildi!</b>\n\n"
+        f"📋 Zakas: #{order.id}\n"
+        f"📦 Mahsulot: {order.product.name}\n"
+        f"📊 Miqdor: {order.quantity} {order.product.unit}\n"
+        f"👤 Bergan: {order.fulfilled_by.full_name if order.fulfilled_by else 'Noma\'lum'}\n"
+        f"📅 Bajarilgan: {order.fulfilled_at.strftime('%d.%m.%Y %H:%M') if order.fulfilled_at else ''}"
+    )
+
+
+def notify_order_completed(order: Order):
+    """Zakas bajarilganda zakas qiluvchiga xabar"""
+    enqueue([order.requester.telegram_id], _order_completed_message(order))
+
+
+def notify_orders_completed(orders: Iterable[Order]) -> List[Notification]:
+    """Bir nechta bajarilgan zakas haqidagi xabarlar (bitta INSERT)"""
+    return Notification.objects.bulk_create(
+        [
+            Notification(
+                chat_id=order.requester.telegram_id,
+                text=_order_completed_message(order),
+            )
+            for order in orders
+        ]
+    )
 
 
-async def notify_order_cancelled(bot: Bot, order: Order, reason: str = None):
+def notify_order_cancelled(order: Order, reason: str = None):
     """Zakas bekor qilinganda zakas qiluvchiga xabar"""
-    try:
-        message = (
-            f"❌ <b>Zakasngiz bekor qilindi</b>\n\n"
-            f"📋 Zakas: #{order.id}\n"
-            f"📦 Mahsulot: {order.product.name}\n"
-            f"📊 Miqdor: {order.quantity} {order.product.unit}"
-        )
+    message = (
+        f"❌ <b>Zakasngiz bekor qilindi</b>\n\n"
+        f"📋 Zakas: #{order.id}\n"
+        f"📦 Mahsulot: {order.product.name}\n"
+        f"📊 Miqdor: {order.quantity} {order.product.unit}"
+    )
 
-        if reason:
-            message += f"\n📝 Sabab: {reason}"
+    if reason:
+        message += f"\n📝 Sabab: {reason}"
 
-        await bot.send_message(
-            chat_id=order.requester.telegram_id, text=message, parse_mode="HTML"
-        )
-    except Exception as e:
-        print(f"Xabar yuborishda xatolik: {e}")
+    enqueue([order.requester.telegram_id], message)
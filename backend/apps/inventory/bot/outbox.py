@@ -0,0 +1,189 @@
+"""Outbox'dagi bildirishnomalarni yuboruvchi worker
+
+Handlerlar xabarni ``Notification`` jadvaliga yozadi va javobni kutmaydi.
+``OutboxWorker`` jadvalni paket-paket o'qiydi, xabarlarni parallel yuboradi
+(``BOT_NOTIFY_CONCURRENCY`` tagacha, tezlik ``OutboundRateLimiter`` da
+cheklanadi) va natijani yozadi:
+
+* yuborildi - ``SENT``;
+* vaqtinchalik xatolik - ortib boruvchi kutish bilan qayta urinish;
+* foydalanuvchi botni bloklagan, noto'g'ri so'rov yoki urinishlar tugagan -
+  ``FAILED`` (dead letter, ``deliver_notifications --retry-failed`` bilan
+  qayta navbatga qo'yiladi).
+
+``digest_interval`` berilsa, worker kam qolgan mahsulotlar ro'yxatini ham
+davriy ravishda navbatga qo'yadi; ``verify_interval`` berilsa - hisoblagichlarni
+(va band qilingan miqdorlarni) haqiqiy son bilan tekshiradi.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from django.conf import settings
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, InvalidToken, TelegramError
+
+from apps.inventory.models import Notification
+from apps.inventory.bot.repositories import (
+    claim_notifications,
+    mark_notifications_sent,
+    record_notification_failures,
+    enqueue_low_stock_digest,
+)
+from apps.inventory.bot.db import database_sync_to_async
+from apps.inventory.bot.repositories.counters import verify_counters
+
+logger = logging.getLogger(__name__)
+
+_verify_counters = database_sync_to_async(verify_counters)
+
+# Qayta yuborishdan foyda yo'q xatolar
+PERMANENT_ERRORS = (Forbidden, BadRequest, InvalidToken)
+
+
+class OutboxWorker:
+    """Bildirishnomalarni yuboruvchi fon vazifasi"""
+
+    def __init__(
+        self,
+        bot: Bot,
+        batch_size: int = None,
+        poll_interval: float = None,
+        max_attempts: int = None,
+        lease: float = None,
+        concurrency: int = None,
+        digest_interval: float = 0,
+        verify_interval: float = 0,
+    ):
+        self.bot = bot
+        self.batch_size = batch_size or settings.BOT_OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.BOT_OUTBOX_POLL_INTERVAL
+        self.max_attempts = max_attempts or settings.BOT_OUTBOX_MAX_ATTEMPTS
+        self.lease = lease or settings.BOT_OUTBOX_LEASE
+        self.digest_interval = digest_interval
+        self._next_digest = self._digest_slot() + 1 if digest_interval else None
+        self.verify_interval = verify_interval
+        self._next_verify = time.monotonic() if verify_interval else None
+        self._send_slots = asyncio.Semaphore(
+            concurrency or settings.BOT_NOTIFY_CONCURRENCY
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="outbox-worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        logger.info("Bildirishnomalar worker'i ishga tushdi")
+        while True:
+            try:
+                await self.maybe_enqueue_digest()
+                await self.maybe_verify_counters()
+                claimed = await self.deliver_batch()
+            except Exception:
+                logger.exception("Bildirishnomalarni yuborishda kutilmagan xatolik")
+                claimed = 0
+
+            # To'liq paket olingan bo'lsa navbatda yana xabar bor - kutmaslik
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def _digest_slot(self) -> int:
+        # Oraliqlar Unix vaqti bo'yicha tekislanadi - bir nechta jarayon
+        # bir xil kalitni hisoblaydi va digest takrorlanmaydi
+        return int(time.time() // self.digest_interval)
+
+    async def maybe_enqueue_digest(self) -> None:
+        if self._next_digest is None or self._digest_slot() < self._next_digest:
+            return
+        slot = self._digest_slot()
+        self._next_digest = slot + 1
+        count = await enqueue_low_stock_digest(f"low_stock_digest:{slot}")
+        if count:
+            logger.info("Kam qolgan mahsulotlar ro'yxati yuborildi (%s ta)", count)
+
+    async def maybe_verify_counters(self) -> None:
+        """Hisoblagichlarni tekshirish (bot so'rovlari faqat saqlangan qiymatni o'qiydi)"""
+        if self._next_verify is None or time.monotonic() < self._next_verify:
+            return
+        self._next_verify = time.monotonic() + self.verify_interval
+        verified = await _verify_counters(self.verify_interval)
+        if verified:
+            logger.info("Hisoblagichlar tekshirildi: %s", ", ".join(verified))
+
+    async def deliver_batch(self) -> int:
+        """Bitta paketni yuborish, band qilingan xabarlar sonini qaytaradi"""
+        batch = await claim_notifications(self.batch_size, self.lease)
+        if not batch:
+            return 0
+
+        errors = await asyncio.gather(*(self._deliver(n) for n in batch))
+
+        sent = [n.id for n, error in zip(batch, errors) if error is None]
+        failures = [
+            (n, str(error), not isinstance(error, PERMANENT_ERRORS))
+            for n, error in zip(batch, errors)
+            if error is not None
+        ]
+        if sent:
+            await mark_notifications_sent(sent)
+        if failures:
+            for notification, error, _ in failures:
+                logger.warning(
+                    "Xabar #%s yuborilmadi (chat_id=%s, urinish %s): %s",
+                    notification.id,
+                    notification.chat_id,
+                    notification.attempts,
+                    error,
+                )
+            await record_notification_failures(failures, self.max_attempts)
+
+        return len(batch)
+
+    async def _deliver(self, notification: Notification) -> Optional[TelegramError]:
+        async with self._send_slots:
+            try:
+                await self.bot.send_message(
+                    chat_id=notification.chat_id,
+                    text=notification.text,
+                    parse_mode="HTML",
+                )
+            except TelegramError as e:
+                return e
+        return None
+
+
+# ============ Application hooks ============
+
+
+async def start_outbox_worker(application, digest: bool = True) -> None:
+    """Application ishga tushganda workerni ham ishga tushirish
+
+    ``digest=False`` - bu jarayon kam qolgan mahsulotlar ro'yxatini yubormaydi
+    va hisoblagichlarni tekshirmaydi (sharding rejimida faqat bitta worker).
+    """
+    worker = OutboxWorker(
+        application.bot,
+        digest_interval=settings.BOT_LOW_STOCK_DIGEST_INTERVAL if digest else 0,
+        verify_interval=settings.BOT_COUNTER_VERIFY_INTERVAL if digest else 0,
+    )
+    application.bot_data["outbox_worker"] = worker
+    worker.start()
+
+
+async def stop_outbox_worker(application) -> None:
+    worker = application.bot_data.pop("outbox_worker", None)
+    if worker is not None:
+        await worker.stop()
@@ -0,0 +1,246 @@
+"""PostgreSQL'da saqlanadigan bot persistence
+
+Suhbat holatlari (``ConversationHandler``) va ``context.user_data`` bazada
+saqlanadi: bot qayta ishga tushganda yarim qolgan zakaslar yo'qolmaydi va
+bir nechta worker jarayoni bir xil holatni ko'radi.
+
+Yozuvlar har bir holat o'zgarishida emas, xotirada yig'ilib (bir kalit uchun
+faqat oxirgi qiymat) bitta tranzaksiyada paket bo'lib yoziladi. Paketlar
+ketma-ket yoziladi - eski holat yangisining ustiga yozilmaydi.
+"""
+
+import asyncio
+import json
+import logging
+import pickle
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from telegram.ext import BasePersistence, PersistenceInput
+
+from apps.inventory.models import BotConversation, BotUserData
+from apps.inventory.bot.db import database_sync_to_async
+
+logger = logging.getLogger(__name__)
+
+
+# user_data dagi bu kalitlar saqlanmaydi (har bir update'da qayta olinadi)
+TRANSIENT_USER_DATA_KEYS = ("db_user",)
+
+ConversationKey = Tuple[int, ...]
+ConversationDict = Dict[ConversationKey, object]
+
+
+def _encode_key(key: ConversationKey) -> str:
+    return json.dumps(list(key))
+
+
+def _decode_key(key: str) -> ConversationKey:
+    return tuple(json.loads(key))
+
+
+def _dump_user_data(data: dict) -> bytes:
+    data = {k: v for k, v in data.items() if k not in TRANSIENT_USER_DATA_KEYS}
+    return pickle.dumps(data)
+
+
+class DjangoPersistence(BasePersistence):
+    """``BotConversation`` va ``BotUserData`` jadvallariga yozadigan persistence
+
+    Args:
+        flush_interval: PTB o'zgarishlarni persistence'ga qancha vaqtda bir
+            uzatishi (``update_interval``), soniya.
+        max_loss_window: o'zgarish bazaga yozilgunga qadar o'tadigan maksimal
+            vaqt - jarayon kutilmaganda to'xtasa shu oraliqdagi holat yo'qoladi.
+        max_batch_size: bufer shu hajmga yetsa, kutmasdan yoziladi.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 5,
+        max_loss_window: float = 10,
+        max_batch_size: int = 500,
+    ):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=True, callback_data=False
+            ),
+            update_interval=flush_interval,
+        )
+        self.flush_delay = max(max_loss_window - flush_interval, 0)
+        self.max_batch_size = max_batch_size
+
+        # (name, key) -> state; None - suhbat tugagan (o'chiriladi)
+        self._pending_conversations: Dict[Tuple[str, str], Optional[object]] = {}
+        # user_id -> pickle; None - o'chiriladi
+        self._pending_user_data: Dict[int, Optional[bytes]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Paketlar turli thread'larda parallel commit bo'lmasligi uchun
+        self._write_lock = asyncio.Lock()
+
+    # ============ Read ============
+
+    async def get_user_data(self) -> Dict[int, dict]:
+        return await self._load_user_data()
+
+    async def get_chat_data(self) -> Dict[int, dict]:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> Optional[tuple]:
+        return None
+
+    async def get_conversations(self, name: str) -> ConversationDict:
+        return await self._load_conversations(name)
+
+    @database_sync_to_async
+    def _load_user_data(self) -> Dict[int, dict]:
+        return {
+            row.user_id: pickle.loads(row.data)
+            for row in BotUserData.objects.all().iterator()
+        }
+
+    @database_sync_to_async
+    def _load_conversations(self, name: str) -> ConversationDict:
+        return {
+            _decode_key(key): state
+            for key, state in BotConversation.objects.filter(name=name).values_list(
+                "key", "state"
+            )
+        }
+
+    # ============ Write ============
+
+    async def update_conversation(
+        self, name: str, key: ConversationKey, new_state: Optional[object]
+    ) -> None:
+        self._pending_conversations[(name, _encode_key(key))] = new_state
+        await self._schedule_flush()
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._pending_user_data[user_id] = _dump_user_data(data)
+        await self._schedule_flush()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._pending_user_data[user_id] = None
+        await self._schedule_flush()
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending_conversations) + len(self._pending_user_data)
+
+    async def _schedule_flush(self) -> None:
+        if self.pending_writes >= self.max_batch_size:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        # PTB bitta siklda bir nechta update_* chaqiradi - ularning hammasi
+        # bitta paketga tushishi uchun kamida bir marta navbat beriladi
+        await asyncio.sleep(self.flush_delay)
+        self._flush_task = None
+        await self._write_pending()
+
+    async def flush(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self._write_pending()
+
+    async def _write_pending(self) -> None:
+        # Buferni olish va yozish bitta qulf ostida: oldingi paket commit
+        # bo'lmaguncha keyingisi olinmaydi
+        async with self._write_lock:
+            conversations, self._pending_conversations = (
+                self._pending_conversations,
+                {},
+            )
+            user_data, self._pending_user_data = self._pending_user_data, {}
+            if not conversations and not user_data:
+                return
+
+            try:
+                await self._write_batch(conversations, user_data)
+            except Exception:
+                logger.exception(
+                    "Bot holatini saqlashda xatolik, keyinroq qayta urinish"
+                )
+                # Yozilmagan qiymatlarni qaytarish (yangiroq qiymatlar ustun)
+                self._pending_conversations = {
+                    **conversations,
+                    **self._pending_conversations,
+                }
+                self._pending_user_data = {**user_data, **self._pending_user_data}
+                if self._flush_task is None:
+                    self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    @database_sync_to_async
+    def _write_batch(
+        self,
+        conversations: Dict[Tuple[str, str], Optional[object]],
+        user_data: Dict[int, Optional[bytes]],
+    ) -> None:
+        ended: Dict[str, list] = {}
+        conversation_rows = []
+        for (name, key), state in conversations.items():
+            if state is None:
+                ended.setdefault(name, []).append(key)
+            else:
+                conversation_rows.append(
+                    BotConversation(name=name, key=key, state=state)
+                )
+
+        user_data_rows = [
+            BotUserData(user_id=user_id, data=data)
+            for user_id, data in user_data.items()
+            if data is not None
+        ]
+        dropped_users = [user_id for user_id, data in user_data.items() if data is None]
+
+        with transaction.atomic():
+            if conversation_rows:
+                BotConversation.objects.bulk_create(
+                    conversation_rows,
+                    update_conflicts=True,
+                    unique_fields=["name", "key"],
+                    update_fields=["state", "updated_at"],
+                )
+            for name, keys in ended.items():
+                BotConversation.objects.filter(name=name, key__in=keys).delete()
+            if user_data_rows:
+                BotUserData.objects.bulk_create(
+                    user_data_rows,
+                    update_conflicts=True,
+                    unique_fields=["user_id"],
+                    update_fields=["data", "updated_at"],
+                )
+            if dropped_users:
+                BotUserData.objects.filter(user_id__in=dropped_users).delete()
+
+    # ============ Not stored ============
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        # Foydalanuvchining update'lari doim bitta jarayonga tushadi
+        # (``sharding.shard_key``) - xotiradagi nusxa yangi
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
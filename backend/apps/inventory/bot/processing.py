@@ -0,0 +1,63 @@
+"""Update'larni parallel qayta ishlash (chat bo'yicha tartib saqlanadi)"""
+
+import asyncio
+from typing import Any, Awaitable, Dict, List, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Turli chatlarning update'lari parallel, bitta chatniki esa ketma-ket
+
+    ``ConversationHandler`` holati (``order_handler``, ``add_product_handler``)
+    chat bo'yicha saqlanadi, shuning uchun bitta chatning update'lari kelgan
+    tartibda, bittadan bajarilishi kerak.
+
+    Chat navbati worker slotidan oldin olinadi: bitta chatdan kelgan ko'p
+    update'lar kutayotganda boshqa chatlar uchun worker band bo'lib qolmaydi.
+    """
+
+    def __init__(self, workers: int, max_pending_updates: Optional[int] = None):
+        # Tashqi semafor faqat xotiradagi kutilayotgan update'lar sonini cheklaydi
+        super().__init__(max_pending_updates or workers * 32)
+        self._workers = asyncio.BoundedSemaphore(workers)
+        # chat_id -> [lock, shu lockni kutayotgan/ushlab turgan update'lar soni]
+        self._chat_locks: Dict[int, List[Any]] = {}
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[int]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._chat_key(update)
+        if key is None:
+            async with self._workers:
+                await coroutine
+            return
+
+        entry = self._chat_locks.get(key)
+        if entry is None:
+            entry = self._chat_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                async with self._workers:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._chat_locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -0,0 +1,86 @@
+"""Telegram profilini (username, ism) bazaga kechiktirib yozish
+
+Foydalanuvchi Telegram'da ismini o'zgartirsa, handler bazaga yozishni
+kutmaydi: yangi qiymat keshdagi ``BotUser`` ga darhol qo'yiladi, bazaga esa
+xotirada yig'ilib (bir foydalanuvchi uchun faqat oxirgisi) ``flush_interval``
+soniyada bir marta bitta ``bulk_update`` bilan yoziladi.
+
+Profil maydonlari ruxsatlarga ta'sir qilmaydi, shuning uchun boshqa
+jarayonlarga NOTIFY yuborilmaydi - ular o'z keshida farqni ko'rib, o'zi ham
+navbatga qo'yadi.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from apps.inventory.bot.repositories import update_profiles
+
+logger = logging.getLogger(__name__)
+
+# telegram_id -> (username, full_name); None - o'zgarmagan
+Profile = Tuple[Optional[str], Optional[str]]
+
+
+class ProfileWriter:
+    """Profil yangilanishlarini yig'ib, paket bo'lib yozuvchi bufer
+
+    Args:
+        flush_interval: navbatdagi yozuvlar bazaga tushgunga qadar maksimal
+            kutish, soniya.
+        max_batch_size: bufer shu hajmga yetsa, kutmasdan yoziladi.
+    """
+
+    def __init__(self, flush_interval: float = 30, max_batch_size: int = 500):
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[int, Profile] = {}
+        self._full = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    def queue(self, telegram_id: int, username: Optional[str], full_name: Optional[str]):
+        """Yangi profilni navbatga qo'yish (kutmaydi)"""
+        self._pending[telegram_id] = (username, full_name)
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        try:
+            await asyncio.wait_for(self._full.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._full.clear()
+        self._flush_task = None
+        await self._write_pending()
+
+    async def flush(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._full.clear()
+        await self._write_pending()
+
+    async def _write_pending(self) -> None:
+        profiles, self._pending = self._pending, {}
+        if not profiles:
+            return
+
+        try:
+            await update_profiles(profiles)
+        except Exception:
+            logger.exception("Profillarni saqlashda xatolik, keyinroq qayta urinish")
+            # Yozilmagan qiymatlarni qaytarish (yangiroq qiymatlar ustun)
+            self._pending = {**profiles, **self._pending}
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._delayed_flush())
+
+
+profile_writer = ProfileWriter(settings.BOT_PROFILE_FLUSH_INTERVAL)
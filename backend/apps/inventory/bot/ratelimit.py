@@ -0,0 +1,223 @@
+"""Chiquvchi Bot API so'rovlari uchun navbat va tezlik cheklovi
+
+Telegram taxminan 30 xabar/s (butun bot) va 1 xabar/s (bitta chat, guruhlarda
+20 xabar/daqiqa) dan oshganda 429 (``RetryAfter``) qaytaradi. Bot orqali
+yuboriladigan har bir so'rov (``ExtBot.rate_limiter``) shu modul orqali o'tadi:
+
+* global va har bir chat uchun alohida token bucket - so'rov token olguncha
+  navbatda kutadi;
+* ``RetryAfter`` kelsa barcha so'rovlar ko'rsatilgan vaqtgacha to'xtatiladi va
+  so'rov qayta yuboriladi;
+* ulanish xatolarida so'rov ortib boruvchi kutish (backoff) bilan qayta
+  yuboriladi;
+* navbat chuqurligi ``queue_depth`` orqali ko'rinadi va chegara oshganda
+  log'ga yoziladi.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from telegram.error import NetworkError, RetryAfter, TimedOut
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Guruh va kanallar uchun Telegram chegarasi: 20 xabar / daqiqa
+GROUP_RATE = 20 / 60
+
+
+class TokenBucket:
+    """Token bucket: ``rate`` token/s, ``capacity`` gacha yig'iladi
+
+    ``reserve`` tokenni darhol band qiladi (zaxira manfiy bo'lishi mumkin) va
+    qancha kutish kerakligini qaytaradi - shu tarzda kutayotganlar FIFO
+    tartibida, qulfsiz navbatga turadi.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def reserve(self, now: float) -> float:
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class OutboundRateLimiter(BaseRateLimiter[int]):
+    """Global va chat bo'yicha token bucket'li rate limiter
+
+    Args:
+        global_rate: butun bot uchun so'rov/s.
+        chat_rate: bitta shaxsiy chat uchun so'rov/s.
+        chat_burst: bitta chatga ketma-ket kutmasdan yuboriladigan so'rovlar.
+        max_retries: ``RetryAfter`` va ulanish xatolarida qayta urinishlar soni
+            (``rate_limit_args`` orqali so'rov uchun alohida berilishi mumkin).
+        backoff: ulanish xatosidan keyingi birinchi kutish, soniya (har safar
+            ikki baravar oshadi).
+        queue_warning: navbatdagi so'rovlar shu songa yetganda ogohlantirish.
+    """
+
+    # Shuncha chat bucket'i yig'ilsa, bo'sh turganlari tozalanadi
+    MAX_IDLE_BUCKETS = 10_000
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        queue_warning: int = 100,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.queue_warning = queue_warning
+
+        self._global: Optional[TokenBucket] = None
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._resume = asyncio.Event()
+        self._resume.set()
+        self._queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Token kutayotgan (hali yuborilmagan) so'rovlar soni"""
+        return self._queue_depth
+
+    async def initialize(self) -> None:
+        self._global = TokenBucket(self.global_rate, self.global_rate, self._now())
+
+    async def shutdown(self) -> None:
+        if self._queue_depth:
+            logger.warning(
+                "Bot to'xtatilmoqda, navbatda %s ta so'rov qoldi", self._queue_depth
+            )
+        self._chats.clear()
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> Any:
+        max_retries = self.max_retries if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+
+        for attempt in range(max_retries + 1):
+            await self._acquire(chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as exc:
+                if attempt == max_retries:
+                    logger.error(
+                        "%s: flood limit, %s ta urinishdan keyin ham yuborilmadi",
+                        endpoint,
+                        attempt + 1,
+                    )
+                    raise
+                delay = exc.retry_after + 0.1
+                logger.warning(
+                    "%s: flood limit (chat_id=%s), barcha so'rovlar %.1f s to'xtatildi",
+                    endpoint,
+                    chat_id,
+                    delay,
+                )
+                await self._pause(delay)
+            except TimedOut:
+                # So'rov Telegramga yetib borgan bo'lishi mumkin - takrorlanmaydi
+                raise
+            except NetworkError as exc:
+                if attempt == max_retries:
+                    raise
+                delay = self.backoff * 2**attempt * random.uniform(0.8, 1.2)
+                logger.warning(
+                    "%s: ulanish xatosi (%s), %.1f s dan keyin qayta urinish",
+                    endpoint,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    # ============ Queue ============
+
+    async def _acquire(self, chat_id: Any) -> None:
+        self._queue_depth += 1
+        if self._queue_depth >= self.queue_warning and (
+            self._queue_depth % self.queue_warning == 0
+        ):
+            logger.warning("Chiquvchi navbat: %s ta so'rov kutmoqda", self._queue_depth)
+
+        try:
+            await self._resume.wait()
+            if chat_id is not None:
+                await self._wait(self._chat_bucket(chat_id))
+            await self._wait(self._global)
+            # Kutish paytida RetryAfter kelgan bo'lishi mumkin
+            await self._resume.wait()
+        finally:
+            self._queue_depth -= 1
+
+    @staticmethod
+    async def _wait(bucket: TokenBucket) -> None:
+        delay = bucket.reserve(asyncio.get_running_loop().time())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            now = self._now()
+            if len(self._chats) >= self.MAX_IDLE_BUCKETS:
+                self._chats = {
+                    key: value
+                    for key, value in self._chats.items()
+                    if not value.is_idle(now)
+                }
+            bucket = self._chats[chat_id] = self._new_chat_bucket(chat_id, now)
+        return bucket
+
+    def _new_chat_bucket(self, chat_id: Any, now: float) -> TokenBucket:
+        with contextlib.suppress(TypeError, ValueError):
+            chat_id = int(chat_id)
+        # Manfiy ID yoki @username - guruh/kanal
+        if isinstance(chat_id, str) or chat_id < 0:
+            return TokenBucket(GROUP_RATE, self.chat_burst, now)
+        return TokenBucket(self.chat_rate, self.chat_burst, now)
+
+    async def _pause(self, delay: float) -> None:
+        # Navbat allaqachon to'xtatilgan bo'lsa, faqat shu so'rov kutadi
+        if not self._resume.is_set():
+            await asyncio.sleep(delay)
+            return
+        self._resume.clear()
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._resume.set()
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
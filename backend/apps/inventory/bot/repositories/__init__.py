@@ -0,0 +1,82 @@
+"""Bot handlerlari uchun asinxron ma'lumotlar qatlami"""
+
+from .users import (
+    get_or_create_user,
+    promote_first_user,
+    list_users,
+    get_user,
+    get_user_order_stats,
+    update_user,
+    update_profiles,
+)
+from .products import (
+    list_categories,
+    list_categories_with_counts,
+    get_category,
+    get_or_create_category,
+    list_products,
+    list_products_with_category,
+    get_product,
+    create_product,
+    add_stock,
+    import_stock,
+)
+from .orders import (
+    create_order,
+    get_order,
+    count_pending_orders,
+    list_pending_orders,
+    list_pending_orders_with_count,
+    list_user_orders,
+    complete_order,
+    complete_orders,
+    complete_product_orders,
+    cancel_order,
+)
+from .transactions import list_recent_transactions
+from .notifications import (
+    claim_notifications,
+    mark_notifications_sent,
+    record_notification_failures,
+    enqueue_low_stock_digest,
+)
+
+__all__ = [
+    # Users
+    "get_or_create_user",
+    "promote_first_user",
+    "list_users",
+    "get_user",
+    "get_user_order_stats",
+    "update_user",
+    "update_profiles",
+    # Products
+    "list_categories",
+    "list_categories_with_counts",
+    "get_category",
+    "get_or_create_category",
+    "list_products",
+    "list_products_with_category",
+    "get_product",
+    "create_product",
+    "add_stock",
+    "import_stock",
+    # Orders
+    "create_order",
+    "get_order",
+    "count_pending_orders",
+    "list_pending_orders",
+    "list_pending_orders_with_count",
+    "list_user_orders",
+    "complete_order",
+    "complete_orders",
+    "complete_product_orders",
+    "cancel_order",
+    # Transactions
+    "list_recent_transactions",
+    # Notifications
+    "claim_notifications",
+    "mark_notifications_sent",
+    "record_notification_failures",
+    "enqueue_low_stock_digest",
+]
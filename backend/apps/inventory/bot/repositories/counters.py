@@ -0,0 +1,171 @@
+"""Bazada saqlanadigan hisoblagichlar
+
+``COUNT(*)`` o'rniga bitta qator o'qiladi. Qiymat o'zgarish bilan bitta
+tranzaksiyada ``adjust_counter`` orqali yangilanadi; admin paneldagi
+o'zgarishlar kabi chetlab o'tilgan holatlar ``verify_counters`` bilan
+(bot fon vazifasi yoki ``reconcile_stock`` buyrug'i)
+``BOT_COUNTER_VERIFY_INTERVAL`` da bir marta haqiqiy son bilan tuzatiladi.
+Bot so'rovlari faqat saqlangan qiymatni o'qiydi.
+
+``Product.reserved_quantity`` ham shunday hisoblagich (mahsulotning
+kutilayotgan zakaslari yig'indisi): kutilayotgan zakaslar soni tekshirilganda
+u ham zakaslardan qayta hisoblanadi.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.inventory.models import Counter, Order, OrderStatus, Product
+from apps.inventory.bot.catalog import stock_changed
+
+logger = logging.getLogger(__name__)
+
+PENDING_ORDERS = "pending_orders"
+
+# kalit -> haqiqiy qiymatni hisoblash
+COUNTERS: Dict[str, Callable[[], int]] = {
+    PENDING_ORDERS: lambda: Order.objects.filter(status=OrderStatus.PENDING).count(),
+}
+
+
+def _pending_total(prefix: str = "") -> Coalesce:
+    """Kutilayotgan zakaslar miqdori yig'indisi (band qilinishi kerak bo'lgan)"""
+    return Coalesce(
+        Sum(
+            f"{prefix}quantity",
+            filter=Q(**{f"{prefix}status": OrderStatus.PENDING}),
+        ),
+        Value(Decimal(0)),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def adjust_counter(key: str, delta: int) -> None:
+    """Hisoblagichni o'zgartirish (chaqiruvchi tranzaksiyasi ichida)
+
+    Qator qulfi tranzaksiya oxirigacha saqlanadi - chaqiruvchi buni
+    tranzaksiyaning oxirgi so'rovlaridan biri qilib bajarsin.
+    """
+    if delta:
+        Counter.objects.filter(key=key).update(value=F("value") + delta)
+
+
+def verify_counter(key: str) -> int:
+    """Hisoblagichni haqiqiy son bilan tekshirish va tuzatish
+
+    Qator qulflangandan keyin sanaladi: parallel ``adjust_counter`` yoki
+    sanashdan oldin tugaydi (va sanashga kiradi), yoki qulfni kutib,
+    tuzatilgan qiymatga qo'shiladi.
+    """
+    with transaction.atomic():
+        counter, _ = Counter.objects.select_for_update().get_or_create(key=key)
+        value = COUNTERS[key]()
+        if value != counter.value:
+            logger.warning(
+                "Counter %s drifted: %s, actual %s", key, counter.value, value
+            )
+        counter.value = value
+        counter.verified_at = timezone.now()
+        counter.save(update_fields=["value", "verified_at"])
+
+    heal = AFTER_VERIFY.get(key)
+    if heal is not None:
+        # Hisoblagich qulfidan keyin - mahsulot qulflari bilan tartib buzilmasin
+        heal()
+    return value
+
+
+def read_counter(key: str) -> int:
+    """Saqlangan qiymat (tekshirish va tuzatish fon vazifasida)"""
+    value = Counter.objects.filter(key=key).values_list("value", flat=True).first()
+    if value is None:
+        # Qator hali yaratilmagan - qulfsiz sanash
+        return COUNTERS[key]()
+    return value
+
+
+def verify_counters(max_age: Optional[float] = None) -> List[str]:
+    """``max_age`` (s) dan eski hisoblagichlarni tekshirish
+
+    Davriy fon vazifasi uchun: bir nechta jarayon chaqirsa ham hisoblagich
+    oraliqda bir marta tekshiriladi. Tekshirilgan kalitlarni qaytaradi.
+    """
+    if max_age is None:
+        max_age = settings.BOT_COUNTER_VERIFY_INTERVAL
+    fresh = set(
+        Counter.objects.filter(
+            verified_at__gte=timezone.now() - timedelta(seconds=max_age)
+        ).values_list("key", flat=True)
+    )
+    stale = [key for key in COUNTERS if key not in fresh]
+    for key in stale:
+        verify_counter(key)
+    return stale
+
+
+# ============ Reservations ============
+
+
+def iter_reservation_drift() -> Iterator[Tuple[int, str, Decimal, Decimal]]:
+    """``reserved_quantity`` kutilayotgan zakaslar yig'indisiga teng bo'lmagan mahsulotlar
+
+    Yields:
+        (product_id, name, reserved_quantity, pending)
+    """
+    return (
+        Product.objects.order_by()
+        .annotate(pending=_pending_total("orders__"))
+        .exclude(reserved_quantity=F("pending"))
+        .values_list("id", "name", "reserved_quantity", "pending")
+        .iterator()
+    )
+
+
+def reconcile_reservation(product_id: int) -> Optional[Tuple[Decimal, Decimal]]:
+    """Mahsulotning band qilingan miqdorini zakaslardan qayta hisoblash
+
+    Mahsulot qatori qulflanadi: band qilish va bajarish shu qatorni
+    o'zgartiradi, shuning uchun sanash paytida ular yarim qolmaydi.
+
+    Returns:
+        (eski, yangi) yoki farq bo'lmasa ``None``
+    """
+    with transaction.atomic():
+        product = (
+            Product.objects.select_for_update()
+            .only("quantity", "reserved_quantity")
+            .get(id=product_id)
+        )
+        pending = Order.objects.filter(product_id=product_id).aggregate(
+            total=_pending_total()
+        )["total"]
+        if pending == product.reserved_quantity:
+            return None
+
+        old = product.reserved_quantity
+        Product.objects.filter(id=product_id).update(reserved_quantity=pending)
+        stock_changed(product_id, product.quantity, pending)
+    logger.warning(
+        "Reservation of product %s drifted: %s, actual %s", product_id, old, pending
+    )
+    return old, pending
+
+
+def reconcile_reservations() -> int:
+    """Barcha farqli mahsulotlarni tuzatish, tuzatilganlar sonini qaytaradi"""
+    drifted = [product_id for product_id, *_ in iter_reservation_drift()]
+    return sum(1 for product_id in drifted if reconcile_reservation(product_id))
+
+
+# kalit -> hisoblagich tekshirilgandan keyin bajariladigan tuzatish
+AFTER_VERIFY: Dict[str, Callable[[], object]] = {
+    PENDING_ORDERS: reconcile_reservations,
+}
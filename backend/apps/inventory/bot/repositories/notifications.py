@@ -0,0 +1,81 @@
+"""Bildirishnomalar (outbox) repozitoriyasi"""
+
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.inventory.models import Notification, NotificationStatus
+from apps.inventory.bot.db import database_sync_to_async
+from apps.inventory.bot.notifications import notify_low_stock_digest
+
+# Qayta urinishlar orasidagi kutish: 10 s, 20 s, 40 s ... (1 soatdan oshmaydi)
+RETRY_BASE_DELAY = 10
+RETRY_MAX_DELAY = 3600
+
+
+@database_sync_to_async
+def claim_notifications(limit: int, lease: float) -> List[Notification]:
+    """Yuborish vaqti kelgan xabarlarni band qilish
+
+    Band qilingan xabarlarning ``next_attempt_at`` i ``lease`` soniyaga
+    suriladi - boshqa worker ularni olmaydi. Worker natijani yozmasdan to'xtasa,
+    xabar shu vaqtdan keyin qayta yuboriladi (kamida bir marta yetkazish).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationStatus.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        Notification.objects.filter(id__in=[n.id for n in batch]).update(
+            attempts=F("attempts") + 1,
+            next_attempt_at=now + timedelta(seconds=lease),
+        )
+
+    for notification in batch:
+        notification.attempts += 1
+    return batch
+
+
+@database_sync_to_async
+def mark_notifications_sent(ids: List[int]) -> None:
+    Notification.objects.filter(id__in=ids).update(
+        status=NotificationStatus.SENT, sent_at=timezone.now(), last_error=None
+    )
+
+
+@database_sync_to_async
+def record_notification_failures(
+    failures: Iterable[Tuple[Notification, str, bool]], max_attempts: int
+) -> None:
+    """Yuborilmagan xabarlar: keyinroq qayta urinish yoki ``FAILED`` holati
+
+    ``failures`` - (xabar, xatolik matni, qayta urinish mumkinmi) lar.
+    """
+    now = timezone.now()
+    rows = []
+    for notification, error, retryable in failures:
+        notification.last_error = error
+        if retryable and notification.attempts < max_attempts:
+            delay = RETRY_BASE_DELAY * 2 ** (notification.attempts - 1)
+            notification.next_attempt_at = now + timedelta(
+                seconds=min(delay, RETRY_MAX_DELAY)
+            )
+        else:
+            notification.status = NotificationStatus.FAILED
+        rows.append(notification)
+
+    Notification.objects.bulk_update(
+        rows, ["status", "next_attempt_at", "last_error"]
+    )
+
+
+@database_sync_to_async
+def enqueue_low_stock_digest(dedup_key: Optional[str] = None) -> int:
+    """Kam qolgan mahsulotlar ro'yxatini navbatga qo'yish"""
+    with transaction.atomic():
+        return notify_low_stock_digest(dedup_key)
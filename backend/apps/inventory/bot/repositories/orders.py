@@ -0,0 +1,316 @@
+"""Zakaslar repozitoriyasi"""
+
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.inventory.models import (
+    Order,
+    OrderStatus,
+    Product,
+    TelegramUser,
+    Transaction,
+    TransactionType,
+)
+from apps.inventory.bot.catalog import stock_changed
+from apps.inventory.bot.db import database_sync_to_async
+from apps.inventory.bot.repositories.counters import (
+    PENDING_ORDERS,
+    adjust_counter,
+    read_counter,
+)
+from apps.inventory.bot.notifications import (
+    notify_new_order,
+    notify_low_stock,
+    notify_order_completed,
+    notify_orders_completed,
+    notify_order_cancelled,
+)
+from apps.inventory.bot.utils import (
+    release_product_stock,
+    remove_product_stock,
+    reserve_product_stock,
+)
+
+if TYPE_CHECKING:
+    from apps.inventory.bot.auth import BotUser
+
+
+ORDER_RELATED = ("product", "product__category", "requester", "fulfilled_by")
+
+
+@database_sync_to_async
+def create_order(
+    requester: "BotUser", product_id: int, quantity: Decimal, note: str = None
+) -> Tuple[Optional[Order], str]:
+    """Mahsulotni band qilib zakas yaratish va ombor hodimlariga xabar
+
+    Returns:
+        (order, error_message) - yetarli mahsulot bo'lmasa ``order`` None
+    """
+    with transaction.atomic():
+        if not reserve_product_stock(product_id, quantity):
+            product = Product.objects.get(id=product_id)
+            return (
+                None,
+                f"Yetarli mahsulot yo'q. Mavjud: {product.available_quantity} {product.unit}",
+            )
+
+        order = Order.objects.create(
+            requester_id=requester.id,
+            product_id=product_id,
+            quantity=quantity,
+            note=note,
+            status=OrderStatus.PENDING,
+        )
+        order = Order.objects.select_related(*ORDER_RELATED).get(id=order.id)
+        notify_new_order(order, requester)
+        adjust_counter(PENDING_ORDERS, 1)
+
+    return order, ""
+
+
+@database_sync_to_async
+def get_order(order_id: int, pending_only: bool = False) -> Optional[Order]:
+    orders = Order.objects.select_related(*ORDER_RELATED)
+    if pending_only:
+        orders = orders.filter(status=OrderStatus.PENDING)
+    return orders.filter(id=order_id).first()
+
+
+@database_sync_to_async
+def count_pending_orders() -> int:
+    return read_counter(PENDING_ORDERS)
+
+
+def _pending_orders(limit: int) -> List[Order]:
+    return list(
+        Order.objects.filter(status=OrderStatus.PENDING).select_related(
+            "product", "requester"
+        )[:limit]
+    )
+
+
+@database_sync_to_async
+def list_pending_orders(limit: int = 20) -> List[Order]:
+    return _pending_orders(limit)
+
+
+@database_sync_to_async
+def list_pending_orders_with_count(limit: int = 20) -> Tuple[List[Order], int]:
+    """Kutilayotgan zakaslar va ularning umumiy soni
+
+    Ro'yxat to'lmagan bo'lsa, son ro'yxatning o'zidan olinadi.
+    """
+    orders = _pending_orders(limit)
+    if len(orders) < limit:
+        return orders, len(orders)
+    return orders, read_counter(PENDING_ORDERS)
+
+
+@database_sync_to_async
+def list_user_orders(user: "BotUser", limit: int = 10) -> List[Order]:
+    return list(Order.objects.filter(requester_id=user.id).select_related("product")[:limit])
+
+
+@database_sync_to_async
+def complete_order(order: Order, user: "BotUser") -> Tuple[bool, str]:
+    """Zakasni bajarish: mahsulotni chiqarish va holatni yangilash
+
+    Returns:
+        (success, error_message)
+    """
+    with transaction.atomic():
+        # Zakasni band qilish: ikki hodim bir vaqtda bajarsa, faqat bittasi o'tadi
+        fulfilled_at = timezone.now()
+        claimed = Order.objects.filter(
+            id=order.id, status=OrderStatus.PENDING
+        ).update(
+            status=OrderStatus.COMPLETED,
+            fulfilled_by_id=user.id,
+            fulfilled_at=fulfilled_at,
+        )
+        if not claimed:
+            return False, "Zakas allaqachon bajarilgan yoki bekor qilingan."
+
+        product = order.product
+        success, _, error = remove_product_stock(product, order.quantity, user, order=order)
+        if not success:
+            # Zakas holatini qaytarish
+            transaction.set_rollback(True)
+            return False, error
+
+        order.status = OrderStatus.COMPLETED
+        order.fulfilled_by = user.as_model()
+        order.fulfilled_at = fulfilled_at
+
+        notify_order_completed(order)
+        if product.is_low_stock:
+            notify_low_stock(product)
+        adjust_counter(PENDING_ORDERS, -1)
+
+    return True, ""
+
+
+def fulfill_orders(
+    order_ids: Iterable[int],
+    user: Optional[TelegramUser] = None,
+    note: Optional[str] = None,
+) -> Dict[int, str]:
+    """Bir nechta zakasni bitta tranzaksiyada bajarish
+
+    Zakaslar va ularning mahsulotlari bir marta qulflanadi (mahsulotlar id
+    tartibida - parallel chaqiruvlar bir-birini kutib qolmaydi), qoldiq
+    xotirada tekshiriladi, keyin zakaslar, mahsulotlar va tranzaksiyalar
+    ``bulk_update``/``bulk_create`` bilan yoziladi. Qoldiq yetmasa, eski
+    zakaslar birinchi bajariladi.
+
+    Returns:
+        order_id -> xatolik matni ("" - bajarildi), ``order_ids`` tartibida
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    results = {order_id: "Zakas topilmadi." for order_id in order_ids}
+    now = timezone.now()
+
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update(of=("self",))
+            .filter(id__in=order_ids)
+            .select_related("requester")
+            .order_by("created_at", "id")
+        )
+        products = {
+            product.id: product
+            for product in Product.objects.select_for_update()
+            .filter(id__in={order.product_id for order in orders})
+            .select_related("category")
+            .order_by("id")
+        }
+
+        completed = []
+        records = []
+        for order in orders:
+            product = products[order.product_id]
+            order.product = product
+            if order.status != OrderStatus.PENDING:
+                results[order.id] = "Zakas allaqachon bajarilgan yoki bekor qilingan."
+                continue
+            if product.quantity < order.quantity:
+                results[order.id] = (
+                    f"Yetarli mahsulot yo'q. Mavjud: {product.quantity} {product.unit}"
+                )
+                continue
+
+            # Zakas uchun band qilingan miqdor ham bo'shatiladi
+            product.quantity -= order.quantity
+            product.reserved_quantity -= order.quantity
+            product.updated_at = now
+            order.status = OrderStatus.COMPLETED
+            order.fulfilled_by = user
+            order.fulfilled_at = now
+            completed.append(order)
+            records.append(
+                Transaction(
+                    product=product,
+                    transaction_type=TransactionType.OUT,
+                    quantity=order.quantity,
+                    performed_by=user,
+                    order=order,
+                    note=note,
+                )
+            )
+            results[order.id] = ""
+
+        if completed:
+            Order.objects.bulk_update(
+                completed, ["status", "fulfilled_by", "fulfilled_at"]
+            )
+            changed = {order.product_id: order.product for order in completed}
+            Product.objects.bulk_update(
+                changed.values(), ["quantity", "reserved_quantity", "updated_at"]
+            )
+            Transaction.objects.bulk_create(records)
+
+            notify_orders_completed(completed)
+            for product in changed.values():
+                stock_changed(product.id, product.quantity, product.reserved_quantity)
+                if product.is_low_stock:
+                    notify_low_stock(product)
+            adjust_counter(PENDING_ORDERS, -len(completed))
+
+    return results
+
+
+@database_sync_to_async
+def complete_orders(order_ids: List[int], user: "BotUser") -> Dict[int, str]:
+    """Tanlangan zakaslarni bajarish (``fulfill_orders``)"""
+    return fulfill_orders(order_ids, user.as_model())
+
+
+@database_sync_to_async
+def complete_product_orders(product_id: int, user: "BotUser") -> Dict[int, str]:
+    """Mahsulot bo'yicha barcha kutilayotgan zakaslarni bajarish"""
+    order_ids = (
+        Order.objects.filter(product_id=product_id, status=OrderStatus.PENDING)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+    return fulfill_orders(order_ids, user.as_model())
+
+
+def cancel_pending_order(order: Order) -> bool:
+    """Zakasni bekor qilish va band qilingan miqdorni bo'shatish
+
+    Returns:
+        False - zakas allaqachon bajarilgan yoki bekor qilingan
+    """
+    with transaction.atomic():
+        cancelled = Order.objects.filter(
+            id=order.id, status=OrderStatus.PENDING
+        ).update(status=OrderStatus.CANCELLED)
+        if not cancelled:
+            return False
+
+        release_product_stock(order.product_id, order.quantity)
+        order.status = OrderStatus.CANCELLED
+        notify_order_cancelled(order)
+        adjust_counter(PENDING_ORDERS, -1)
+    return True
+
+
+@database_sync_to_async
+def cancel_order(order: Order) -> bool:
+    """Zakasni bekor qilish (``cancel_pending_order``)"""
+    return cancel_pending_order(order)
+
+
+def delete_orders(order_ids: Iterable[int]) -> int:
+    """Zakaslarni o'chirish (admin panel)
+
+    Kutilayotgan zakaslarning band qilingan miqdori bo'shatiladi va
+    hisoblagich kamaytiriladi - aks holda mahsulot abadiy band bo'lib qoladi.
+
+    Returns:
+        o'chirilgan zakaslar soni
+    """
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update().filter(id__in=list(order_ids))
+        )
+        reserved: Dict[int, Decimal] = {}
+        pending = 0
+        for order in orders:
+            if order.status == OrderStatus.PENDING:
+                pending += 1
+                reserved[order.product_id] = (
+                    reserved.get(order.product_id, Decimal(0)) + order.quantity
+                )
+
+        Order.objects.filter(id__in=[order.id for order in orders]).delete()
+        # Mahsulotlar id tartibida - parallel bajarish bilan bir-birini kutmaydi
+        for product_id in sorted(reserved):
+            release_product_stock(product_id, reserved[product_id])
+        adjust_counter(PENDING_ORDERS, -pending)
+    return len(orders)
@@ -0,0 +1,264 @@
+"""Kategoriya va mahsulotlar repozitoriyasi"""
+
+from decimal import Decimal
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.inventory.models import (
+    Category,
+    Product,
+    Transaction,
+    TransactionType,
+)
+from apps.inventory.bot.catalog import (
+    CatalogCategory,
+    CatalogProduct,
+    catalog_changed,
+    get_catalog,
+    stock_changed,
+)
+from apps.inventory.bot.db import database_sync_to_async
+from apps.inventory.bot.intake import IntakeItem, read_intake
+from apps.inventory.bot.utils import add_product_stock
+
+if TYPE_CHECKING:
+    from apps.inventory.bot.auth import BotUser
+
+
+# ============ Categories ============
+
+
+# Klaviatura ro'yxatlari jarayon ichidagi katalogdan o'qiladi (``bot/catalog.py``)
+
+
+async def list_categories() -> Tuple[CatalogCategory, ...]:
+    return (await get_catalog()).categories
+
+
+@database_sync_to_async
+def list_categories_with_counts() -> List[Category]:
+    """Kategoriyalar umumiy ko'rinishi - bitta ``GROUP BY`` so'rovi
+
+    Har bir kategoriyaga ``product_count``, ``low_stock_count`` va
+    ``total_quantity`` qo'shiladi.
+    """
+    return list(
+        Category.objects.annotate(
+            product_count=Count("products"),
+            low_stock_count=Count(
+                "products",
+                filter=Q(
+                    products__min_quantity__gt=0,
+                    products__quantity__lte=F("products__min_quantity"),
+                ),
+            ),
+            total_quantity=Coalesce(
+                Sum("products__quantity"),
+                Value(Decimal(0)),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+    )
+
+
+async def get_category(category_id: int) -> Optional[CatalogCategory]:
+    return (await get_catalog()).category(category_id)
+
+
+@database_sync_to_async
+def get_or_create_category(name: str) -> Tuple[Category, bool]:
+    return Category.objects.get_or_create(name=name)
+
+
+# ============ Products ============
+
+
+async def list_products(category_id: int) -> Tuple[CatalogProduct, ...]:
+    """Kategoriyadagi mahsulotlar"""
+    return (await get_catalog()).products_in(category_id)
+
+
+async def list_products_with_category() -> Tuple[CatalogProduct, ...]:
+    """Barcha mahsulotlar kategoriyasi bilan (ro'yxat uchun)"""
+    return (await get_catalog()).products
+
+
+@database_sync_to_async
+def get_product(product_id: int) -> Optional[Product]:
+    return Product.objects.select_related("category").filter(id=product_id).first()
+
+
+@database_sync_to_async
+def create_product(
+    name: str,
+    category_id: int,
+    quantity: Decimal,
+    unit: str,
+    min_quantity: Decimal,
+    user: "BotUser",
+) -> Product:
+    """Yangi mahsulot yaratish va kirim tranzaksiyasini yozish"""
+    with transaction.atomic():
+        product = Product.objects.create(
+            name=name,
+            category_id=category_id,
+            quantity=quantity,
+            unit=unit,
+            min_quantity=min_quantity,
+        )
+        Transaction.objects.create(
+            product=product,
+            transaction_type=TransactionType.IN,
+            quantity=quantity,
+            performed_by_id=user.id,
+            note="Yangi mahsulot",
+        )
+
+    return Product.objects.select_related("category").get(id=product.id)
+
+
+@database_sync_to_async
+def add_stock(
+    product_id: int, quantity: Decimal, user: "BotUser", note: str = None
+) -> Tuple[Product, Decimal]:
+    """Mavjud mahsulotga kirim qilish
+
+    Returns:
+        (product, old_quantity)
+    """
+    product = Product.objects.get(id=product_id)
+    add_product_stock(product, quantity, user, note=note)
+
+    # Parallel o'zgarishlar bo'lsa ham aynan shu kirimdan oldingi qiymat
+    return product, product.quantity - quantity
+
+
+# ============ Stock intake ============
+
+
+# Parallel yaratilgan kategoriya/mahsulot bilan to'qnashuvda urinishlar soni
+INTAKE_ATTEMPTS = 3
+
+
+def apply_stock_intake(
+    items: Iterable[IntakeItem], user_id: Optional[int] = None, note: str = None
+) -> Tuple[int, int, int]:
+    """Jadvaldan o'qilgan kirimni bitta tranzaksiyada yozish
+
+    Kategoriya va mahsulotlar nomi bo'yicha (katta-kichik harfsiz) topiladi,
+    yo'qlari yaratiladi. Mavjud mahsulotlar qulflanadi va ``bulk_update``,
+    yangilari va kirim tranzaksiyalari ``bulk_create`` bilan yoziladi.
+
+    Yo'q kategoriya yoki mahsulotni boshqa jarayon shu paytda yaratib
+    qo'ysa, yozish ``IntegrityError`` beradi: tranzaksiya qaytariladi va
+    qidiruv (endi yangi qatorlar bilan) qaytadan bajariladi.
+
+    Returns:
+        (yangilangan mahsulotlar, yangi mahsulotlar, yangi kategoriyalar)
+    """
+    items = list(items)
+    for attempt in range(1, INTAKE_ATTEMPTS + 1):
+        try:
+            return _write_stock_intake(items, user_id, note)
+        except IntegrityError:
+            if attempt == INTAKE_ATTEMPTS:
+                raise
+
+
+def _write_stock_intake(
+    items: List[IntakeItem], user_id: Optional[int], note: Optional[str]
+) -> Tuple[int, int, int]:
+    now = timezone.now()
+
+    with transaction.atomic():
+        categories = {c.name.casefold(): c for c in Category.objects.all()}
+        new_categories = {}
+        for item in items:
+            key = item.category.casefold()
+            if key not in categories and key not in new_categories:
+                new_categories[key] = Category(name=item.category)
+        if new_categories:
+            Category.objects.bulk_create(new_categories.values())
+            categories.update(new_categories)
+        if any(category.id is None for category in new_categories.values()):
+            # Baza bulk_create dan keyin id qaytarmagan
+            categories.update(
+                (c.name.casefold(), c)
+                for c in Category.objects.filter(
+                    name__in=[c.name for c in new_categories.values()]
+                )
+            )
+
+        products = {
+            (p.category_id, p.name.casefold()): p
+            for p in Product.objects.select_for_update()
+            .filter(category_id__in={categories[i.category.casefold()].id for i in items})
+            .order_by("id")
+        }
+
+        updated, created = [], []
+        for item in items:
+            category = categories[item.category.casefold()]
+            product = products.get((category.id, item.name.casefold()))
+            if product is None:
+                product = Product(
+                    name=item.name,
+                    category=category,
+                    quantity=item.quantity,
+                    unit=item.unit,
+                    min_quantity=item.min_quantity,
+                )
+                products[(category.id, item.name.casefold())] = product
+                created.append(product)
+            else:
+                product.quantity += item.quantity
+                product.updated_at = now
+                updated.append(product)
+
+        if updated:
+            Product.objects.bulk_update(updated, ["quantity", "updated_at"])
+        if created:
+            Product.objects.bulk_create(created)
+        if any(product.id is None for product in created):
+            # Baza bulk_create dan keyin id qaytarmagan
+            ids = {
+                (p.category_id, p.name.casefold()): p.id
+                for p in Product.objects.filter(
+                    category_id__in={p.category_id for p in created},
+                    name__in=[p.name for p in created],
+                )
+            }
+            for product in created:
+                product.id = ids[(product.category_id, product.name.casefold())]
+
+        Transaction.objects.bulk_create(
+            Transaction(
+                product=products[
+                    (categories[item.category.casefold()].id, item.name.casefold())
+                ],
+                transaction_type=TransactionType.IN,
+                quantity=item.quantity,
+                performed_by_id=user_id,
+                note=note,
+            )
+            for item in items
+        )
+
+        if created or new_categories:
+            catalog_changed()
+        else:
+            for product in updated:
+                stock_changed(product.id, product.quantity, product.reserved_quantity)
+
+    return len(updated), len(created), len(new_categories)
+
+
+@database_sync_to_async
+def import_stock(stream, filename: str, user: "BotUser") -> Tuple[int, int, int]:
+    """Faylni o'qib kirim qilish (``IntakeError`` - fayl xato bo'lsa)"""
+    items = read_intake(stream, filename)
+    return apply_stock_intake(items, user.id, note=f"Fayl: {filename}")
@@ -0,0 +1,208 @@
+"""Qoldiq snapshotlari va biror vaqtdagi qoldiqni hisoblash
+
+Biror vaqtdagi qoldiq butun tarixni qayta hisoblamasdan topiladi:
+eng yaqin snapshot + undan keyingi (yoki oldingi) tranzaksiyalar farqi.
+Bu yerda faqat ``Product.quantity`` dan olingan (``STOCK``) snapshotlar
+yoziladi va o'qiladi; arxivning ``LEDGER`` snapshotlari tekshiruv uchun.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from apps.inventory.models import (
+    Product,
+    SnapshotSource,
+    StockSnapshot,
+    Transaction,
+    TransactionType,
+)
+from apps.inventory.ledger import (
+    SIGNED_QUANTITY,
+    archive_boundary,
+    archived_net_changes,
+)
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+
+def _net_changes(
+    after: Optional[datetime],
+    until: Optional[datetime],
+    product_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, Decimal]:
+    """``(after, until]`` oralig'idagi tranzaksiyalar farqi (mahsulot -> +/-)
+
+    Oraliq arxivlangan oylarga tushsa, ularning qismi arxiv fayllaridan o'qiladi.
+    """
+    if product_ids is not None:
+        product_ids = list(product_ids)
+
+    net: Dict[int, Decimal] = {}
+    boundary = archive_boundary()
+    if boundary is not None and (after is None or after < boundary):
+        archived_until = boundary if until is None else min(until, boundary)
+        net = archived_net_changes(after, archived_until, product_ids)
+        after = boundary if after is None else max(after, boundary)
+        if until is not None and until <= after:
+            return net
+
+    transactions = Transaction.objects.all()
+    if after is not None:
+        transactions = transactions.filter(created_at__gt=after)
+    if until is not None:
+        transactions = transactions.filter(created_at__lte=until)
+    if product_ids is not None:
+        transactions = transactions.filter(product_id__in=product_ids)
+    for product_id, change in (
+        transactions.order_by()
+        .values("product_id")
+        .annotate(net=Sum(SIGNED_QUANTITY))
+        .values_list("product_id", "net")
+    ):
+        net[product_id] = net.get(product_id, Decimal(0)) + change
+    return net
+
+
+def take_stock_snapshot(taken_at: Optional[datetime] = None) -> int:
+    """Barcha mahsulotlarning joriy qoldig'ini yozish"""
+    taken_at = taken_at or timezone.now()
+    with transaction.atomic():
+        rows = [
+            StockSnapshot(product_id=product_id, taken_at=taken_at, quantity=quantity)
+            for product_id, quantity in Product.objects.values_list("id", "quantity")
+        ]
+        StockSnapshot.objects.bulk_create(
+            rows, batch_size=SNAPSHOT_BATCH_SIZE, ignore_conflicts=True
+        )
+    return len(rows)
+
+
+def snapshot_slots(start: datetime, end: datetime, interval: timedelta) -> List[datetime]:
+    """``start`` va ``end`` orasidagi snapshot vaqtlari (mahalliy yarim tundan)"""
+    local = timezone.localtime(start)
+    slot = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    slot += interval * ((local - slot) // interval)
+    slots = []
+    while slot <= end:
+        if slot >= start - interval:
+            slots.append(slot)
+        slot += interval
+    return slots
+
+
+def backfill_stock_snapshots(
+    interval: timedelta, since: Optional[datetime] = None
+) -> int:
+    """O'tgan davr uchun snapshotlarni tranzaksiyalardan tiklash
+
+    Joriy qoldiqdan boshlab tranzaksiyalar yangisidan eskisiga qarab
+    "orqaga" qaytariladi - boshlang'ich qoldiq bilinmasa ham hisob to'g'ri.
+    Mavjud snapshotlar o'zgartirilmaydi. Arxivlangan oylar o'tkazib yuboriladi.
+
+    Returns:
+        yozilgan (yoki allaqachon bor) snapshotlar soni
+    """
+    now = timezone.now()
+    if since is None:
+        since = (
+            Transaction.objects.order_by("created_at")
+            .values_list("created_at", flat=True)
+            .first()
+        )
+        if since is None:
+            return 0
+    slots = snapshot_slots(since, now, interval)
+    boundary = archive_boundary()
+    if boundary is not None:
+        slots = [slot for slot in slots if slot >= boundary]
+    if not slots:
+        return 0
+
+    products = list(Product.objects.values_list("id", "quantity", "created_at"))
+    balances = {product_id: quantity for product_id, quantity, _ in products}
+    history = (
+        Transaction.objects.filter(created_at__gt=slots[0])
+        .order_by("-created_at")
+        .values_list("product_id", "transaction_type", "quantity", "created_at")
+        .iterator(chunk_size=SNAPSHOT_BATCH_SIZE)
+    )
+    pending = next(history, None)
+
+    count = 0
+    rows = []
+    for slot in reversed(slots):
+        # slot dan keyingi tranzaksiyalarni bekor qilish
+        while pending is not None and pending[3] > slot:
+            product_id, transaction_type, quantity, _ = pending
+            if product_id in balances:
+                if transaction_type == TransactionType.IN:
+                    balances[product_id] -= quantity
+                else:
+                    balances[product_id] += quantity
+            pending = next(history, None)
+
+        for product_id, _, created_at in products:
+            if created_at <= slot:
+                rows.append(
+                    StockSnapshot(
+                        product_id=product_id,
+                        taken_at=slot,
+                        quantity=balances[product_id],
+                    )
+                )
+        if len(rows) >= SNAPSHOT_BATCH_SIZE:
+            StockSnapshot.objects.bulk_create(rows, ignore_conflicts=True)
+            count += len(rows)
+            rows = []
+
+    StockSnapshot.objects.bulk_create(rows, ignore_conflicts=True)
+    return count + len(rows)
+
+
+def stock_at(product_id: int, at: datetime) -> Decimal:
+    """Mahsulotning ``at`` vaqtidagi qoldig'i"""
+    snapshots = StockSnapshot.objects.filter(
+        product_id=product_id, source=SnapshotSource.STOCK
+    )
+
+    before = snapshots.filter(taken_at__lte=at).order_by("-taken_at").first()
+    if before is not None:
+        net = _net_changes(before.taken_at, at, [product_id])
+        return before.quantity + net.get(product_id, 0)
+
+    # Birinchi snapshotdan oldin - keyingi snapshot (yoki joriy qoldiq)dan orqaga
+    after = snapshots.filter(taken_at__gt=at).order_by("taken_at").first()
+    if after is not None:
+        quantity, until = after.quantity, after.taken_at
+    else:
+        quantity = Product.objects.values_list("quantity", flat=True).get(id=product_id)
+        until = None
+    net = _net_changes(at, until, [product_id])
+    return quantity - net.get(product_id, 0)
+
+
+def stock_balances_at(at: datetime) -> Dict[int, Decimal]:
+    """Barcha mahsulotlarning ``at`` vaqtidagi qoldig'i (mahsulot id -> miqdor)"""
+    snapshots = StockSnapshot.objects.filter(source=SnapshotSource.STOCK)
+    taken_at = snapshots.filter(taken_at__lte=at).aggregate(
+        latest=Max("taken_at")
+    )["latest"]
+
+    if taken_at is None:
+        balances = dict(Product.objects.values_list("id", "quantity"))
+        for product_id, net in _net_changes(at, None).items():
+            if product_id in balances:
+                balances[product_id] -= net
+        return balances
+
+    balances = dict(
+        snapshots.filter(taken_at=taken_at).values_list("product_id", "quantity")
+    )
+    for product_id, net in _net_changes(taken_at, at).items():
+        balances[product_id] = balances.get(product_id, Decimal(0)) + net
+    return balances
@@ -0,0 +1,149 @@
+"""Kirim-chiqim tranzaksiyalari repozitoriyasi"""
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    DecimalField,
+    Expression,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.inventory.models import (
+    Product,
+    SnapshotSource,
+    StockSnapshot,
+    Transaction,
+    TransactionType,
+)
+from apps.inventory.bot.db import database_sync_to_async
+from apps.inventory.ledger import SIGNED_QUANTITY, archive_boundary, signed_quantity
+
+RECONCILE_CHUNK_SIZE = 2000
+
+
+def _ledger_total(expression: Expression, **extra) -> Coalesce:
+    return Coalesce(
+        Sum(expression, **extra),
+        Value(Decimal(0)),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def _opening_balance(boundary) -> Coalesce:
+    """Arxivlangan davr oxiridagi qoldiq (arxiv bo'lmasa - 0)"""
+    return Coalesce(
+        Subquery(
+            StockSnapshot.objects.filter(
+                product=OuterRef("pk"),
+                taken_at=boundary,
+                source=SnapshotSource.LEDGER,
+            ).values("quantity")[:1]
+        ),
+        Value(Decimal(0)),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def recent_transactions():
+    """Oxirgi ``LEDGER_HOT_DAYS`` kun - faqat yangi partitionlar o'qiladi"""
+    since = timezone.now() - timedelta(days=settings.LEDGER_HOT_DAYS)
+    return Transaction.objects.filter(created_at__gte=since)
+
+
+@database_sync_to_async
+def list_recent_transactions(limit: int = 30) -> List[Transaction]:
+    return list(
+        recent_transactions()
+        .select_related("product", "performed_by")
+        .order_by("-created_at")[:limit]
+    )
+
+
+# ============ Reconciliation ============
+
+
+def iter_stock_drift(
+    chunk_size: int = RECONCILE_CHUNK_SIZE,
+) -> Iterator[Tuple[int, str, Decimal, Decimal]]:
+    """Qoldig'i tranzaksiyalar yig'indisiga teng bo'lmagan mahsulotlar
+
+    Bitta ``GROUP BY ... HAVING`` so'rovi: yig'ish bazada bajariladi,
+    natija (PostgreSQL'da server-side cursor bilan) bo'lib-bo'lib o'qiladi.
+    Arxivlangan oylar o'rniga arxiv chegarasidagi snapshot olinadi.
+
+    Yields:
+        (product_id, name, quantity, ledger)
+    """
+    boundary = archive_boundary()
+    if boundary is None:
+        ledger = _ledger_total(signed_quantity("transactions__"))
+    else:
+        ledger = _opening_balance(boundary) + _ledger_total(
+            signed_quantity("transactions__"),
+            filter=Q(transactions__created_at__gt=boundary),
+        )
+    return (
+        Product.objects.order_by()
+        .annotate(ledger=ledger)
+        .exclude(quantity=F("ledger"))
+        .values_list("id", "name", "quantity", "ledger")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def reconcile_product(
+    product_id: int, user_id: Optional[int] = None, note: str = None
+) -> Optional[Transaction]:
+    """Farqni tuzatuvchi tranzaksiya yozish (``Product.quantity`` o'zgarmaydi)
+
+    Mahsulot qatori qulflanib, farq qayta hisoblanadi - tekshiruv va
+    tuzatish orasida bajarilgan kirim-chiqim ikki marta hisobga olinmaydi.
+
+    Returns:
+        yozilgan tranzaksiya yoki farq qolmagan bo'lsa ``None``
+    """
+    with transaction.atomic():
+        quantity = (
+            Product.objects.select_for_update()
+            .values_list("quantity", flat=True)
+            .get(id=product_id)
+        )
+        transactions = Transaction.objects.filter(product_id=product_id)
+        opening = Decimal(0)
+        boundary = archive_boundary()
+        if boundary is not None:
+            transactions = transactions.filter(created_at__gt=boundary)
+            opening = (
+                StockSnapshot.objects.filter(
+                    product_id=product_id,
+                    taken_at=boundary,
+                    source=SnapshotSource.LEDGER,
+                )
+                .values_list("quantity", flat=True)
+                .first()
+            ) or Decimal(0)
+        ledger = opening + transactions.aggregate(
+            total=_ledger_total(SIGNED_QUANTITY)
+        )["total"]
+        drift = quantity - ledger
+        if not drift:
+            return None
+
+        return Transaction.objects.create(
+            product_id=product_id,
+            transaction_type=TransactionType.IN if drift > 0 else TransactionType.OUT,
+            quantity=abs(drift),
+            performed_by_id=user_id,
+            note=note or f"Qoldiqni tuzatish: {ledger} -> {quantity}",
+        )
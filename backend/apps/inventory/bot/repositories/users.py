@@ -0,0 +1,85 @@
+"""Foydalanuvchilar repozitoriyasi"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from apps.inventory.models import OrderStatus, TelegramUser, UserRole
+from apps.inventory.bot.db import database_sync_to_async
+
+if TYPE_CHECKING:
+    from apps.inventory.bot.auth import BotUser
+
+
+@database_sync_to_async
+def get_or_create_user(
+    telegram_id: int, username: Optional[str], full_name: Optional[str]
+) -> TelegramUser:
+    """Telegram foydalanuvchisini olish yoki yaratish
+
+    Mavjud foydalanuvchining profili bu yerda yangilanmaydi -
+    ``profiles.ProfileWriter`` orqali paket bo'lib yoziladi.
+    """
+    user, _ = TelegramUser.objects.get_or_create(
+        telegram_id=telegram_id,
+        defaults={"username": username, "full_name": full_name or "Noma'lum"},
+    )
+    return user
+
+
+@database_sync_to_async
+def update_profiles(
+    profiles: Dict[int, Tuple[Optional[str], Optional[str]]]
+) -> int:
+    """Bir nechta foydalanuvchining username va ismini bitta paketda yozish
+
+    ``profiles`` - telegram_id -> (username, full_name); bo'sh qiymat
+    o'zgartirilmaydi.
+    """
+    users = []
+    for user in TelegramUser.objects.filter(telegram_id__in=list(profiles)):
+        username, full_name = profiles[user.telegram_id]
+        user.username = username or user.username
+        user.full_name = full_name or user.full_name
+        users.append(user)
+    return TelegramUser.objects.bulk_update(users, ["username", "full_name"])
+
+
+@database_sync_to_async
+def promote_first_user(user: "BotUser") -> "BotUser":
+    """Birinchi foydalanuvchini admin qilish"""
+    if user.role == UserRole.REQUESTER and TelegramUser.objects.count() == 1:
+        # save() signali keshdagi eski yozuvni o'chiradi
+        model = TelegramUser.objects.get(id=user.id)
+        model.role = UserRole.ADMIN
+        model.save(update_fields=["role"])
+        return type(user).from_model(model)
+    return user
+
+
+@database_sync_to_async
+def list_users(page: int = 0, per_page: int = 10) -> Tuple[List[TelegramUser], int]:
+    """Foydalanuvchilar sahifasi va umumiy soni"""
+    users = list(TelegramUser.objects.all()[page * per_page : (page + 1) * per_page])
+    return users, TelegramUser.objects.count()
+
+
+@database_sync_to_async
+def get_user(user_id: int) -> Optional[TelegramUser]:
+    return TelegramUser.objects.filter(id=user_id).first()
+
+
+@database_sync_to_async
+def get_user_order_stats(user: TelegramUser) -> Tuple[int, int]:
+    """(jami zakaslar, bajarilgan zakaslar)"""
+    return (
+        user.orders.count(),
+        user.orders.filter(status=OrderStatus.COMPLETED).count(),
+    )
+
+
+@database_sync_to_async
+def update_user(user: TelegramUser, **fields) -> TelegramUser:
+    """Foydalanuvchi maydonlarini yangilash"""
+    for name, value in fields.items():
+        setattr(user, name, value)
+    user.save(update_fields=list(fields))
+    return user
@@ -0,0 +1,82 @@
+"""Callback query router
+
+``callback_data`` (``prefix:arg1:arg2``) bir marta parse qilinadi va prefiks
+bo'yicha lug'atdan topilgan handlerga tayyor (int, rol va h.k.) argumentlar
+bilan uzatiladi. Regex'lar ro'yxatini ketma-ket tekshirishdan farqli o'laroq,
+tugmalar soni oshganda yo'naltirish narxi o'zgarmaydi.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import BaseHandler
+
+SEPARATOR = ":"
+
+Route = Tuple[Callable, Tuple[Callable[[str], Any], ...]]
+
+
+class CallbackRouter(BaseHandler):
+    """Barcha oddiy callback tugmalari uchun bitta handler
+
+    Misol::
+
+        router = CallbackRouter()
+        router.add("view_order", view_order_callback, int)
+        router.add("set_role", set_role_callback, int, UserRole)
+
+    Handler ``callback(update, context, *args)`` ko'rinishida chaqiriladi.
+    Noma'lum prefiks yoki noto'g'ri argumentli callback'lar boshqa
+    handlerlarga qoldiriladi.
+    """
+
+    def __init__(self):
+        super().__init__(self.dispatch)
+        self._routes: Dict[str, Route] = {}
+
+    def add(
+        self, prefix: str, callback: Callable, *arg_types: Callable[[str], Any]
+    ) -> None:
+        if prefix in self._routes:
+            raise ValueError(f"'{prefix}' prefiksi allaqachon ro'yxatdan o'tgan")
+        self._routes[prefix] = (callback, arg_types)
+
+    def resolve(self, data: str) -> Optional[Tuple[Callable, tuple]]:
+        """``callback_data`` -> (handler, argumentlar) yoki None"""
+        prefix, _, rest = data.partition(SEPARATOR)
+        route = self._routes.get(prefix)
+        if route is None:
+            return None
+
+        callback, arg_types = route
+        parts = rest.split(SEPARATOR) if rest else ()
+        if len(parts) != len(arg_types):
+            return None
+
+        try:
+            args = tuple(convert(part) for convert, part in zip(arg_types, parts))
+        except ValueError:
+            return None
+        return callback, args
+
+    def check_update(self, update: object) -> Optional[Tuple[Callable, tuple]]:
+        if isinstance(update, Update) and update.callback_query:
+            data = update.callback_query.data
+            if isinstance(data, str):
+                return self.resolve(data)
+        return None
+
+    async def dispatch(self, update, context, route=None):
+        """Callback uchun handlerni topib chaqirish (``self.callback``)
+
+        ``route`` - ``check_update`` natijasi; berilmasa qayta topiladi.
+        """
+        if route is None:
+            route = self.check_update(update)
+            if route is None:
+                return None
+        callback, args = route
+        return await callback(update, context, *args)
+
+    async def handle_update(self, update, application, check_result, context):
+        return await self.dispatch(update, context, check_result)
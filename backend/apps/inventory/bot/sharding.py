@@ -0,0 +1,305 @@
+"""Ko'p jarayonli rejim: update'larni foydalanuvchi bo'yicha worker jarayonlarga taqsimlash
+
+Ingress jarayoni Telegramdan update'larni oladi va ``user_id % N`` bo'yicha
+(foydalanuvchi bo'lmasa - ``chat_id``) N ta worker jarayonining navbatiga
+yuboradi. Bitta foydalanuvchining barcha update'lari (shaxsiy chat va
+guruhlardan) doim bitta workerga tushadi - suhbat tartibi saqlanadi va
+``user_data`` faqat bitta jarayon xotirasida bo'ladi; umumiy o'tkazuvchanlik
+esa CPU yadrolari bo'yicha oshadi. Suhbat holati ``DjangoPersistence`` orqali
+bazada turadi, shuning uchun worker qayta ishga tushsa ham holat yo'qolmaydi.
+
+Telegram ``offset`` dan oldingi update'larni tasdiqlangan deb hisoblaydi,
+shuning uchun offset faqat workerlar bajarib bo'lgan update'lardan keyin
+suriladi. Worker to'xtab qolsa, qayta ishga tushiriladi va uning
+tasdiqlanmagan update'lari qayta yuboriladi; ingress qayta ishga tushsa,
+Telegram ularni yana beradi. Ya'ni yetkazish "kamida bir marta": yiqilgan
+worker bajarib, tasdiqlab ulgurmagan update ikki marta bajarilishi mumkin.
+
+Modul ``spawn`` orqali worker jarayonlarda import qilinadi, shuning uchun
+Django modellari va handlerlar faqat funksiyalar ichida import qilinadi.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue as queue_module
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tasdiqlanmagan update'lar bor paytda Telegramni so'rash oralig'i (s)
+ACK_POLL_INTERVAL = 0.2
+# To'xtatishda workerlar navbatini bajarib bo'lishini kutish (s)
+STOP_TIMEOUT = 30
+
+# Update ichida chat/foydalanuvchi bo'lishi mumkin bo'lgan maydonlar
+UPDATE_PAYLOAD_KEYS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "channel_post",
+    "edited_channel_post",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+    "pre_checkout_query",
+    "shipping_query",
+)
+
+
+def shard_key(data: dict) -> int:
+    """Xom update (dict) uchun foydalanuvchi ID (bo'lmasa chat ID)
+
+    ``user_data`` foydalanuvchi bo'yicha saqlanadi: chat bo'yicha taqsimlansa,
+    bitta foydalanuvchi shaxsiy chat va guruhda ikki jarayonga tushib, har
+    birida ``user_data`` ning alohida nusxasi bo'lib qolardi.
+    """
+    for name in UPDATE_PAYLOAD_KEYS:
+        payload = data.get(name)
+        if not payload:
+            continue
+        if payload.get("from"):
+            return payload["from"]["id"]
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+    return 0
+
+
+def shard_for(data: dict, workers: int) -> int:
+    return shard_key(data) % workers
+
+
+class ShardPool:
+    """Worker jarayonlari, ularning navbatlari va tasdiqlanmagan update'lar
+
+    Worker ``target(index, queue, acks, *args)`` ko'rinishida chaqiriladi va
+    bajargan update'ining ``update_id`` sini ``acks`` ga yozadi.
+    """
+
+    def __init__(self, target: Callable, workers: int, args: Sequence = ()):
+        self.workers = workers
+        self.target = target
+        self.args = tuple(args)
+        self._context = multiprocessing.get_context("spawn")
+        self.acks = self._context.Queue()
+        self.queues = [None] * workers
+        self.processes = [None] * workers
+        # update_id -> xom update (workerga yuborilgan, hali tasdiqlanmagan)
+        self.pending: Dict[int, dict] = {}
+        self._stopped = False
+        for index in range(workers):
+            self._spawn(index)
+
+    def _spawn(self, index: int) -> None:
+        queue = self._context.Queue()
+        self.queues[index] = queue
+        self.processes[index] = self._context.Process(
+            target=self.target,
+            args=(index, queue, self.acks, *self.args),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+
+    def dispatch(self, data: dict) -> None:
+        self.pending[data["update_id"]] = data
+        self.queues[shard_for(data, self.workers)].put(data)
+
+    def collect_acks(self, timeout: Optional[float] = None) -> int:
+        """Workerlar tasdiqlagan update'larni ``pending`` dan olib tashlash
+
+        ``timeout`` - birinchi tasdiqni shuncha kutish (standart - kutmaslik).
+        """
+        count = 0
+        block = timeout is not None
+        while True:
+            try:
+                update_id = self.acks.get(block, timeout)
+            except queue_module.Empty:
+                return count
+            block = False
+            if self.pending.pop(update_id, None) is not None:
+                count += 1
+
+    def revive(self) -> int:
+        """To'xtab qolgan workerlarni qayta ishga tushirish
+
+        Eski navbatdagi update'lar yo'qolgan deb hisoblanadi: shu workerning
+        barcha tasdiqlanmagan update'lari yangi navbatga tartib bilan qayta
+        yuboriladi. Qayta yuborilgan update'lar sonini qaytaradi.
+        """
+        resent = 0
+        for index, process in enumerate(self.processes):
+            if self._stopped or process.exitcode is None:
+                continue
+            logger.error(
+                "Worker %s to'xtadi (exitcode %s), qayta ishga tushirilmoqda",
+                index,
+                process.exitcode,
+            )
+            self._spawn(index)
+            self.processes[index].start()
+            for update_id in sorted(self.pending):
+                data = self.pending[update_id]
+                if shard_for(data, self.workers) == index:
+                    self.queues[index].put(data)
+                    resent += 1
+        return resent
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Workerlar navbatidagi update'larni bajarib bo'lgach to'xtatish"""
+        if self._stopped:
+            return
+        self._stopped = True
+        # None - worker uchun to'xtash signali (navbat oxirida)
+        for queue in self.queues:
+            queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+
+
+# ============ Worker ============
+
+
+def bot_worker(index: int, queue, acks, token: str, workers: int) -> None:
+    """Worker jarayoni: navbatdagi update'larni o'z Application'ida bajarish"""
+    import django
+
+    django.setup()
+    logging.basicConfig(
+        format="%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+    asyncio.run(_run_bot_worker(index, queue, acks, token, workers))
+
+
+async def _run_bot_worker(index: int, queue, acks, token: str, workers: int) -> None:
+    from apps.inventory.bot.application import (
+        build_application,
+        start_background_tasks,
+        stop_background_tasks,
+    )
+
+    application = build_application(token, updater=False, shards=workers)
+
+    async with application:
+        await application.start()
+        await start_background_tasks(application, digest=index == 0)
+        logger.info("Worker %s ishga tushdi", index)
+
+        await serve_shard(application, queue, acks)
+
+        await stop_background_tasks(application)
+        await application.stop()
+
+
+async def _process_update(application, update, acks) -> None:
+    try:
+        await application.update_processor.process_update(
+            update, application.process_update(update)
+        )
+    finally:
+        # Handler xatosi error handler'da qayd etilgan - update qayta bajarilmaydi
+        acks.put(update.update_id)
+
+
+async def serve_shard(application, queue, acks) -> None:
+    """Navbatdagi update'larni ``None`` kelguncha bajarish va tasdiqlash
+
+    Update'lar ``Application.update_processor`` orqali bajariladi (chat
+    tartibi va parallellik ``run_polling`` dagidek). ``None`` dan keyin
+    boshlangan update'lar tugashi kutiladi.
+    """
+    from telegram import Update
+
+    loop = asyncio.get_running_loop()
+    tasks = set()
+    while True:
+        data = await loop.run_in_executor(None, queue.get)
+        if data is None:
+            break
+        update = Update.de_json(data, application.bot)
+        task = asyncio.create_task(_process_update(application, update, acks))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+# ============ Ingress ============
+
+
+async def run_ingress(token: str, pool: ShardPool) -> None:
+    """Long polling orqali update'larni olib, workerlarga taqsimlash
+
+    Offset eng eski tasdiqlanmagan update'da turadi: Telegram uni va undan
+    keyingilarni qayta beradi, yangilari esa ``next_offset`` dan boshlanadi.
+    Tasdiqlanmagan update'lar ko'p bo'lsa (``get_updates`` chegarasi - 100),
+    yangilari ular tasdiqlanguncha olinmaydi.
+    """
+    from telegram import Bot, Update
+    from telegram.error import NetworkError
+
+    async with Bot(token) as bot:
+        await bot.delete_webhook()
+        next_offset = 0
+
+        try:
+            while True:
+                pool.collect_acks()
+                pool.revive()
+                offset = min(pool.pending, default=next_offset)
+                try:
+                    updates: Tuple[Update, ...] = await bot.get_updates(
+                        offset=offset,
+                        # Tasdiqlanmaganlar bor - Telegram darhol javob beradi
+                        timeout=0 if pool.pending else 30,
+                        allowed_updates=Update.ALL_TYPES,
+                    )
+                except NetworkError as e:
+                    logger.warning("Update olishda xatolik: %s", e)
+                    await asyncio.sleep(1)
+                    continue
+
+                fresh = [u for u in updates if u.update_id >= next_offset]
+                for update in fresh:
+                    pool.dispatch(update.to_dict())
+                    next_offset = update.update_id + 1
+                if pool.pending and not fresh:
+                    await asyncio.sleep(ACK_POLL_INTERVAL)
+        finally:
+            # Navbatdagilar bajariladi, tasdiqlanganlari Telegramga bildiriladi
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, pool.stop, STOP_TIMEOUT)
+            pool.collect_acks()
+            offset = min(pool.pending, default=next_offset)
+            if pool.pending:
+                logger.warning(
+                    "%s ta update bajarilmadi, keyingi ishga tushishda qayta olinadi",
+                    len(pool.pending),
+                )
+            try:
+                await bot.get_updates(offset=offset, timeout=0, limit=1)
+            except NetworkError as e:
+                logger.warning("Offset'ni tasdiqlashda xatolik: %s", e)
+
+
+def run_sharded(token: str, workers: int) -> None:
+    """Ingress + N worker rejimini ishga tushirish"""
+    pool = ShardPool(bot_worker, workers, args=(token, workers))
+    pool.start()
+    logger.info("Bot %s ta worker bilan ishga tushirildi (sharding)", workers)
+
+    try:
+        asyncio.run(run_ingress(token, pool))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop(timeout=STOP_TIMEOUT)
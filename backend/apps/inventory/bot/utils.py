@@ -1,7 +1,11 @@
 """Yordamchi funksiyalar"""
 
 from decimal import Decimal, InvalidOperation
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
 from apps.inventory.models import (
     Product,
@@ -13,6 +17,8 @@ from apps.inventory.models import (
     OrderStatus,
     UserRole,
 )
+from apps.inventory.bot.catalog import stock_changed
+from apps.inventory.bot.notifications import staff_chat_ids
 
 
 def parse_quantity(text: str) -> Tuple[bool, Optional[Decimal], str]:
@@ -40,19 +46,59 @@ def parse_quantity(text: str) -> Tuple[bool, Optional[Decimal], str]:
 def add_product_stock(
     product: Product, quantity: Decimal, user: TelegramUser, note: str = None
 ) -> Transaction:
-    """Mahsulot qo'shish (kirim)"""
-    product.quantity += quantity
-    product.save()
-
-    transaction = Transaction.objects.create(
-        product=product,
-        transaction_type=TransactionType.IN,
-        quantity=quantity,
-        performed_by=user,
-        note=note,
+    """Mahsulot qo'shish (kirim)
+
+    Miqdor bazada ``quantity = quantity + x`` bilan o'zgartiriladi - parallel
+    kirim-chiqimlar bir-birini yo'qotmaydi. ``product.quantity`` yangi
+    qiymatga yangilanadi.
+    """
+    with transaction.atomic():
+        Product.objects.filter(id=product.id).update(
+            quantity=F("quantity") + quantity, updated_at=timezone.now()
+        )
+        record = Transaction.objects.create(
+            product=product,
+            transaction_type=TransactionType.IN,
+            quantity=quantity,
+            performed_by_id=user.id,
+            note=note,
+        )
+        product.refresh_from_db(fields=["quantity", "reserved_quantity", "updated_at"])
+        stock_changed(product.id, product.quantity, product.reserved_quantity)
+
+    return record
+
+
+def reserve_product_stock(product_id: int, quantity: Decimal) -> bool:
+    """Zakas uchun mahsulotni band qilish
+
+    Band qilinmagan qoldiq yetarli bo'lsagina (bitta shartli ``UPDATE``)
+    ``reserved_quantity`` oshiriladi.
+    """
+    if not Product.objects.filter(
+        id=product_id, quantity__gte=F("reserved_quantity") + quantity
+    ).update(reserved_quantity=F("reserved_quantity") + quantity):
+        return False
+    _publish_stock(product_id)
+    return True
+
+
+def release_product_stock(product_id: int, quantity: Decimal) -> None:
+    """Bekor qilingan zakas uchun band qilingan miqdorni bo'shatish"""
+    Product.objects.filter(id=product_id).update(
+        reserved_quantity=F("reserved_quantity") - quantity
     )
+    _publish_stock(product_id)
+
 
-    return transaction
+def _publish_stock(product_id: int) -> None:
+    """``UPDATE`` dan keyingi qoldiqni katalogga yetkazish"""
+    stock_changed(
+        product_id,
+        *Product.objects.values_list("quantity", "reserved_quantity").get(
+            id=product_id
+        ),
+    )
 
 
 def remove_product_stock(
@@ -64,29 +110,55 @@ def remove_product_stock(
 ) -> Tuple[bool, Optional[Transaction], str]:
     """Mahsulot chiqarish
 
+    Yetarlilik tekshiruvi va ayirish bitta shartli ``UPDATE`` da bajariladi -
+    parallel chiqimlar qoldiqni manfiy qilolmaydi. ``order`` berilsa, uning
+    band qilingan miqdori ham shu yerda bo'shatiladi; aks holda boshqa
+    zakaslar uchun band qilingan miqdorga tegilmaydi.
+
     Returns:
         (success, transaction, error_message)
     """
-    if product.quantity < quantity:
-        return (
-            False,
-            None,
-            f"Yetarli mahsulot yo'q. Mavjud: {product.quantity} {product.unit}",
+    with transaction.atomic():
+        if order is not None:
+            updated = Product.objects.filter(
+                id=product.id, quantity__gte=quantity
+            ).update(
+                quantity=F("quantity") - quantity,
+                reserved_quantity=F("reserved_quantity") - quantity,
+                updated_at=timezone.now(),
+            )
+        else:
+            updated = Product.objects.filter(
+                id=product.id, quantity__gte=F("reserved_quantity") + quantity
+            ).update(quantity=F("quantity") - quantity, updated_at=timezone.now())
+        product.refresh_from_db(fields=["quantity", "reserved_quantity", "updated_at"])
+        if not updated:
+            return (
+                False,
+                None,
+                f"Yetarli mahsulot yo'q. Mavjud: {product.available_quantity} {product.unit}",
+            )
+
+        record = Transaction.objects.create(
+            product=product,
+            transaction_type=TransactionType.OUT,
+            quantity=quantity,
+            performed_by_id=user.id,
+            order=order,
+            note=note,
         )
+        stock_changed(product.id, product.quantity, product.reserved_quantity)
 
-    product.quantity -= quantity
-    product.save()
+    return True, record, ""
 
-    transaction = Transaction.objects.create(
-        product=product,
-        transaction_type=TransactionType.OUT,
-        quantity=quantity,
-        performed_by=user,
-        order=order,
-        note=note,
-    )
 
-    return True, transaction, ""
+def format_batch_result(results: Dict[int, str]) -> str:
+    """Bir nechta zakasni bajarish natijasi"""
+    done = sum(1 for error in results.values() if not error)
+    lines = [f"✅ <b>Bajarildi: {done} / {len(results)} ta</b>\n"]
+    for order_id, error in results.items():
+        lines.append(f"✅ #{order_id}" if not error else f"❌ #{order_id}: {error}")
+    return "\n".join(lines)
 
 
 def format_product_list(products) -> str:
@@ -115,6 +187,23 @@ def format_product_list(products) -> str:
     return "\n".join(lines)
 
 
+def format_category_overview(categories) -> str:
+    """Kategoriyalar ro'yxati (``list_categories_with_counts`` natijasi)"""
+    if not categories:
+        return "📁 Kategoriyalar yo'q.\n\nMahsulot qo'shish orqali kategoriya yarating: /add"
+
+    lines = ["📁 <b>Kategoriyalar:</b>\n"]
+    for category in categories:
+        line = (
+            f"• {category.name} ({category.product_count} ta mahsulot, "
+            f"jami {category.total_quantity})"
+        )
+        if category.low_stock_count:
+            line += f" ⚠️ {category.low_stock_count} ta kam qoldi"
+        lines.append(line)
+    return "\n".join(lines)
+
+
 def format_order_info(order: Order) -> str:
     """Zakas ma'lumotlarini formatlash"""
     status_emoji = (
@@ -170,8 +259,4 @@ def format_transaction_history(transactions, limit: int = 20) -> str:
 
 def get_warehouse_users() -> List[int]:
     """Barcha ombor hodimlarini olish (bildirishnoma uchun)"""
-    return list(
-        TelegramUser.objects.filter(
-            role__in=["admin", "warehouse"], is_active=True
-        ).values_list("telegram_id", flat=True)
-    )
+    return staff_chat_ids()
@@ -0,0 +1,112 @@
+"""Webhook rejimi: ASGI jarayoni ichida ishlaydigan bot Application'i"""
+
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+from django.conf import settings
+from telegram import Update
+from telegram.ext import Application
+
+from apps.inventory.bot.application import (
+    build_application,
+    start_background_tasks,
+    stop_background_tasks,
+)
+
+logger = logging.getLogger(__name__)
+
+_application: Optional[Application] = None
+_start_lock = asyncio.Lock()
+
+
+async def get_webhook_application() -> Application:
+    """Jarayondagi yagona Application (birinchi so'rovda ishga tushiriladi)
+
+    Daphne ASGI lifespan'ni qo'llab-quvvatlamaydi, shuning uchun Application
+    birinchi webhook so'rovida, server event loop'ida ishga tushiriladi.
+    To'xtatish - ``shutdown_webhook_application`` (lifespan yoki Daphne'ning
+    reactor'i to'xtashidan oldin).
+    """
+    global _application
+
+    if _application is None:
+        async with _start_lock:
+            if _application is None:
+                application = build_application(
+                    settings.TELEGRAM_BOT_TOKEN, updater=False
+                )
+                await application.initialize()
+                await application.start()
+                await start_background_tasks(application)
+                _register_server_shutdown()
+                logger.info("Bot webhook rejimida ishga tushirildi")
+                _application = application
+
+    return _application
+
+
+async def shutdown_webhook_application() -> None:
+    """Fon vazifalarini to'xtatish, bufer va holatni bazaga yozish"""
+    global _application
+
+    async with _start_lock:
+        application, _application = _application, None
+        if application is None:
+            return
+        await stop_background_tasks(application)
+        await application.stop()
+        # Persistence buferi shu yerda yoziladi
+        await application.shutdown()
+        logger.info("Bot webhook rejimi to'xtatildi")
+
+
+def _register_server_shutdown() -> None:
+    """Daphne (Twisted) reactor'i to'xtashidan oldin Application'ni to'xtatish"""
+    reactor = sys.modules.get("twisted.internet.reactor")
+    if reactor is None:
+        # Boshqa serverlar - ASGI lifespan (config.asgi)
+        return
+    from twisted.internet import defer
+
+    reactor.addSystemEventTrigger(
+        "before",
+        "shutdown",
+        lambda: defer.Deferred.fromFuture(
+            asyncio.ensure_future(shutdown_webhook_application())
+        ),
+    )
+
+
+async def lifespan(receive, send) -> None:
+    """ASGI lifespan: server to'xtaganda Application ham to'xtatiladi"""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            try:
+                await shutdown_webhook_application()
+            except Exception as e:
+                logger.exception("Bot webhook rejimini to'xtatishda xatolik")
+                await send({"type": "lifespan.shutdown.failed", "message": str(e)})
+            else:
+                await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def feed_update(data: dict) -> None:
+    """Telegram yuborgan update'ni Application navbatiga qo'yish"""
+    application = await get_webhook_application()
+    update = Update.de_json(data, application.bot)
+    await application.update_queue.put(update)
+
+
+async def set_webhook(bot) -> bool:
+    """Webhook URL ni Telegramda ro'yxatdan o'tkazish"""
+    return await bot.set_webhook(
+        url=settings.TELEGRAM_WEBHOOK_URL,
+        secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+        allowed_updates=Update.ALL_TYPES,
+    )
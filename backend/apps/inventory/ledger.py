@@ -0,0 +1,427 @@
+"""Tranzaksiyalar tarixi: oylik partitionlar va arxiv
+
+PostgreSQL'da ``Transaction`` jadvali ``created_at`` bo'yicha oylik
+partitionlarga bo'lingan (0007 migratsiya). Oylar mahalliy vaqt
+(``TIME_ZONE``) bo'yicha hisoblanadi. Eski oylar siqilgan CSV faylga
+ko'chiriladi va partition o'chiriladi; boshqa bazalarda (SQLite) o'sha
+oyning qatorlari o'chiriladi.
+
+Arxivlangan oy oxirigacha tranzaksiyalar yig'indisi ``StockSnapshot`` ga
+(``SnapshotSource.LEDGER``) yoziladi: tekshiruv shu nuqtadan davom etadi.
+Biror vaqtdagi qoldiq ``STOCK`` snapshotlaridan hisoblanadi, arxivlangan
+oylardagi o'zgarishlar esa arxiv fayllaridan o'qiladi.
+
+Cron o'tkazib yuborilib, partition yo'q oyning qatorlari ``default``
+partitionga tushgan bo'lsa, ``create_partition`` ularni yangi partitionga
+ko'chiradi.
+"""
+
+import csv
+import gzip
+import os
+import re
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, Max, Sum, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.inventory.models import (
+    SnapshotSource,
+    StockSnapshot,
+    Transaction,
+    TransactionArchive,
+    TransactionType,
+)
+
+TABLE = Transaction._meta.db_table
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+ARCHIVE_FIELDS = (
+    "id",
+    "product_id",
+    "transaction_type",
+    "quantity",
+    "performed_by_id",
+    "order_id",
+    "note",
+    "created_at",
+)
+ARCHIVE_CHUNK_SIZE = 5000
+
+
+def signed_quantity(prefix: str = "") -> Case:
+    """Tranzaksiya miqdori ishorasi bilan: kirim - musbat, chiqim - manfiy"""
+    return Case(
+        When(
+            **{f"{prefix}transaction_type": TransactionType.IN},
+            then=F(f"{prefix}quantity"),
+        ),
+        default=-F(f"{prefix}quantity"),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+SIGNED_QUANTITY = signed_quantity()
+
+
+class ArchivedTransaction(NamedTuple):
+    id: int
+    product_id: int
+    transaction_type: str
+    quantity: Decimal
+    performed_by_id: Optional[int]
+    order_id: Optional[int]
+    note: str
+    created_at: datetime
+
+
+# ============ Months ============
+
+
+def month_start(moment: datetime) -> datetime:
+    """``moment`` oyining boshi (mahalliy vaqt bo'yicha)"""
+    local = timezone.localtime(moment)
+    return local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    naive = start.replace(tzinfo=None, year=index // 12, month=index % 12 + 1)
+    return timezone.make_aware(naive)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_p{start:%Y_%m}"
+
+
+# ============ Partitions ============
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass", [TABLE]
+        )
+        return cursor.fetchone()[0]
+
+
+def list_partitions() -> List[datetime]:
+    """Mavjud oylik partitionlarning boshlanish vaqtlari (eskisidan)"""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            months.append(timezone.make_aware(datetime(year, month, 1)))
+    return sorted(months)
+
+
+def default_partition() -> Optional[str]:
+    """Partition yo'q oylar qatorlari tushadigan ``DEFAULT`` partition nomi"""
+    if not is_partitioned():
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass "
+            "AND pg_get_expr(child.relpartbound, child.oid) = 'DEFAULT'",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def default_partition_months() -> List[datetime]:
+    """``default`` partitionda qatori bor oylar (eskisidan)"""
+    default = default_partition()
+    if default is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE %s) "
+            f'FROM "{default}"',
+            [settings.TIME_ZONE],
+        )
+        return sorted(timezone.make_aware(row[0]) for row in cursor.fetchall())
+
+
+def create_partition(start: datetime) -> int:
+    """Oylik partition yaratish
+
+    O'sha oyning qatorlari ``default`` partitionga tushib qolgan bo'lsa
+    (cron o'tkazib yuborilgan), ``CREATE TABLE ... PARTITION OF`` xato
+    beradi. Shuning uchun ``default`` ajratiladi, partition yaratiladi,
+    qatorlar unga ko'chiriladi va ``default`` qayta ulanadi. Hammasi bitta
+    tranzaksiyada: ajratish jadvalni qulflaydi, yozuvlar tugashini kutadi.
+
+    Returns:
+        ``default`` dan ko'chirilgan qatorlar soni
+    """
+    end = add_months(start, 1)
+    name = partition_name(start)
+    bounds = [start.isoformat(), end.isoformat()]
+    default = default_partition()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        stranded = False
+        if default is not None:
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM "{default}" '
+                f"WHERE created_at >= %s AND created_at < %s)",
+                bounds,
+            )
+            stranded = cursor.fetchone()[0]
+        if not stranded:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" '
+                f'PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                bounds,
+            )
+            return 0
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{default}"')
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{default}" '
+            f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            bounds,
+        )
+        moved = cursor.rowcount
+        cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{default}" DEFAULT')
+    return moved
+
+
+def ensure_partitions(months_ahead: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Joriy va keyingi oylar uchun partitionlarni oldindan yaratish
+
+    Partition yo'q oyning qatorlari ``default`` partitionga tushadi - u
+    bo'sh turishi uchun buyruq muntazam (masalan, oyda bir marta) ishlatiladi.
+    ``default`` ga tushib qolgan oylar uchun ham partition yaratiladi va
+    qatorlar ko'chiriladi.
+
+    Returns:
+        yangi yaratilgan partitionlar va ularga ko'chirilgan qatorlar soni
+    """
+    if not is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = settings.LEDGER_PARTITIONS_AHEAD
+
+    existing = set(list_partitions())
+    current = month_start(timezone.now())
+    months = set(default_partition_months())
+    months.update(add_months(current, offset) for offset in range(months_ahead + 1))
+
+    created = []
+    boundary = archive_boundary()
+    for start in sorted(months):
+        if start in existing or (boundary is not None and start < boundary):
+            continue
+        created.append((partition_name(start), create_partition(start)))
+    return created
+
+
+# ============ Archive ============
+
+
+def archive_boundary() -> Optional[datetime]:
+    """Shu vaqtgacha bo'lgan tranzaksiyalar arxivda (bazada emas)"""
+    return TransactionArchive.objects.aggregate(end=Max("period_end"))["end"]
+
+
+def archivable_months(retention_months: int) -> List[datetime]:
+    """Saqlash muddatidan eski, hali arxivlanmagan oylar (eskisidan)"""
+    horizon = add_months(month_start(timezone.now()), -retention_months)
+    first = (
+        Transaction.objects.filter(created_at__lt=horizon)
+        .order_by("created_at")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    boundary = archive_boundary()
+    months = [
+        start
+        for start in list_partitions()
+        if start < horizon and (boundary is None or start >= boundary)
+    ]
+    if first is not None:
+        start = month_start(first)
+        while start < horizon:
+            months.append(start)
+            start = add_months(start, 1)
+    return sorted(set(months))
+
+
+def _ledger_balances(until: datetime) -> Dict[int, Decimal]:
+    """Tranzaksiyalar bo'yicha ``until`` dagi qoldiqlar (oldingi arxivdan davom)"""
+    boundary = archive_boundary()
+    balances: Dict[int, Decimal] = {}
+    transactions = Transaction.objects.filter(created_at__lte=until)
+    if boundary is not None:
+        balances = dict(
+            StockSnapshot.objects.filter(
+                taken_at=boundary, source=SnapshotSource.LEDGER
+            ).values_list("product_id", "quantity")
+        )
+        transactions = transactions.filter(created_at__gt=boundary)
+
+    for product_id, net in (
+        transactions.order_by()
+        .values("product_id")
+        .annotate(net=Sum(SIGNED_QUANTITY))
+        .values_list("product_id", "net")
+    ):
+        balances[product_id] = balances.get(product_id, Decimal(0)) + net
+    return balances
+
+
+def _write_archive(start: datetime, end: datetime, directory: Path) -> Tuple[Path, int]:
+    """Oy tranzaksiyalarini ``.csv.gz`` ga yozish (xotirada - bitta paket)"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"transactions-{start:%Y-%m}.csv.gz"
+    partial = path.with_suffix(".partial")
+
+    rows = 0
+    with open(partial, "wb") as raw:
+        with gzip.open(raw, "wt", newline="", encoding="utf-8") as stream:
+            writer = csv.writer(stream)
+            writer.writerow(ARCHIVE_FIELDS)
+            for row in (
+                Transaction.objects.filter(created_at__gte=start, created_at__lt=end)
+                .order_by("created_at", "id")
+                .values_list(*ARCHIVE_FIELDS)
+                .iterator(chunk_size=ARCHIVE_CHUNK_SIZE)
+            ):
+                writer.writerow(
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in row
+                )
+                rows += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return path, rows
+
+
+def archive_month(start: datetime, directory: Optional[Path] = None) -> TransactionArchive:
+    """Bir oylik tranzaksiyalarni arxivga ko'chirish
+
+    Oylar eskisidan boshlab, ketma-ket arxivlanadi. Fayl to'liq yozilib
+    diskka tushgandan keyingina partition (yoki qatorlar) o'chiriladi.
+    """
+    boundary = archive_boundary()
+    if boundary is not None and start < boundary:
+        raise ValueError(f"{start:%Y-%m} allaqachon arxivlangan")
+
+    directory = Path(directory or settings.LEDGER_ARCHIVE_DIR)
+    end = add_months(start, 1)
+    path, rows = _write_archive(start, end, directory)
+
+    with transaction.atomic():
+        # Oy oxiridagi tranzaksiyalar yig'indisi - tekshiruv uchun boshlang'ich nuqta
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(
+                    product_id=product_id,
+                    taken_at=end,
+                    quantity=quantity,
+                    source=SnapshotSource.LEDGER,
+                )
+                for product_id, quantity in _ledger_balances(end).items()
+            ],
+            batch_size=ARCHIVE_CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=["product", "taken_at", "source"],
+            update_fields=["quantity"],
+        )
+        archive = TransactionArchive.objects.create(
+            period_start=start, period_end=end, path=str(path), rows=rows
+        )
+
+        if start in list_partitions():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE "{TABLE}" DETACH PARTITION "{partition_name(start)}"'
+                )
+                cursor.execute(f'DROP TABLE "{partition_name(start)}"')
+        # default partitionga (yoki partitionsiz jadvalga) tushgan qatorlar
+        Transaction.objects.filter(created_at__gte=start, created_at__lt=end).delete()
+    return archive
+
+
+def _optional_int(value: str) -> Optional[int]:
+    return int(value) if value else None
+
+
+def iter_archived_transactions(
+    after: Optional[datetime] = None, until: Optional[datetime] = None
+) -> Iterator[ArchivedTransaction]:
+    """Arxiv fayllaridagi ``(after, until]`` oralig'idagi tranzaksiyalar"""
+    archives = TransactionArchive.objects.order_by("period_start")
+    if after is not None:
+        archives = archives.filter(period_end__gt=after)
+    if until is not None:
+        archives = archives.filter(period_start__lte=until)
+
+    for archive in archives:
+        with gzip.open(archive.path, "rt", newline="", encoding="utf-8") as stream:
+            reader = csv.reader(stream)
+            next(reader, None)
+            for values in reader:
+                row = dict(zip(ARCHIVE_FIELDS, values))
+                created_at = parse_datetime(row["created_at"])
+                if after is not None and created_at <= after:
+                    continue
+                if until is not None and created_at > until:
+                    break
+                yield ArchivedTransaction(
+                    id=int(row["id"]),
+                    product_id=int(row["product_id"]),
+                    transaction_type=row["transaction_type"],
+                    quantity=Decimal(row["quantity"]),
+                    performed_by_id=_optional_int(row["performed_by_id"]),
+                    order_id=_optional_int(row["order_id"]),
+                    note=row["note"],
+                    created_at=created_at,
+                )
+
+
+def archived_net_changes(
+    after: Optional[datetime],
+    until: Optional[datetime],
+    product_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, Decimal]:
+    """Arxivdagi ``(after, until]`` tranzaksiyalar farqi (mahsulot -> +/-)"""
+    wanted = set(product_ids) if product_ids is not None else None
+    net: Dict[int, Decimal] = {}
+    for row in iter_archived_transactions(after, until):
+        if wanted is not None and row.product_id not in wanted:
+            continue
+        sign = 1 if row.transaction_type == TransactionType.IN else -1
+        net[row.product_id] = net.get(row.product_id, Decimal(0)) + sign * row.quantity
+    return net
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.ledger import archivable_months, archive_month, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Tranzaksiyalar partitionlarini yuritish (cron uchun, oyda bir marta): "
+        "keyingi oylar uchun partition yaratish va saqlash muddatidan eski "
+        "oylarni siqilgan CSV arxivga ko'chirish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.LEDGER_RETENTION_MONTHS,
+            help="Bazada saqlanadigan oylar soni (joriy oydan tashqari)",
+        )
+        parser.add_argument(
+            "--dir", type=Path, help="Arxiv papkasi (standart - LEDGER_ARCHIVE_DIR)"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Faqat arxivlanadigan oylarni ko'rsatish"
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months kamida 1 bo'lishi kerak")
+
+        months = archivable_months(options["months"])
+        if options["dry_run"]:
+            for start in months:
+                self.stdout.write(f"{start:%Y-%m}")
+            self.stdout.write(f"Arxivlanadigan oylar: {len(months)}")
+            return
+
+        for name, moved in ensure_partitions():
+            self.stdout.write(f"Partition yaratildi: {name}")
+            if moved:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{name}: default partitiondan {moved} ta qator ko'chirildi"
+                    )
+                )
+
+        for start in months:
+            archive = archive_month(start, options["dir"])
+            self.stdout.write(
+                f"{start:%Y-%m}: {archive.rows} ta tranzaksiya -> {archive.path}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Arxivlandi: {len(months)} oy"))
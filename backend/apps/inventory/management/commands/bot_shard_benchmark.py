@@ -0,0 +1,170 @@
+import asyncio
+import json
+import multiprocessing
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from telegram.request import BaseRequest
+
+from apps.inventory.bot.sharding import ShardPool, serve_shard
+
+# Modul worker jarayonlarida django.setup() dan oldin import qilinadi
+# (spawn) - modellar funksiyalar ichida import qilinadi
+
+BENCH_TOKEN = "1:bench"
+# Sun'iy foydalanuvchilar haqiqiy Telegram ID lari bilan to'qnashmasin
+BENCH_TELEGRAM_ID = 9_000_000_000
+
+
+class OfflineRequest(BaseRequest):
+    """Telegramga bormaydigan so'rovlar: har bir metodga muvaffaqiyatli javob"""
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        if endpoint == "getMe":
+            result = {
+                "id": 1,
+                "is_bot": True,
+                "first_name": "Bench",
+                "username": "bench_bot",
+            }
+        elif endpoint in ("sendMessage", "editMessageText"):
+            result = {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": parameters.get("chat_id", 0), "type": "private"},
+                "text": parameters.get("text", ""),
+            }
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def _update(update_id: int, telegram_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": telegram_id, "type": "private"},
+            "from": {"id": telegram_id, "is_bot": False, "first_name": "Bench"},
+            "text": text,
+            "entities": [
+                {"type": "bot_command", "offset": 0, "length": len(text.split()[0])}
+            ],
+        },
+    }
+
+
+def benchmark_worker(index: int, queue, acks, workers: int, ready) -> None:
+    """``bot_worker`` ning o'zi, faqat Telegram so'rovlari va fon vazifalarisiz"""
+    import django
+
+    django.setup()
+    asyncio.run(_run_benchmark_worker(index, queue, acks, workers, ready))
+
+
+async def _run_benchmark_worker(index: int, queue, acks, workers: int, ready) -> None:
+    from apps.inventory.bot.application import build_application
+
+    application = build_application(
+        BENCH_TOKEN,
+        updater=False,
+        shards=workers,
+        request=OfflineRequest(),
+        rate_limit=False,
+    )
+    async with application:
+        await application.start()
+        ready.put(index)
+        await serve_shard(application, queue, acks)
+        await application.stop()
+
+
+class Command(BaseCommand):
+    help = (
+        "Sharding rejimi o'tkazuvchanligini haqiqiy handlerlar bilan o'lchash "
+        "(1, 2, 4 ... worker). Bazaga vaqtinchalik foydalanuvchi va mahsulotlar "
+        "yoziladi va oxirida o'chiriladi; Telegramga so'rov yuborilmaydi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+        parser.add_argument("--updates", type=int, default=2000)
+        parser.add_argument("--chats", type=int, default=200)
+        parser.add_argument("--products", type=int, default=100)
+        parser.add_argument("--command", default="/list", help="Yuboriladigan buyruq")
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        from apps.inventory.models import BotUserData, TelegramUser
+
+        telegram_ids = [BENCH_TELEGRAM_ID + i for i in range(options["chats"])]
+        updates = [
+            _update(i + 1, telegram_ids[i % len(telegram_ids)], options["command"])
+            for i in range(options["updates"])
+        ]
+
+        category = self._seed(telegram_ids, options["products"])
+        try:
+            self.stdout.write(
+                f"{options['updates']} update ({options['command']}), "
+                f"{options['chats']} chat, {options['products']} mahsulot"
+            )
+            for workers in options["workers"]:
+                elapsed = self._run(workers, updates, options["timeout"])
+                self.stdout.write(
+                    f"workers={workers:<3} {len(updates) / elapsed:10.1f} update/s  "
+                    f"({elapsed:.2f} s)"
+                )
+        finally:
+            category.delete()
+            TelegramUser.objects.filter(telegram_id__in=telegram_ids).delete()
+            BotUserData.objects.filter(user_id__in=telegram_ids).delete()
+
+    def _seed(self, telegram_ids, products: int):
+        from apps.inventory.models import Category, Product, TelegramUser
+
+        if TelegramUser.objects.filter(telegram_id__in=telegram_ids).exists():
+            raise CommandError(
+                "Benchmark foydalanuvchilari bazada bor (oldingi ishga tushirish?)"
+            )
+        TelegramUser.objects.bulk_create(
+            TelegramUser(telegram_id=telegram_id, full_name="Bench")
+            for telegram_id in telegram_ids
+        )
+        category = Category.objects.create(name=f"bench-{uuid.uuid4().hex[:8]}")
+        Product.objects.bulk_create(
+            Product(name=f"{category.name}-{i}", category=category, quantity=100)
+            for i in range(products)
+        )
+        return category
+
+    def _run(self, workers: int, updates, timeout: float) -> float:
+        ready = multiprocessing.get_context("spawn").Queue()
+        pool = ShardPool(benchmark_worker, workers, args=(workers, ready))
+        pool.start()
+        try:
+            # Jarayonlar ishga tushish vaqti o'lchovga kirmasin
+            for _ in range(workers):
+                ready.get(timeout=timeout)
+
+            started = time.perf_counter()
+            for data in updates:
+                pool.dispatch(data)
+            while pool.pending:
+                if not pool.collect_acks(timeout=timeout):
+                    raise CommandError(
+                        f"{timeout} s ichida javob yo'q ({len(pool.pending)} ta update qoldi)"
+                    )
+            return time.perf_counter() - started
+        finally:
+            pool.stop(timeout=timeout)
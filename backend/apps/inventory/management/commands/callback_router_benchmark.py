@@ -0,0 +1,117 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from telegram import CallbackQuery, Update, User
+from telegram.ext import CallbackQueryHandler
+
+from apps.inventory.bot.application import build_callback_router
+
+# Router'gacha ishlatilgan regex zanjiri (ro'yxatdan o'tish tartibida)
+REGEX_PATTERNS = (
+    r"^view_order:",
+    r"^complete_order:",
+    r"^cancel_order:",
+    r"^back_to_orders$",
+    r"^users_page:",
+    r"^user:",
+    r"^back_to_users$",
+    r"^set_role:",
+    r"^block_user:",
+    r"^unblock_user:",
+    r"^my_order:",
+    r"^cancel$",
+    r"^no_orders$",
+)
+
+# Tugmalar oqimi: ro'yxat boshidagi va oxiridagi prefikslar aralash
+SAMPLE_DATA = (
+    "view_order:120",
+    "complete_order:120",
+    "users_page:3",
+    "set_role:42:warehouse",
+    "unblock_user:42",
+    "my_order:77",
+    "cancel",
+    "no_orders",
+)
+
+
+async def _noop(update, context, *args):
+    pass
+
+
+def _callback_update(update_id: int, data: str) -> Update:
+    user = User(id=1, first_name="Bench", is_bot=False)
+    query = CallbackQuery(
+        id=str(update_id), from_user=user, chat_instance="bench", data=data
+    )
+    return Update(update_id=update_id, callback_query=query)
+
+
+def _regex_dispatch(handlers, update: Update):
+    """Eski usul: birinchi mos handler + handler ichida data'ni qayta parse qilish"""
+    for handler in handlers:
+        if handler.check_update(update):
+            parts = update.callback_query.data.split(":")
+            return handler, [int(p) if p.isdigit() else p for p in parts[1:]]
+    return None
+
+
+class Command(BaseCommand):
+    help = "Callback router va regex handler zanjirini solishtirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument(
+            "--extra-routes",
+            type=int,
+            nargs="+",
+            default=[0, 50, 200],
+            help="Qo'shimcha (ishlatilmaydigan) tugma prefikslari soni",
+        )
+
+    def handle(self, *args, **options):
+        updates = [
+            _callback_update(i, data) for i, data in enumerate(SAMPLE_DATA)
+        ]
+        iterations = options["iterations"]
+
+        self.stdout.write(
+            f"{iterations} x {len(updates)} callback, mikrosekund / dispatch"
+        )
+        for extra in options["extra_routes"]:
+            extra_prefixes = [f"extra_{i}" for i in range(extra)]
+
+            # Yangi tugmalar odatda ro'yxat boshiga emas, oxiriga qo'shiladi,
+            # lekin eng yomon holat - eski tugmalardan oldin turishi
+            handlers = [
+                CallbackQueryHandler(_noop, pattern=rf"^{re.escape(p)}:")
+                for p in extra_prefixes
+            ] + [CallbackQueryHandler(_noop, pattern=p) for p in REGEX_PATTERNS]
+
+            router = build_callback_router()
+            for prefix in extra_prefixes:
+                router.add(prefix, _noop, int)
+
+            regex_us = self._measure(
+                lambda u: _regex_dispatch(handlers, u), updates, iterations
+            )
+            router_us = self._measure(router.check_update, updates, iterations)
+            self.stdout.write(
+                f"routes={len(REGEX_PATTERNS) + extra:<5} "
+                f"regex: {regex_us:7.2f}  router: {router_us:7.2f}  "
+                f"(x{regex_us / router_us:.1f})"
+            )
+
+    @staticmethod
+    def _measure(dispatch, updates, iterations: int) -> float:
+        for update in updates:
+            assert dispatch(update) is not None, update.callback_query.data
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for update in updates:
+                dispatch(update)
+        elapsed = time.perf_counter() - started
+        return elapsed / (iterations * len(updates)) * 1_000_000
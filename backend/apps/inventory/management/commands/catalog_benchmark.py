@@ -0,0 +1,156 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.inventory.models import Category, Product
+from apps.inventory.bot.catalog import CatalogStore, build_catalog
+from apps.inventory.bot.keyboards import get_categories_keyboard, get_products_keyboard
+from apps.inventory.bot.utils import format_product_list
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Klaviaturalarni bazadan va xotiradagi katalogdan qurish vaqtini "
+        "solishtirish (test ma'lumotlari saqlanmaydi)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        self.options = options
+        try:
+            with transaction.atomic():
+                self._seed()
+                self._report(
+                    [
+                        ("kategoriyalar", self._db_categories, self._catalog_categories),
+                        ("mahsulotlar", self._db_products, self._catalog_products),
+                        ("ro'yxat", self._db_list, self._catalog_list),
+                    ]
+                )
+                # Test ma'lumotlari qaytariladi
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    # ============ Data ============
+
+    def _seed(self):
+        options = self.options
+        tag = uuid.uuid4().hex[:8]
+        categories = Category.objects.bulk_create(
+            Category(name=f"bench-{tag}-{i:03}") for i in range(options["categories"])
+        )
+        Product.objects.bulk_create(
+            (
+                Product(
+                    name=f"bench-{tag}-{i}",
+                    category=categories[i % len(categories)],
+                    quantity=Decimal(100),
+                    reserved_quantity=Decimal(i % 7),
+                    min_quantity=Decimal(10),
+                )
+                for i in range(options["products"])
+            ),
+            batch_size=1000,
+        )
+        self.category_ids = list(
+            Category.objects.filter(name__startswith=f"bench-{tag}").values_list(
+                "id", flat=True
+            )
+        )
+
+        started = time.perf_counter()
+        self.catalog = build_catalog()
+        self.stdout.write(
+            f"Katalog: {len(self.catalog.products)} mahsulot, "
+            f"qurish {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    # ============ Scenarios ============
+
+    # Eski yo'l: har bosishda so'rov + klaviatura
+    def _db_categories(self):
+        get_categories_keyboard(list(Category.objects.all()), "order_category")
+
+    def _db_products(self):
+        for category_id in self.category_ids:
+            get_products_keyboard(
+                list(Product.objects.filter(category_id=category_id)),
+                "order_product",
+                show_available=True,
+            )
+
+    def _db_list(self):
+        format_product_list(
+            Product.objects.select_related("category").order_by("category__name", "name")
+        )
+
+    # Katalog: faqat klaviatura
+    def _catalog_categories(self):
+        get_categories_keyboard(self.catalog.categories, "order_category")
+
+    def _catalog_products(self):
+        for category_id in self.category_ids:
+            get_products_keyboard(
+                self.catalog.products_in(category_id),
+                "order_product",
+                show_available=True,
+            )
+
+    def _catalog_list(self):
+        format_product_list(self.catalog.products)
+
+    # ============ Measure ============
+
+    def _measure(self, run):
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(self.options["repeat"]):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+        return min(timings), len(queries) // self.options["repeat"]
+
+    def _measure_delta(self):
+        """Qoldiq o'zgarishini katalogga qo'llash (bitta mahsulot)"""
+        store = CatalogStore(ttl=60)
+        store.set(self.catalog, store.generation)
+        product = self.catalog.products[0]
+        count = 10_000
+        started = time.perf_counter()
+        for i in range(count):
+            store.apply_stock(product.id, Decimal(i), product.reserved_quantity)
+        return (time.perf_counter() - started) * 1_000_000 / count
+
+    def _report(self, scenarios):
+        per_category = len(self.category_ids)
+        self.stdout.write(
+            f"\n{'klaviatura':<16}{'baza, ms':>12}{'so`rov':>8}"
+            f"{'katalog, ms':>14}{'so`rov':>8}"
+        )
+        for label, db_run, catalog_run in scenarios:
+            old, old_queries = self._measure(db_run)
+            new, new_queries = self._measure(catalog_run)
+            if label == "mahsulotlar":
+                # Har bir kategoriya uchun bittadan
+                old, new = old / per_category, new / per_category
+                old_queries //= per_category
+                new_queries //= per_category
+            self.stdout.write(
+                f"{label:<16}{old:>12.3f}{old_queries:>8}{new:>14.3f}{new_queries:>8}"
+            )
+        self.stdout.write(
+            f"\nQoldiq o'zgarishini qo'llash: {self._measure_delta():.2f} µs"
+        )
@@ -0,0 +1,69 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from telegram.ext import ExtBot
+
+from apps.inventory.models import Notification, NotificationStatus
+from apps.inventory.bot.outbox import OutboxWorker
+from apps.inventory.bot.ratelimit import OutboundRateLimiter
+
+
+class Command(BaseCommand):
+    help = (
+        "Outbox'dagi bildirishnomalarni yuborish "
+        "(odatda bot jarayoni ichida avtomatik ishlaydi)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Navbatdagi xabarlarni yuborib chiqish (doimiy ishlamaslik)",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Yuborilmagan (FAILED) xabarlarni qayta navbatga qo'yish",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            requeued = Notification.objects.filter(
+                status=NotificationStatus.FAILED
+            ).update(
+                status=NotificationStatus.PENDING,
+                attempts=0,
+                # Oldingi backoff kutilmasin - darhol yuboriladi
+                next_attempt_at=timezone.now(),
+            )
+            self.stdout.write(f"Qayta navbatga qo'yildi: {requeued} ta xabar")
+            if options["once"]:
+                return
+
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError("TELEGRAM_BOT_TOKEN topilmadi")
+
+        asyncio.run(self._run(options["once"]))
+
+    async def _run(self, once: bool):
+        bot = ExtBot(
+            settings.TELEGRAM_BOT_TOKEN,
+            rate_limiter=OutboundRateLimiter(
+                global_rate=settings.BOT_RATE_LIMIT_GLOBAL,
+                chat_rate=settings.BOT_RATE_LIMIT_PER_CHAT,
+                chat_burst=settings.BOT_RATE_LIMIT_CHAT_BURST,
+                max_retries=settings.BOT_SEND_MAX_RETRIES,
+            ),
+        )
+        async with bot:
+            worker = OutboxWorker(bot)
+            if not once:
+                await worker.run()
+                return
+
+            total = 0
+            while claimed := await worker.deliver_batch():
+                total += claimed
+            self.stdout.write(self.style.SUCCESS(f"Qayta ishlandi: {total} ta xabar"))
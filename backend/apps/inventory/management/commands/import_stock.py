@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.models import TelegramUser
+from apps.inventory.bot.intake import IntakeError, read_intake
+from apps.inventory.bot.repositories.products import apply_stock_intake
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV/XLSX fayldan kirim qilish (ustunlar: Kategoriya, Mahsulot, Miqdor, "
+        "Birlik, Minimum)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--telegram-id",
+            type=int,
+            help="Kirimni bajargan hodim (tarixda ko'rsatiladi)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Faqat faylni tekshirish"
+        )
+
+    def handle(self, *args, **options):
+        path: Path = options["path"]
+        if not path.is_file():
+            raise CommandError(f"Fayl topilmadi: {path}")
+
+        user_id = None
+        if options["telegram_id"]:
+            user = TelegramUser.objects.filter(
+                telegram_id=options["telegram_id"]
+            ).first()
+            if user is None:
+                raise CommandError("Bunday telegram ID li foydalanuvchi yo'q")
+            user_id = user.id
+
+        try:
+            with path.open("rb") as stream:
+                items = read_intake(stream, path.name)
+        except IntakeError as e:
+            raise CommandError("\n".join(e.errors))
+
+        if options["dry_run"]:
+            self.stdout.write(f"Fayl to'g'ri: {len(items)} ta mahsulot")
+            return
+
+        updated, created, categories = apply_stock_intake(
+            items, user_id, note=f"Fayl: {path.name}"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Yangilandi: {updated}, yangi mahsulot: {created}, "
+                f"yangi kategoriya: {categories}"
+            )
+        )
@@ -0,0 +1,268 @@
+import random
+import re
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.inventory.models import (
+    Category,
+    Order,
+    OrderStatus,
+    Product,
+    TelegramUser,
+    Transaction,
+    TransactionType,
+    UserRole,
+)
+from apps.inventory.bot.notifications import STAFF_ROLES
+from apps.inventory.bot.repositories.transactions import recent_transactions
+
+# 0008 migratsiyadagi indekslar: "oldin" o'lchovi uchun vaqtincha o'chiriladi
+BENCHMARK_INDEXES = {
+    Order: (
+        "order_pending_created_idx",
+        "order_pending_product_idx",
+        "order_requester_created_idx",
+    ),
+    Transaction: ("transaction_created_idx",),
+    TelegramUser: ("tguser_active_role_idx",),
+}
+
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _count(queryset):
+    return queryset.count()
+
+
+def _scans(plan: str) -> str:
+    """Rejadagi jadval/indeks o'qish qadamlari"""
+    steps = [
+        re.sub(r"^(\d+ )+|^->\s*", "", line.strip())
+        for line in plan.splitlines()
+        if "Scan" in line or "SCAN" in line or "SEARCH" in line
+    ]
+    return "; ".join(steps) or plan.splitlines()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Katta test ma'lumotlari bilan bot so'rovlarining rejasi va vaqtini "
+        "indekslarsiz/indekslar bilan solishtirish (ma'lumotlar saqlanmaydi; "
+        "PostgreSQL'da EXPLAIN ANALYZE). Faqat alohida (sinov) bazada ishlating: "
+        "o'lchov davomida DROP INDEX zakaslar, tranzaksiyalar va foydalanuvchilar "
+        "jadvallarini to'liq qulflaydi - shu bazadagi bot to'xtab qoladi. "
+        "--database (DATABASES dagi sinov bazasi) yoki --i-know talab qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--products", type=int, default=500)
+        parser.add_argument("--orders", type=int, default=200_000)
+        parser.add_argument("--transactions", type=int, default=500_000)
+        parser.add_argument(
+            "--pending", type=float, default=0.02, help="Kutilayotgan zakaslar ulushi"
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--plans", action="store_true", help="To'liq rejani chiqarish")
+        parser.add_argument(
+            "--database",
+            help="DATABASES dagi sinov bazasi (alias); ishlayotgan bot bazasi emas",
+        )
+        parser.add_argument(
+            "--i-know",
+            action="store_true",
+            help="Standart bazada ishlatish (jadvallar o'lchov davomida qulflanadi)",
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        if alias is None:
+            if not options["i_know"]:
+                raise CommandError(
+                    "Benchmark o'lchov davomida zakaslar, tranzaksiyalar va "
+                    "foydalanuvchilar jadvallarini qulflaydi. Sinov bazasini "
+                    "--database bilan ko'rsating yoki --i-know qo'shing."
+                )
+            alias = DEFAULT_DB_ALIAS
+        elif alias not in connections:
+            raise CommandError(f"DATABASES da '{alias}' yo'q")
+
+        self.options = options
+        self.using = alias
+        self.connection = connections[alias]
+        try:
+            with transaction.atomic(using=alias):
+                started = time.perf_counter()
+                queries = self._seed(random.Random(0))
+                self.stdout.write(
+                    f"Test ma'lumotlari: {time.perf_counter() - started:.1f} s"
+                )
+
+                after = self._measure(queries)
+                self._drop_indexes()
+                before = self._measure(queries)
+                self._report(queries, before, after)
+                # Test ma'lumotlari va o'chirilgan indekslar qaytariladi
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    # ============ Data ============
+
+    def _seed(self, rng):
+        options = self.options
+        tag = uuid.uuid4().hex[:8]
+        batch = 5000
+
+        category = Category.objects.using(self.using).create(name=f"bench-{tag}")
+        products = Product.objects.using(self.using).bulk_create(
+            Product(name=f"bench-{tag}-{i}", category=category, quantity=1000)
+            for i in range(options["products"])
+        )
+        roles = [UserRole.REQUESTER] * 18 + [UserRole.WAREHOUSE, UserRole.ADMIN]
+        users = TelegramUser.objects.using(self.using).bulk_create(
+            (
+                TelegramUser(
+                    telegram_id=-(10**12) - i,
+                    full_name=f"bench-{tag}-{i}",
+                    role=rng.choice(roles),
+                    is_active=rng.random() > 0.1,
+                )
+                for i in range(options["users"])
+            ),
+            batch_size=batch,
+        )
+
+        statuses = [OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+        Order.objects.using(self.using).bulk_create(
+            (
+                Order(
+                    requester=rng.choice(users),
+                    product=rng.choice(products),
+                    quantity=Decimal(rng.randint(1, 10)),
+                    status=(
+                        OrderStatus.PENDING
+                        if rng.random() < options["pending"]
+                        else rng.choice(statuses)
+                    ),
+                )
+                for _ in range(options["orders"])
+            ),
+            batch_size=batch,
+        )
+        Transaction.objects.using(self.using).bulk_create(
+            (
+                Transaction(
+                    product=rng.choice(products),
+                    transaction_type=rng.choice(TransactionType.values),
+                    quantity=Decimal(rng.randint(1, 10)),
+                    performed_by=rng.choice(users),
+                )
+                for _ in range(options["transactions"])
+            ),
+            batch_size=batch,
+        )
+
+        with self.connection.cursor() as cursor:
+            for model in BENCHMARK_INDEXES:
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+        user = rng.choice(users)
+        product = rng.choice(products)
+        pending = Order.objects.using(self.using).filter(status=OrderStatus.PENDING)
+        # (nomi, queryset, bajarish)
+        return [
+            (
+                "kutilayotgan zakaslar",
+                pending.select_related("product", "requester")[:20],
+                list,
+            ),
+            ("kutilayotganlar soni", pending.values_list("pk"), _count),
+            (
+                "foydalanuvchi zakaslari",
+                Order.objects.using(self.using)
+                .filter(requester_id=user.id)
+                .select_related("product")[:10],
+                list,
+            ),
+            (
+                "mahsulot navbati",
+                pending.filter(product_id=product.id).order_by("created_at", "id"),
+                list,
+            ),
+            (
+                "oxirgi tranzaksiyalar",
+                recent_transactions()
+                .using(self.using)
+                .select_related("product", "performed_by")
+                .order_by("-created_at")[:30],
+                list,
+            ),
+            (
+                "hodimlar",
+                TelegramUser.objects.using(self.using).filter(
+                    role__in=STAFF_ROLES, is_active=True
+                ).values_list("telegram_id", flat=True),
+                list,
+            ),
+        ]
+
+    def _drop_indexes(self):
+        with self.connection.cursor() as cursor:
+            for model, names in BENCHMARK_INDEXES.items():
+                for name in names:
+                    cursor.execute(f'DROP INDEX "{name}"')
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+    # ============ Measure ============
+
+    def _measure(self, queries):
+        results = []
+        for _, queryset, run in queries:
+            timings = []
+            for _ in range(self.options["repeat"]):
+                started = time.perf_counter()
+                # Har safar yangi nusxa - natija keshlanmasin
+                run(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results.append((min(timings), self._plan(queryset)))
+        return results
+
+    def _plan(self, queryset):
+        if self.connection.vendor != "postgresql":
+            return queryset.explain(), None
+        plan = queryset.explain(analyze=True)
+        match = EXECUTION_TIME.search(plan)
+        return plan, float(match.group(1)) if match else None
+
+    def _report(self, queries, before, after):
+        analyze = self.connection.vendor == "postgresql"
+        header = f"{'so`rov':<26}{'oldin, ms':>12}{'keyin, ms':>12}"
+        if analyze:
+            header += f"{'EXPLAIN oldin':>16}{'EXPLAIN keyin':>16}"
+        self.stdout.write("\n" + header)
+        for (label, *_), (old, old_plan), (new, new_plan) in zip(
+            queries, before, after
+        ):
+            line = f"{label:<26}{old:>12.2f}{new:>12.2f}"
+            if analyze:
+                line += f"{old_plan[1] or 0:>16.2f}{new_plan[1] or 0:>16.2f}"
+            self.stdout.write(line)
+
+        for (label, *_), (_, old_plan), (_, new_plan) in zip(queries, before, after):
+            if self.options["plans"]:
+                self.stdout.write(f"\n== {label}: oldin ==\n{old_plan[0]}")
+                self.stdout.write(f"== {label}: keyin ==\n{new_plan[0]}")
+            else:
+                self.stdout.write(
+                    f"\n{label}:\n  oldin: {_scans(old_plan[0])}\n"
+                    f"  keyin: {_scans(new_plan[0])}"
+                )
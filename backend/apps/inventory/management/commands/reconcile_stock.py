@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.models import TelegramUser
+from apps.inventory.bot.repositories.counters import (
+    COUNTERS,
+    iter_reservation_drift,
+    read_counter,
+    reconcile_reservation,
+    verify_counter,
+)
+from apps.inventory.bot.repositories.transactions import (
+    RECONCILE_CHUNK_SIZE,
+    iter_stock_drift,
+    reconcile_product,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mahsulot qoldig'ini kirim-chiqim tranzaksiyalari yig'indisi bilan, "
+        "band qilingan miqdorni kutilayotgan zakaslar bilan va hisoblagichlarni "
+        "haqiqiy son bilan solishtirish (cron uchun); --fix - farqni tuzatish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help=(
+                "Qoldiq farqiga tuzatuvchi kirim/chiqim yozish (qoldiq o'zgarmaydi), "
+                "band qilingan miqdor va hisoblagichlarni qayta hisoblash"
+            ),
+        )
+        parser.add_argument(
+            "--telegram-id",
+            type=int,
+            help="Tuzatishni bajargan hodim (tarixda ko'rsatiladi)",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        user_id = None
+        if options["telegram_id"]:
+            user = TelegramUser.objects.filter(
+                telegram_id=options["telegram_id"]
+            ).first()
+            if user is None:
+                raise CommandError("Bunday telegram ID li foydalanuvchi yo'q")
+            user_id = user.id
+
+        found = fixed = 0
+        for product_id, name, quantity, ledger in iter_stock_drift(
+            options["chunk_size"]
+        ):
+            found += 1
+            self.stdout.write(
+                f"#{product_id} {name}: qoldiq {quantity}, tranzaksiyalar "
+                f"bo'yicha {ledger} (farq {quantity - ledger:+})"
+            )
+            if options["fix"] and reconcile_product(product_id, user_id):
+                fixed += 1
+
+        # Band qilingan miqdor - kutilayotgan zakaslar yig'indisi
+        for product_id, name, reserved, pending in list(iter_reservation_drift()):
+            found += 1
+            self.stdout.write(
+                f"#{product_id} {name}: band qilingan {reserved}, kutilayotgan "
+                f"zakaslar bo'yicha {pending}"
+            )
+            if options["fix"] and reconcile_reservation(product_id):
+                fixed += 1
+
+        # Hisoblagichlar (kutilayotgan zakaslar soni)
+        for key, count in COUNTERS.items():
+            stored, actual = read_counter(key), count()
+            if stored == actual:
+                continue
+            found += 1
+            self.stdout.write(f"Hisoblagich {key}: {stored}, haqiqiy {actual}")
+            if options["fix"]:
+                verify_counter(key)
+                fixed += 1
+
+        if not found:
+            self.stdout.write(self.style.SUCCESS("Farq topilmadi"))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Tuzatildi: {fixed} / {found}"))
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"Farqli mahsulotlar: {found} (--fix bilan tuzating)")
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.inventory.bot.notifications import notify_low_stock_digest
+
+
+class Command(BaseCommand):
+    help = (
+        "Kam qolgan mahsulotlar ro'yxatini ombor hodimlariga yuborish "
+        "(outbox orqali; cron uchun)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--key",
+            help="Takrorlanish kaliti: shu kalit bilan yuborilgan bo'lsa, qayta yuborilmaydi",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = notify_low_stock_digest(options["key"])
+
+        if count:
+            self.stdout.write(
+                self.style.SUCCESS(f"Navbatga qo'yildi: {count} ta mahsulot")
+            )
+        else:
+            self.stdout.write("Yuboriladigan narsa yo'q")
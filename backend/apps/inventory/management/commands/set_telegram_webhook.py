@@ -0,0 +1,41 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from telegram import Bot
+
+from apps.inventory.bot.webhook import set_webhook
+
+
+class Command(BaseCommand):
+    help = "Telegram webhook URL ni o'rnatish yoki o'chirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Webhookni o'chirish (polling rejimiga qaytish uchun)",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError("TELEGRAM_BOT_TOKEN topilmadi")
+        if not options["delete"] and not settings.TELEGRAM_WEBHOOK_URL:
+            raise CommandError("TELEGRAM_WEBHOOK_URL topilmadi")
+        if not options["delete"] and not settings.TELEGRAM_WEBHOOK_SECRET:
+            raise CommandError(
+                "TELEGRAM_WEBHOOK_SECRET topilmadi - webhook endpoint so'rovlarni rad etadi"
+            )
+
+        asyncio.run(self._run(options["delete"]))
+
+    async def _run(self, delete: bool):
+        async with Bot(settings.TELEGRAM_BOT_TOKEN) as bot:
+            if delete:
+                await bot.delete_webhook()
+                self.stdout.write(self.style.SUCCESS("Webhook o'chirildi"))
+            else:
+                await set_webhook(bot)
+                self.stdout.write(
+                    self.style.SUCCESS(f"Webhook o'rnatildi: {settings.TELEGRAM_WEBHOOK_URL}")
+                )
@@ -0,0 +1,83 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.inventory.models import Product
+from apps.inventory.bot.repositories.snapshots import (
+    backfill_stock_snapshots,
+    stock_at,
+    take_stock_snapshot,
+)
+
+
+def _parse_moment(value: str) -> datetime:
+    try:
+        day = parse_date(value)
+        # Faqat sana berilsa - kun oxiridagi qoldiq
+        moment = datetime.combine(day, time.max) if day else parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise CommandError(f"Noto'g'ri sana: {value}")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Qoldiq snapshotini olish (cron uchun), o'tgan davrni tranzaksiyalardan "
+        "tiklash (--backfill) yoki biror vaqtdagi qoldiqni ko'rish (--product, --at)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Tranzaksiyalar tarixidan snapshotlarni tiklash",
+        )
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Snapshotlar oralig'i, soat (24 ga bo'linishi kerak)",
+        )
+        parser.add_argument(
+            "--days", type=int, help="Faqat oxirgi N kun (standart - butun tarix)"
+        )
+        parser.add_argument("--product", type=int, help="Mahsulot ID")
+        parser.add_argument("--at", help="Sana yoki vaqt (YYYY-MM-DD [HH:MM])")
+
+    def handle(self, *args, **options):
+        if options["product"] or options["at"]:
+            return self._show(options)
+
+        if not options["backfill"]:
+            count = take_stock_snapshot()
+            self.stdout.write(self.style.SUCCESS(f"Snapshot olindi: {count} ta mahsulot"))
+            return
+
+        hours = options["hours"]
+        if hours <= 0 or 24 % hours:
+            raise CommandError("--hours 24 ning bo'luvchisi bo'lishi kerak")
+        since = None
+        if options["days"]:
+            since = timezone.now() - timedelta(days=options["days"])
+
+        count = backfill_stock_snapshots(timedelta(hours=hours), since=since)
+        self.stdout.write(self.style.SUCCESS(f"Tiklandi: {count} ta snapshot"))
+
+    def _show(self, options):
+        if not (options["product"] and options["at"]):
+            raise CommandError("--product va --at birga beriladi")
+        product = Product.objects.filter(id=options["product"]).first()
+        if product is None:
+            raise CommandError("Bunday mahsulot yo'q")
+        moment = _parse_moment(options["at"])
+        quantity = stock_at(product.id, moment)
+        self.stdout.write(
+            f"{product.name}: {quantity} {product.unit} "
+            f"({timezone.localtime(moment):%d.%m.%Y %H:%M})"
+        )
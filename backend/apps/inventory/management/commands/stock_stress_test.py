@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from apps.inventory.models import (
+    Category,
+    Product,
+    TelegramUser,
+    Transaction,
+    TransactionType,
+)
+from apps.inventory.bot.utils import add_product_stock, remove_product_stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Parallel kirim-chiqim stress testi: yo'qolgan yangilanish va manfiy "
+        "qoldiq yo'qligini tekshirish (PostgreSQL'da ishga tushiring)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--ops", type=int, default=200, help="Har bir thread uchun")
+        parser.add_argument("--initial", type=Decimal, default=Decimal("100"))
+        parser.add_argument(
+            "--keep", action="store_true", help="Test mahsulotini o'chirmaslik"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write(
+                "Diqqat: parallel yozuvlar faqat PostgreSQL'da to'liq tekshiriladi"
+            )
+
+        tag = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f"stress-{tag}")
+        product = Product.objects.create(
+            name=f"stress-{tag}", category=category, quantity=options["initial"]
+        )
+        user = TelegramUser.objects.create(
+            telegram_id=-random.randint(1, 2**31), full_name=f"stress-{tag}"
+        )
+
+        results = []
+        lock = threading.Lock()
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(product.id, user, options["ops"], seed, results, lock),
+            )
+            for seed in range(options["threads"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            self._report(product, options, results, elapsed)
+        finally:
+            if not options["keep"]:
+                category.delete()
+                user.delete()
+
+    def _worker(self, product_id, user, ops, seed, results, lock):
+        rng = random.Random(seed)
+        added = removed = rejected = errors = 0
+        try:
+            for _ in range(ops):
+                product = Product(id=product_id)
+                amount = Decimal(rng.randint(1, 5))
+                try:
+                    if rng.random() < 0.4:
+                        add_product_stock(product, amount, user)
+                        added += amount
+                    else:
+                        success, _, _ = remove_product_stock(product, amount, user)
+                        if success:
+                            removed += amount
+                        else:
+                            rejected += 1
+                except Exception:
+                    errors += 1
+        finally:
+            connection.close()
+        with lock:
+            results.append((added, removed, rejected, errors))
+
+    def _report(self, product, options, results, elapsed):
+        added = sum(r[0] for r in results)
+        removed = sum(r[1] for r in results)
+        rejected = sum(r[2] for r in results)
+        errors = sum(r[3] for r in results)
+        total_ops = options["threads"] * options["ops"]
+
+        product.refresh_from_db(fields=["quantity"])
+        expected = options["initial"] + added - removed
+
+        sums = dict(
+            Transaction.objects.filter(product=product)
+            .values_list("transaction_type")
+            .annotate(total=Sum("quantity"))
+        )
+        ledger = (
+            options["initial"]
+            + sums.get(TransactionType.IN, 0)
+            - sums.get(TransactionType.OUT, 0)
+        )
+
+        self.stdout.write(
+            f"{options['threads']} thread x {options['ops']} amal: "
+            f"{total_ops / elapsed:.0f} amal/s ({elapsed:.2f} s)\n"
+            f"kirim +{added}, chiqim -{removed}, rad etilgan {rejected}, "
+            f"xatolik {errors}\n"
+            f"qoldiq: {product.quantity} (kutilgan {expected}, tranzaksiyalar "
+            f"bo'yicha {ledger})"
+        )
+
+        if product.quantity != expected or product.quantity != ledger:
+            raise CommandError("Yangilanishlar yo'qoldi!")
+        if product.quantity < 0:
+            raise CommandError("Qoldiq manfiy!")
+        self.stdout.write(self.style.SUCCESS("OK: yo'qolgan yangilanish yo'q"))
@@ -0,0 +1,41 @@
+# Generated by Django 6.1.2 on 2026-10-18 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotUserData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True, verbose_name='Telegram ID')),
+                ('data', models.BinaryField(verbose_name="Ma'lumot")),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan sana')),
+            ],
+            options={
+                'verbose_name': "Bot foydalanuvchi ma'lumoti",
+                'verbose_name_plural': "Bot foydalanuvchi ma'lumotlari",
+            },
+        ),
+        migrations.CreateModel(
+            name='BotConversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Suhbat nomi')),
+                ('key', models.CharField(max_length=255, verbose_name='Kalit')),
+                ('state', models.JSONField(verbose_name='Holat')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan sana')),
+            ],
+            options={
+                'verbose_name': 'Bot suhbati',
+                'verbose_name_plural': 'Bot suhbatlari',
+                'unique_together': {('name', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-18 15:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_bot_persistence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.BigIntegerField(verbose_name='Chat ID')),
+                ('text', models.TextField(verbose_name='Matn')),
+                ('status', models.CharField(choices=[('pending', 'Kutilmoqda'), ('sent', 'Yuborildi'), ('failed', 'Yuborilmadi')], default='pending', max_length=20, verbose_name='Holat')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Urinishlar')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Keyingi urinish')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Oxirgi xatolik')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan sana')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Yuborilgan sana')),
+            ],
+            options={
+                'verbose_name': 'Bildirishnoma',
+                'verbose_name_plural': 'Bildirishnomalar',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='inventory_n_status_8f9794_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-18 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dedup_key',
+            field=models.CharField(blank=True, db_index=True, help_text='Bir xil kalitli xabar qisqa vaqt ichida qayta yuborilmaydi', max_length=64, null=True, verbose_name='Takrorlanish kaliti'),
+        ),
+    ]
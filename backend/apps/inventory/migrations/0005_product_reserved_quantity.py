@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def reserve_pending_orders(apps, schema_editor):
+    """Mavjud kutilayotgan zakaslar uchun mahsulotni band qilish"""
+    Product = apps.get_model("inventory", "Product")
+    Order = apps.get_model("inventory", "Order")
+
+    pending = (
+        Order.objects.filter(product=OuterRef("pk"), status="pending")
+        .values("product")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    Product.objects.update(
+        reserved_quantity=Coalesce(
+            Subquery(pending), 0, output_field=models.DecimalField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_notification_dedup_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="reserved_quantity",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Kutilayotgan zakaslar uchun ajratilgan miqdor",
+                max_digits=10,
+                verbose_name="Band qilingan",
+            ),
+        ),
+        migrations.RunPython(reserve_pending_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.1.2 on 2026-10-18 15:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_product_reserved_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(verbose_name='Vaqt')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Qoldiq')),
+            ],
+            options={
+                'verbose_name': 'Qoldiq snapshoti',
+                'verbose_name_plural': 'Qoldiq snapshotlari',
+                'ordering': ['-taken_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['product', 'created_at'], name='inventory_t_product_06e9f6_idx'),
+        ),
+        migrations.AddField(
+            model_name='stocksnapshot',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.product', verbose_name='Mahsulot'),
+        ),
+        migrations.AddIndex(
+            model_name='stocksnapshot',
+            index=models.Index(fields=['taken_at'], name='inventory_s_taken_a_f1ea29_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('product', 'taken_at'), name='unique_product_snapshot'),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 6.1.2 on 2026-10-18 15:32
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+TABLE = "inventory_transaction"
+# Yangi oylar uchun oldindan yaratiladigan partitionlar
+MONTHS_AHEAD = 3
+
+
+def _months(first, months_ahead):
+    """``first`` oyidan joriy oy + ``months_ahead`` gacha (mahalliy vaqt)"""
+    local = timezone.localtime(first)
+    index = local.year * 12 + local.month - 1
+    now = timezone.localtime()
+    last = now.year * 12 + now.month - 1 + months_ahead
+    bounds = [
+        timezone.make_aware(datetime(i // 12, i % 12 + 1, 1))
+        for i in range(index, last + 2)
+    ]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _constraints(cursor):
+    """Jadval indekslari va tashqi kalitlari (qayta yaratish uchun)"""
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [TABLE, f"{TABLE}_pkey"],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [TABLE],
+    )
+    return indexes, cursor.fetchall()
+
+
+def _restore(cursor, indexes, foreign_keys):
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def partition_transactions(apps, schema_editor):
+    """Tranzaksiyalar jadvalini ``created_at`` bo'yicha oylik partitionlarga bo'lish
+
+    Partitionlangan jadvalning asosiy kaliti partition ustunini ham o'z
+    ichiga olishi kerak: ``(id, created_at)``. ``id`` alohida sequence'dan
+    olinadi. Migratsiya vaqtida jadval qulflanadi.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = _constraints(cursor)
+        cursor.execute(f'SELECT min(created_at) FROM "{TABLE}"')
+        first = cursor.fetchone()[0] or timezone.now()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{TABLE}_old"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{TABLE}_old" INCLUDING DEFAULTS) '
+            f"PARTITION BY RANGE (created_at)"
+        )
+        for start, end in _months(first, MONTHS_AHEAD):
+            cursor.execute(
+                f'CREATE TABLE "{TABLE}_p{start:%Y_%m}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start.isoformat(), end.isoformat()],
+            )
+        # Partition yaratilmagan oylar uchun
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{TABLE}_old"')
+        cursor.execute(f'DROP TABLE "{TABLE}_old"')
+
+        cursor.execute(f'CREATE SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ALTER COLUMN id '
+            f"SET DEFAULT nextval('{TABLE}_id_seq')"
+        )
+        cursor.execute(
+            f"SELECT setval('{TABLE}_id_seq', COALESCE(max(id), 0) + 1, false) "
+            f'FROM "{TABLE}"'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, created_at)')
+        _restore(cursor, indexes, foreign_keys)
+
+
+def unpartition_transactions(apps, schema_editor):
+    """Oddiy jadvalga qaytarish"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [TABLE])
+        if cursor.fetchone()[0] != "p":
+            return
+        indexes, foreign_keys = _constraints(cursor)
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{TABLE}_old"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{TABLE}_old" INCLUDING DEFAULTS)'
+        )
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{TABLE}_old"')
+        cursor.execute(f'DROP TABLE "{TABLE}_old" CASCADE')
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id DROP DEFAULT')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY'
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f'COALESCE(max(id), 0) + 1, false) FROM "{TABLE}"',
+            [TABLE],
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id)')
+        _restore(cursor, indexes, foreign_keys)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_stock_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField(unique=True, verbose_name='Boshlanishi')),
+                ('period_end', models.DateTimeField(verbose_name='Tugashi')),
+                ('path', models.CharField(max_length=500, verbose_name='Fayl')),
+                ('rows', models.PositiveIntegerField(verbose_name='Tranzaksiyalar soni')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Arxivlangan')),
+            ],
+            options={
+                'verbose_name': 'Tranzaksiyalar arxivi',
+                'verbose_name_plural': 'Tranzaksiyalar arxivlari',
+                'ordering': ['-period_start'],
+            },
+        ),
+        migrations.RunPython(partition_transactions, unpartition_transactions),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.1.2 on 2026-10-18 15:37
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def count_pending_orders(apps, schema_editor):
+    """Kutilayotgan zakaslar hisoblagichini boshlang'ich qiymat bilan yaratish"""
+    Counter = apps.get_model("inventory", "Counter")
+    Order = apps.get_model("inventory", "Order")
+    Counter.objects.update_or_create(
+        key="pending_orders",
+        defaults={
+            "value": Order.objects.filter(status="pending").count(),
+            "verified_at": timezone.now(),
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Kalit')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Qiymat')),
+                ('verified_at', models.DateTimeField(blank=True, null=True, verbose_name='Tekshirilgan vaqt')),
+            ],
+            options={
+                'verbose_name': 'Hisoblagich',
+                'verbose_name_plural': 'Hisoblagichlar',
+            },
+        ),
+        migrations.RunPython(count_pending_orders, migrations.RunPython.noop),
+    ]
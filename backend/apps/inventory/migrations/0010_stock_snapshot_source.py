@@ -0,0 +1,36 @@
+# Generated by Django 6.1.2 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+def mark_archive_snapshots(apps, schema_editor):
+    """Arxiv chegaralaridagi snapshotlar tranzaksiyalardan hisoblangan"""
+    StockSnapshot = apps.get_model("inventory", "StockSnapshot")
+    TransactionArchive = apps.get_model("inventory", "TransactionArchive")
+    StockSnapshot.objects.filter(
+        taken_at__in=TransactionArchive.objects.values("period_end")
+    ).update(source="ledger")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_pending_order_counter'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='stocksnapshot',
+            name='unique_product_snapshot',
+        ),
+        migrations.AddField(
+            model_name='stocksnapshot',
+            name='source',
+            field=models.CharField(choices=[('stock', 'Qoldiq'), ('ledger', 'Tranzaksiyalar')], default='stock', max_length=10, verbose_name='Manba'),
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('product', 'taken_at', 'source'), name='unique_product_snapshot'),
+        ),
+        migrations.RunPython(mark_archive_snapshots, migrations.RunPython.noop),
+    ]
@@ -25,6 +25,21 @@ class TransactionType(models.TextChoices):
     OUT = "out", "Chiqim"
 
 
+class SnapshotSource(models.TextChoices):
+    """Qoldiq snapshoti qayerdan olingan"""
+
+    STOCK = "stock", "Qoldiq"
+    LEDGER = "ledger", "Tranzaksiyalar"
+
+
+class NotificationStatus(models.TextChoices):
+    """Bildirishnoma holatlari"""
+
+    PENDING = "pending", "Kutilmoqda"
+    SENT = "sent", "Yuborildi"
+    FAILED = "failed", "Yuborilmadi"
+
+
 class TelegramUser(models.Model):
     """Telegram foydalanuvchisi"""
 
@@ -48,6 +63,14 @@ class TelegramUser(models.Model):
         verbose_name = "Telegram foydalanuvchi"
         verbose_name_plural = "Telegram foydalanuvchilar"
         ordering = ["-created_at"]
+        indexes = [
+            # Bildirishnoma oluvchi hodimlar: role__in=..., is_active=True
+            models.Index(
+                fields=["role"],
+                condition=models.Q(is_active=True),
+                name="tguser_active_role_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.get_role_display()})"
@@ -117,6 +140,13 @@ class Product(models.Model):
         verbose_name="Minimum miqdor",
         help_text="Bu miqdordan kam bo'lsa ogohlantirish yuboriladi",
     )
+    reserved_quantity = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name="Band qilingan",
+        help_text="Kutilayotgan zakaslar uchun ajratilgan miqdor",
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
 
@@ -134,6 +164,11 @@ class Product(models.Model):
         """Mahsulot kam qoldimi?"""
         return self.quantity <= self.min_quantity and self.min_quantity > 0
 
+    @property
+    def available_quantity(self):
+        """Zakas qilish mumkin bo'lgan miqdor (band qilinganidan tashqari)"""
+        return self.quantity - self.reserved_quantity
+
 
 class Order(models.Model):
     """Zakas"""
@@ -177,6 +212,25 @@ class Order(models.Model):
         verbose_name = "Zakas"
         verbose_name_plural = "Zakaslar"
         ordering = ["-created_at"]
+        indexes = [
+            # Kutilayotgan zakaslar ro'yxati va soni (bajarilganlar kirmaydi)
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(status=OrderStatus.PENDING),
+                name="order_pending_created_idx",
+            ),
+            # Mahsulot bo'yicha kutilayotgan zakaslar (navbat tartibida)
+            models.Index(
+                fields=["product", "created_at"],
+                condition=models.Q(status=OrderStatus.PENDING),
+                name="order_pending_product_idx",
+            ),
+            # Foydalanuvchining oxirgi zakaslari
+            models.Index(
+                fields=["requester", "-created_at"],
+                name="order_requester_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"#{self.id} - {self.product.name} ({self.quantity} {self.product.unit})"
@@ -195,7 +249,11 @@ class Order(models.Model):
 
 
 class Transaction(models.Model):
-    """Kirim-chiqim tarixi"""
+    """Kirim-chiqim tarixi
+
+    PostgreSQL'da jadval ``created_at`` bo'yicha oylik partitionlarga
+    bo'lingan (0007 migratsiya, ``apps.inventory.ledger``).
+    """
 
     product = models.ForeignKey(
         Product,
@@ -231,7 +289,171 @@ class Transaction(models.Model):
         verbose_name = "Tranzaksiya"
         verbose_name_plural = "Tranzaksiyalar"
         ordering = ["-created_at"]
+        indexes = [
+            # Snapshotdan keyingi o'zgarishlarni hisoblash uchun
+            models.Index(fields=["product", "created_at"]),
+            # Oxirgi tranzaksiyalar (/history, admin)
+            models.Index(fields=["-created_at"], name="transaction_created_idx"),
+        ]
 
     def __str__(self):
         type_symbol = "+" if self.transaction_type == TransactionType.IN else "-"
         return f"{type_symbol}{self.quantity} {self.product.unit} {self.product.name}"
+
+
+class StockSnapshot(models.Model):
+    """Mahsulot qoldig'ining ma'lum vaqtdagi holati
+
+    Biror sanadagi qoldiq = eng yaqin snapshot + undan keyingi tranzaksiyalar.
+    ``STOCK`` - ``Product.quantity`` (biror vaqtdagi qoldiq uchun),
+    ``LEDGER`` - arxivlangan oy oxirigacha tranzaksiyalar yig'indisi
+    (tekshiruv uchun boshlang'ich qoldiq). Ikkalasi aralashtirilmaydi.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+        verbose_name="Mahsulot",
+    )
+    taken_at = models.DateTimeField(verbose_name="Vaqt")
+    quantity = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Qoldiq"
+    )
+    source = models.CharField(
+        max_length=10,
+        choices=SnapshotSource.choices,
+        default=SnapshotSource.STOCK,
+        verbose_name="Manba",
+    )
+
+    class Meta:
+        verbose_name = "Qoldiq snapshoti"
+        verbose_name_plural = "Qoldiq snapshotlari"
+        ordering = ["-taken_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "taken_at", "source"],
+                name="unique_product_snapshot",
+            )
+        ]
+        indexes = [models.Index(fields=["taken_at"])]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.taken_at:%d.%m.%Y %H:%M}: {self.quantity}"
+
+
+class TransactionArchive(models.Model):
+    """Bazadan arxiv fayliga ko'chirilgan bir oylik tranzaksiyalar
+
+    ``period_end`` dagi tranzaksiyalar yig'indisi ``StockSnapshot`` ga
+    (``LEDGER``) yoziladi - tarix shu nuqtadan davom etadi.
+    """
+
+    period_start = models.DateTimeField(unique=True, verbose_name="Boshlanishi")
+    period_end = models.DateTimeField(verbose_name="Tugashi")
+    path = models.CharField(max_length=500, verbose_name="Fayl")
+    rows = models.PositiveIntegerField(verbose_name="Tranzaksiyalar soni")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Arxivlangan")
+
+    class Meta:
+        verbose_name = "Tranzaksiyalar arxivi"
+        verbose_name_plural = "Tranzaksiyalar arxivlari"
+        ordering = ["-period_start"]
+
+    def __str__(self):
+        return f"{self.period_start:%Y-%m} ({self.rows})"
+
+
+class Counter(models.Model):
+    """Tez-tez so'raladigan son (masalan, kutilayotgan zakaslar)
+
+    Qiymat o'zgarish bilan bitta tranzaksiyada oshiriladi/kamaytiriladi va
+    vaqti-vaqti bilan haqiqiy ``COUNT`` bilan tekshiriladi (``verified_at``).
+    """
+
+    key = models.CharField(max_length=64, primary_key=True, verbose_name="Kalit")
+    value = models.BigIntegerField(default=0, verbose_name="Qiymat")
+    verified_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Tekshirilgan vaqt"
+    )
+
+    class Meta:
+        verbose_name = "Hisoblagich"
+        verbose_name_plural = "Hisoblagichlar"
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class BotConversation(models.Model):
+    """Bot suhbati holati (ConversationHandler persistence)"""
+
+    name = models.CharField(max_length=64, verbose_name="Suhbat nomi")
+    key = models.CharField(max_length=255, verbose_name="Kalit")
+    state = models.JSONField(verbose_name="Holat")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
+
+    class Meta:
+        verbose_name = "Bot suhbati"
+        verbose_name_plural = "Bot suhbatlari"
+        unique_together = ["name", "key"]
+
+    def __str__(self):
+        return f"{self.name} {self.key}: {self.state}"
+
+
+class BotUserData(models.Model):
+    """Bot ``context.user_data`` (restart va workerlar orasida saqlanadi)"""
+
+    user_id = models.BigIntegerField(unique=True, verbose_name="Telegram ID")
+    data = models.BinaryField(verbose_name="Ma'lumot")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
+
+    class Meta:
+        verbose_name = "Bot foydalanuvchi ma'lumoti"
+        verbose_name_plural = "Bot foydalanuvchi ma'lumotlari"
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class Notification(models.Model):
+    """Yuborilishi kerak bo'lgan bot xabari (outbox)
+
+    Zakas yoki qoldiq o'zgarishi bilan bitta tranzaksiyada yoziladi va
+    ``OutboxWorker`` tomonidan yuboriladi.
+    """
+
+    chat_id = models.BigIntegerField(verbose_name="Chat ID")
+    text = models.TextField(verbose_name="Matn")
+    dedup_key = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        db_index=True,
+        verbose_name="Takrorlanish kaliti",
+        help_text="Bir xil kalitli xabar qisqa vaqt ichida qayta yuborilmaydi",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=NotificationStatus.choices,
+        default=NotificationStatus.PENDING,
+        verbose_name="Holat",
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Urinishlar")
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Keyingi urinish"
+    )
+    last_error = models.TextField(blank=True, null=True, verbose_name="Oxirgi xatolik")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Yuborilgan sana")
+
+    class Meta:
+        verbose_name = "Bildirishnoma"
+        verbose_name_plural = "Bildirishnomalar"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"#{self.id} -> {self.chat_id} ({self.get_status_display()})"
@@ -0,0 +1,50 @@
+"""Model signallari: bot keshlari va katalogini tozalash"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.inventory.models import Category, Product, TelegramUser
+from apps.inventory.bot.cache import staff_cache, user_cache
+from apps.inventory.bot.catalog import catalog_changed
+from apps.inventory.bot.invalidation import publish
+from apps.inventory.bot.notifications import STAFF_ROLES
+
+# Bildirishnoma qabul qiluvchilar ro'yxatiga ta'sir qiladigan maydonlar
+STAFF_FIELDS = {"telegram_id", "role", "is_active"}
+
+
+def _staff_changed(instance: TelegramUser, created: bool, update_fields) -> bool:
+    if created:
+        return instance.role in STAFF_ROLES and instance.is_active
+    return update_fields is None or bool(STAFF_FIELDS & set(update_fields))
+
+
+def _invalidate_staff() -> None:
+    transaction.on_commit(staff_cache.clear)
+    publish("staff")
+
+
+@receiver([post_save, post_delete], sender=TelegramUser)
+def telegram_user_changed(sender, instance: TelegramUser, **kwargs):
+    """Rol, bloklash va h.k. o'zgarganda foydalanuvchi keshini tozalash"""
+    telegram_id = instance.telegram_id
+    transaction.on_commit(lambda: user_cache.invalidate(telegram_id))
+    publish("user", telegram_id)
+
+    # post_delete da created/update_fields yo'q - ro'yxat har doim yangilanadi
+    if "created" not in kwargs or _staff_changed(
+        instance, kwargs["created"], kwargs.get("update_fields")
+    ):
+        _invalidate_staff()
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Product)
+def catalog_item_changed(sender, **kwargs):
+    """Yangi, tahrirlangan yoki o'chirilgan kategoriya/mahsulot - katalog qayta quriladi
+
+    Qoldiqning o'zi (``UPDATE ... F()``) signal chaqirmaydi - u
+    ``catalog.stock_changed`` orqali joyida yangilanadi.
+    """
+    catalog_changed()
@@ -0,0 +1,44 @@
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+)
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from apps.inventory.bot.webhook import feed_update
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_POST
+async def telegram_webhook(request):
+    """Telegram update'larini qabul qilish (TELEGRAM_BOT_MODE=webhook)"""
+    if settings.TELEGRAM_BOT_MODE != "webhook":
+        # Polling rejimida ikkinchi Application ishga tushmasin
+        raise Http404
+
+    secret = settings.TELEGRAM_WEBHOOK_SECRET
+    if not secret:
+        # Maxfiy kalitsiz istalgan odam soxta update (boshqa from.id bilan) yubora oladi
+        logger.error("TELEGRAM_WEBHOOK_SECRET o'rnatilmagan - webhook so'rovi rad etildi")
+        return HttpResponseForbidden()
+    token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(token.encode(), secret.encode()):
+        return HttpResponseForbidden()
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest()
+
+    # Update navbatga qo'yiladi, javob Telegramga darhol qaytariladi
+    await feed_update(data)
+    return HttpResponse()
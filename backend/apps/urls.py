@@ -2,5 +2,6 @@ from django.urls import path, include
 
 urlpatterns = [
     # path("dashboard/", include("apps.dashboard.urls")),
+    path("bot/", include("apps.inventory.urls")),
 
 ]
@@ -0,0 +1,24 @@
+"""
+ASGI config for config project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Telegram webhook (TELEGRAM_BOT_MODE=webhook) ham shu ilova orqali xizmat qiladi.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        # Server to'xtaganda webhook rejimidagi bot Application'i ham to'xtatiladi
+        from apps.inventory.bot.webhook import lifespan
+
+        await lifespan(receive, send)
+        return
+    await django_application(scope, receive, send)
@@ -236,3 +236,58 @@ SWAGGER_SETTINGS = {
 # Telegram Bot
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 ADMIN_TELEGRAM_ID = os.getenv("ADMIN_TELEGRAM_ID")
+# "polling" - bot_runner.py (development), "webhook" - ASGI ilova ichida
+TELEGRAM_BOT_MODE = os.getenv("TELEGRAM_BOT_MODE", "polling")
+# Masalan: https://example.com/api/v1/bot/webhook/
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
+# Webhook rejimida majburiy: usiz endpoint barcha so'rovlarni rad etadi (403)
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+# Bot ORM so'rovlari uchun thread pool hajmi (bir vaqtda bajariladigan so'rovlar)
+BOT_DB_POOL_SIZE = int(os.getenv("BOT_DB_POOL_SIZE", 8))
+# Bir vaqtda qayta ishlanadigan update'lar soni (bitta chatniki doim ketma-ket).
+# BOT_DB_POOL_SIZE dan katta qilishdan foyda kam - ma'lumotlar bazasi chegara bo'ladi
+BOT_CONCURRENT_UPDATES = int(os.getenv("BOT_CONCURRENT_UPDATES", 8))
+# Polling rejimidagi worker jarayonlari soni (>1 bo'lsa update'lar foydalanuvchi bo'yicha taqsimlanadi)
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", 1))
+# Suhbat holati bazaga paket bo'lib yoziladi: o'zgarishlar har FLUSH_INTERVAL
+# soniyada yig'iladi, MAX_LOSS_WINDOW soniyadan kechiktirilmay yoziladi
+BOT_PERSISTENCE_FLUSH_INTERVAL = float(os.getenv("BOT_PERSISTENCE_FLUSH_INTERVAL", 5))
+BOT_PERSISTENCE_MAX_LOSS_WINDOW = float(os.getenv("BOT_PERSISTENCE_MAX_LOSS_WINDOW", 10))
+# Chiquvchi so'rovlar chegarasi (Telegram: ~30 xabar/s umumiy, 1 xabar/s bitta chatga).
+# Sharding rejimida umumiy chegara workerlar orasida teng bo'linadi
+BOT_RATE_LIMIT_GLOBAL = float(os.getenv("BOT_RATE_LIMIT_GLOBAL", 30))
+BOT_RATE_LIMIT_PER_CHAT = float(os.getenv("BOT_RATE_LIMIT_PER_CHAT", 1))
+BOT_RATE_LIMIT_CHAT_BURST = int(os.getenv("BOT_RATE_LIMIT_CHAT_BURST", 3))
+BOT_SEND_MAX_RETRIES = int(os.getenv("BOT_SEND_MAX_RETRIES", 3))
+# Bitta bildirishnoma nechta qabul qiluvchiga bir vaqtda yuboriladi
+BOT_NOTIFY_CONCURRENCY = int(os.getenv("BOT_NOTIFY_CONCURRENCY", 10))
+# Bildirishnomalar outbox'i: paket hajmi, bo'sh navbatni tekshirish oralig'i (s),
+# urinishlar soni va band qilingan xabar qayta yuborilgunga qadar vaqt (s)
+BOT_OUTBOX_BATCH_SIZE = int(os.getenv("BOT_OUTBOX_BATCH_SIZE", 50))
+BOT_OUTBOX_POLL_INTERVAL = float(os.getenv("BOT_OUTBOX_POLL_INTERVAL", 1))
+BOT_OUTBOX_MAX_ATTEMPTS = int(os.getenv("BOT_OUTBOX_MAX_ATTEMPTS", 5))
+BOT_OUTBOX_LEASE = float(os.getenv("BOT_OUTBOX_LEASE", 60))
+# Bitta mahsulot uchun "kam qoldi" ogohlantirishi shu oraliqda (s) bir marta yuboriladi
+BOT_LOW_STOCK_ALERT_WINDOW = float(os.getenv("BOT_LOW_STOCK_ALERT_WINDOW", 6 * 3600))
+# >0 bo'lsa alohida ogohlantirishlar o'rniga shu oraliqda (s) umumiy ro'yxat yuboriladi
+BOT_LOW_STOCK_DIGEST_INTERVAL = float(os.getenv("BOT_LOW_STOCK_DIGEST_INTERVAL", 0))
+# Bot foydalanuvchilari keshining muddati (s); 0 - kesh o'chirilgan
+BOT_USER_CACHE_TTL = float(os.getenv("BOT_USER_CACHE_TTL", 300))
+# O'zgargan Telegram profillari (username, ism) bazaga shu oraliqda (s) paket bo'lib yoziladi
+BOT_PROFILE_FLUSH_INTERVAL = float(os.getenv("BOT_PROFILE_FLUSH_INTERVAL", 30))
+# Hisoblagichlar (kutilayotgan zakaslar soni) shu oraliqda (s) fon vazifasida
+# haqiqiy son bilan tekshiriladi
+BOT_COUNTER_VERIFY_INTERVAL = float(os.getenv("BOT_COUNTER_VERIFY_INTERVAL", 300))
+# Kategoriya va mahsulotlar katalogi (klaviaturalar uchun) keshining muddati (s); 0 - o'chirilgan
+BOT_CATALOG_TTL = float(os.getenv("BOT_CATALOG_TTL", 300))
+
+# Tranzaksiyalar tarixi (PostgreSQL'da oylik partitionlar). Bot va admin ro'yxati
+# faqat oxirgi HOT_DAYS kunni o'qiydi; RETENTION_MONTHS oydan eskilari
+# archive_transactions buyrug'i bilan ARCHIVE_DIR ga (csv.gz) ko'chiriladi
+LEDGER_HOT_DAYS = int(os.getenv("LEDGER_HOT_DAYS", 60))
+LEDGER_RETENTION_MONTHS = int(os.getenv("LEDGER_RETENTION_MONTHS", 24))
+LEDGER_ARCHIVE_DIR = os.getenv(
+    "LEDGER_ARCHIVE_DIR", os.path.join(BASE_DIR, "../", "archive/transactions/")
+)
+# Oldindan yaratiladigan oylik partitionlar soni
+LEDGER_PARTITIONS_AHEAD = int(os.getenv("LEDGER_PARTITIONS_AHEAD", 3))
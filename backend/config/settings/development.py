@@ -11,6 +11,9 @@ DATABASES = {
         "USER": os.environ.get("DB_USERNAME", "postgres"),
         "PASSWORD": os.environ.get("DB_PASSWORD", "postgres"),
         "PORT": int(os.environ.get("DB_PORT", "5432")),
+        # Bot thread pool'idagi ulanishlarni qayta ishlatish
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 STATIC_URL = "static/"
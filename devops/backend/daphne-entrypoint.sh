@@ -3,5 +3,10 @@
 
 cd backend  # <-- Katalogni o'zgartirish
 
+if [ "$TELEGRAM_BOT_MODE" = "webhook" ]; then
+    echo 'Setting Telegram webhook...'
+    python manage.py set_telegram_webhook
+fi
+
 echo 'Running daphne server...'
 daphne -b 0.0.0.0 -p 8001 config.asgi:application